@@ -123,8 +123,8 @@ class TaskExecutor(QThread):
             self.downloaders[project_name] = downloader
 
             if action_type == 'download':
-                version_info = downloader.request()
-                downloader.download(version_info)
+                # 边解析版本边下载
+                downloader.download_stream()
 
             elif action_type == 'update':
                 downloader.check_updates()
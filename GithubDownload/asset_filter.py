@@ -0,0 +1,239 @@
+import re
+import logging
+import operator
+from fnmatch import fnmatchcase
+from typing import Optional, Dict, Any, List, Iterable, Iterator, Tuple, Pattern, Callable
+
+from .units import parse_size
+
+
+def _split_items(value: Optional[str]) -> List[str]:
+    """配置中的多个值，用换行或逗号分隔；re: 开头的正则表达式占一整行 (正则中可以有逗号)"""
+    items = []
+    for line in str(value or '').splitlines():
+        line = line.strip()
+        if line.startswith('re:'):
+            items.append(line)
+        else:
+            items.extend(item.strip() for item in line.split(','))
+    return [item for item in items if item]
+
+
+def _compile_pattern(pattern: str) -> Callable[[str], bool]:
+    """re: 开头为正则表达式 (search，不区分大小写)，否则为 glob 通配符 (不区分大小写)"""
+    if pattern.startswith('re:'):
+        regex = re.compile(pattern[3:].strip(), re.IGNORECASE)
+        return lambda name: regex.search(name) is not None
+    glob = pattern.lower()
+    return lambda name: fnmatchcase(name.lower(), glob)
+
+
+def _token_regexes(aliases: Dict[str, Tuple[str, ...]]) -> List[Tuple[str, Pattern]]:
+    """文件名中独立出现 (前后不是字母数字) 的别名，长的别名在前 (x86_64 先于 x86 匹配)"""
+    pairs = sorted(((alias, name) for name, names in aliases.items() for alias in (name,) + names),
+                   key=lambda pair: -len(pair[0]))
+    return [(name, re.compile(r'(?<![a-z0-9])' + re.escape(alias) + r'(?![a-z0-9])')) for alias, name in pairs]
+
+
+class AssetFilter:
+    """项目的下载文件过滤规则 (config.ini 项目配置)
+
+    - include / exclude: release 文件名的 glob 通配符或 re: 开头的正则表达式，多个用逗号或换行分隔，
+      配置了 include 时只下载匹配的文件，匹配 exclude 的文件不下载
+    - max_size: 超过该大小的 release 文件不下载 (支持 K/M/G 后缀，页面上没有大小的文件不过滤)
+    - platforms: 需要的平台，例如 windows-amd64, linux，文件名中带有其他系统 / 架构标记的文件不下载，
+      没有平台标记的文件 (jar、文档、校验文件等) 不过滤
+    - versions: 版本范围，例如 >=1.2, <2.0 或 v2.*，多个条件需要同时满足
+    - newest: 只处理最新的 N 个版本 (需要 only_latest = false)
+    - source_code: 是否下载源码包，默认 true
+    """
+
+    logger = logging.getLogger('AssetFilter')
+
+    KEYS = ('include', 'exclude', 'max_size', 'platforms', 'versions', 'newest', 'source_code')
+
+    OS_ALIASES = {
+        'windows': ('windows', 'win', 'win32', 'win64', 'exe', 'msi'),
+        'linux': ('linux',),
+        'darwin': ('darwin', 'macos', 'mac', 'osx', 'apple', 'dmg'),
+        'freebsd': ('freebsd',),
+        'android': ('android', 'apk'),
+    }
+    ARCH_ALIASES = {
+        'amd64': ('amd64', 'x86_64', 'x64', 'win64'),
+        '386': ('386', 'i386', 'i686', 'x86', '32bit', 'win32'),
+        'arm64': ('arm64', 'aarch64'),
+        'arm': ('arm', 'armv5', 'armv6', 'armv7', 'armhf', 'armel'),
+        'mips': ('mips', 'mipsle', 'mips64', 'mips64le'),
+    }
+
+    _OPERATORS = {'>=': operator.ge, '<=': operator.le, '==': operator.eq, '!=': operator.ne,
+                  '>': operator.gt, '<': operator.lt, '=': operator.eq}
+
+    def __init__(self, include: Optional[str] = None, exclude: Optional[str] = None,
+                 max_size: Optional[str] = None, platforms: Optional[str] = None,
+                 versions: Optional[str] = None, newest: Optional[str] = None,
+                 source_code: Optional[str] = None):
+        # 原始配置，用于 fingerprint()
+        self._settings = {key: str(value).strip() for key, value in zip(
+            self.KEYS, (include, exclude, max_size, platforms, versions, newest, source_code)) if value not in (None, '')}
+        self.include = [_compile_pattern(item) for item in _split_items(include)]
+        self.exclude = [_compile_pattern(item) for item in _split_items(exclude)]
+        self.max_size = parse_size(max_size, 0)
+        self.platforms = [self._parse_platform(item) for item in _split_items(platforms)]
+        self.versions = [self._parse_version_rule(item) for item in _split_items(versions)]
+        self.newest = int(newest) if newest not in (None, '') else 0
+        self.source_code = str(source_code).strip().lower() not in ('false', 'no', 'n', '0', 'off') \
+            if source_code not in (None, '') else True
+        self.enabled = bool(self.include or self.exclude or self.max_size or self.platforms
+                            or self.versions or self.newest or not self.source_code)
+
+        self._os_regex = _token_regexes(self.OS_ALIASES)
+        self._arch_regex = _token_regexes(self.ARCH_ALIASES)
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> 'AssetFilter':
+        """从项目配置中读取过滤规则，没有配置时返回不过滤的规则"""
+        config = config or {}
+        return cls(**{key: config.get(key) for key in cls.KEYS})
+
+    def fingerprint(self) -> str:
+        """过滤规则的标识，规则变化时不同 (feed 预检查的指纹中使用)"""
+        return ';'.join(f"{key}={value}" for key, value in sorted(self._settings.items()))
+
+    # ---------- 平台 ----------
+
+    def _parse_platform(self, value: str) -> Tuple[str, Optional[str]]:
+        """windows-amd64 / linux / darwin_arm64 -> (系统, 架构)"""
+        parts = re.split(r'[-_/ ]', value.strip().lower(), maxsplit=1)
+        os_name = self._canonical(parts[0], self.OS_ALIASES)
+        arch = self._canonical(parts[1], self.ARCH_ALIASES) if len(parts) > 1 and parts[1] else None
+        if os_name is None or (len(parts) > 1 and parts[1] and arch is None):
+            raise ValueError(f"无法识别的平台: {value}, 可选系统: {', '.join(self.OS_ALIASES)}, "
+                             f"可选架构: {', '.join(self.ARCH_ALIASES)}")
+        return os_name, arch
+
+    @staticmethod
+    def _canonical(value: str, aliases: Dict[str, Tuple[str, ...]]) -> Optional[str]:
+        for name, names in aliases.items():
+            if value == name or value in names:
+                return name
+        return None
+
+    @staticmethod
+    def _detect(file_name: str, regexes: List[Tuple[str, Pattern]]) -> set:
+        """文件名中出现的标记，匹配过的部分不再参与较短别名的匹配"""
+        name, found = file_name.lower(), set()
+        for key, regex in regexes:
+            name, count = regex.subn(' ', name)
+            if count:
+                found.add(key)
+        return found
+
+    def match_platform(self, file_name: str) -> bool:
+        """文件名中的系统 / 架构标记是否符合 platforms，没有标记的文件视为通用文件"""
+        if not self.platforms:
+            return True
+        systems = self._detect(file_name, self._os_regex)
+        if not systems:
+            return True
+        arches = self._detect(file_name, self._arch_regex)
+        for os_name, arch in self.platforms:
+            if os_name in systems and (arch is None or not arches or arch in arches):
+                return True
+        return False
+
+    # ---------- 版本 ----------
+
+    @staticmethod
+    def version_key(version: str) -> Tuple[int, ...]:
+        """v1.10.2-rc1 -> (1, 10, 2, 1)，用于比较版本大小"""
+        return tuple(int(part) for part in re.findall(r'\d+', version))
+
+    def _parse_version_rule(self, rule: str) -> Callable[[str], Optional[bool]]:
+        """>=1.2 / <2 / ==1.5.0 比较版本号，其他为版本名称的 glob 通配符 (例如 v2.*)"""
+        match = re.fullmatch(r'(>=|<=|==|!=|>|<|=)\s*(.+)', rule.strip())
+        if not match:
+            glob = rule.strip().lower()
+            return lambda version: fnmatchcase(version.lower(), glob)
+        compare, bound = self._OPERATORS[match.group(1)], self.version_key(match.group(2))
+        if not bound:
+            raise ValueError(f"无法解析的版本范围: {rule}")
+
+        def check(version: str) -> Optional[bool]:
+            key = self.version_key(version)
+            # 没有数字的版本无法比较，返回 None 表示不过滤
+            return compare(key, bound) if key else None
+        return check
+
+    def match_version(self, version: str) -> bool:
+        """版本是否在 versions 范围内；latest (没有 release 的仓库) 和无法比较的版本不过滤"""
+        if not self.versions or not version or version == 'latest':
+            return True
+        return all(rule(version) is not False for rule in self.versions)
+
+    # ---------- 文件 ----------
+
+    def match_name(self, file_name: str) -> bool:
+        if self.include and not any(match(file_name) for match in self.include):
+            return False
+        return not any(match(file_name) for match in self.exclude)
+
+    def match_asset(self, data: Dict[str, Any]) -> Optional[str]:
+        """文件是否需要下载，需要时返回 None，否则返回不下载的原因"""
+        if data.get('source_code'):
+            return None if self.source_code else "source_code = false"
+        file_name = data['file_name']
+        if not self.match_name(file_name):
+            return "include / exclude"
+        size = data.get('size')
+        if self.max_size and size and int(size) > self.max_size:
+            return f"大小 {int(size)} 超过 max_size {self.max_size}"
+        if not self.match_platform(file_name):
+            return "platforms"
+        return None
+
+    def apply(self, download: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """过滤单个版本的文件
+
+        :returns (过滤后的版本信息，版本不在范围内时为 None, 被过滤掉的文件列表)
+        """
+        if not self.enabled:
+            return download, []
+        if not self.match_version(download.get('file_version', '')):
+            self.logger.info(f"版本 {download.get('file_version')} 不在版本范围内，跳过")
+            return None, list(download.get('data', []))
+        kept, skipped = [], []
+        for data in download.get('data', []):
+            reason = self.match_asset(data)
+            if reason is None:
+                kept.append(data)
+            else:
+                skipped.append(data)
+                self.logger.info(f"版本 {download.get('file_version')} 文件 {data['file_name']} 不符合过滤规则 ({reason})，跳过")
+        return dict(download, data=kept), skipped
+
+    def select(self, version_information: Iterable[Dict[str, Any]],
+               on_skip: Optional[Callable[[List[Dict[str, Any]]], None]] = None) -> Iterator[Dict[str, Any]]:
+        """逐个版本过滤 (可以是 iter_request() 的迭代器)，达到 newest 个版本后停止迭代，不再获取后面的版本
+
+        :param on_skip: 每个版本被过滤掉的文件列表的回调 (统计)
+        """
+        count = 0
+        for download in version_information:
+            download, skipped = self.apply(download)
+            if skipped and on_skip:
+                on_skip(skipped)
+            if download is None:
+                continue
+            yield download
+            count += 1
+            if self.reached_newest(count):
+                return
+
+    def reached_newest(self, count: int) -> bool:
+        """已经处理了 newest 个版本"""
+        if self.newest and count >= self.newest:
+            self.logger.info(f"已处理最新的 {self.newest} 个版本，不再获取更早的版本")
+            return True
+        return False
@@ -0,0 +1,562 @@
+import io
+import os
+import json
+import asyncio
+import hashlib
+import functools
+import logging
+import contextlib
+from collections import deque
+from urllib.parse import urljoin, urlparse
+from typing import Optional, List, Dict, Any, Tuple, Callable, Union, AsyncIterator
+from .github import GithubDownloader
+from .github_api import GithubApiDownloader
+from .governor import RateGovernor
+from .bandwidth import BandwidthLimiter
+from .base import _RetryableDownloadError
+
+
+class AsyncGithubEngine:
+    """基于 asyncio 的抓取 + 下载引擎
+
+    在单个事件循环中以协程完成 tags/main/latest-commit/release/expanded_assets 页面的抓取和文件的流式下载，
+    页面请求和文件下载分别由信号量限制并发，替代 "项目线程池 x 每个项目的下载线程池" 的多层线程模型。
+    页面解析、下载前的预处理和下载后的处理都复用 GithubDownloader 的实现。
+    """
+
+    logger = logging.getLogger('AsyncGithubEngine')
+
+    def __init__(self, max_requests: int = 16, max_downloads: int = 8,
+                 chunk_size: int = 1024 * 1024,
+                 should_stop: Optional[Callable[[], bool]] = None):
+        """
+        :param max_requests: 同时进行的页面请求数
+        :param max_downloads: 同时进行的文件下载数
+        :param chunk_size: 下载时每次读取的块大小
+        :param should_stop: 返回 True 时停止所有任务
+        """
+        try:
+            import aiohttp
+        except ImportError:
+            raise ImportError("异步引擎需要安装 aiohttp: pip install aiohttp")
+        self._aiohttp = aiohttp
+
+        self.max_requests = int(max_requests)
+        self.max_downloads = int(max_downloads)
+        self.chunk_size = int(chunk_size)
+        self.should_stop = should_stop or (lambda: False)
+
+        self._session = None
+        self._request_sem = None
+        self._download_sem = None
+
+    # ---------- 请求辅助 ----------
+
+    def _check_abort(self, downloader: GithubDownloader) -> None:
+        if self.should_stop():
+            downloader.request_abort()
+        downloader._check_abort()
+
+    @staticmethod
+    def _request_options(downloader: GithubDownloader, headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """把 requests 风格的 kwargs 转换为 aiohttp 的请求参数"""
+        merged = dict(downloader.kwargs.get('headers') or {})
+        merged.update(headers or {})
+
+        options = {
+            # aiohttp 不接受值为 None 的请求头
+            "headers": {k: v for k, v in merged.items() if v is not None},
+            "ssl": None if downloader.kwargs.get('verify') else False,
+        }
+
+        proxies = downloader.kwargs.get('proxies') or {}
+        proxy = proxies.get('https') or proxies.get('http')
+        if proxy:
+            if proxy.startswith('socks'):
+                raise ValueError(f"异步引擎不支持 socks 代理: {proxy}")
+            options["proxy"] = proxy
+        return options
+
+    @contextlib.asynccontextmanager
+    async def _send(self, method: str, url: str, **kwargs):
+        """经过 RateGovernor 按主机限速的请求，被限流时等待后重试，对应 CountingHTTPAdapter.send"""
+        host = urlparse(url).hostname or ''
+        attempt = 0
+        while True:
+            wait = RateGovernor.reserve(host)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            response = await self._session.request(method, url, **kwargs)
+            if RateGovernor.observe(host, response.status, response.headers, attempt) is None:
+                break
+            try:
+                await response.read()
+            except self._aiohttp.ClientError:
+                pass
+            response.release()
+            attempt += 1
+        try:
+            yield response
+        finally:
+            response.release()
+
+    def _timeout(self, downloader: GithubDownloader, stream: bool = False):
+        timeout = downloader.kwargs.get('timeout', 10)
+        if stream:
+            # 流式下载只限制连接和单次读取的时间
+            return self._aiohttp.ClientTimeout(total=None, sock_connect=timeout, sock_read=timeout)
+        return self._aiohttp.ClientTimeout(total=timeout)
+
+    async def _get_parsed(self, downloader: GithubDownloader, url: str, parse: Callable[[bytes], Any],
+                          headers: Optional[Dict[str, str]] = None, raise_for_status: bool = True) -> Any:
+        """带条件请求头 GET 页面并用 parse 解析页面内容 (bytes)，服务器返回 304 时复用 http_cache 中上次的解析结果"""
+        # http_cache 读写 SQLite，在线程池中执行
+        request_headers, cached = await self._blocking(downloader.http_cache.conditional_headers, url, headers)
+        async with self._request_sem:
+            self._check_abort(downloader)
+            async with self._send('GET', url, timeout=self._timeout(downloader),
+                                  **self._request_options(downloader, request_headers)) as response:
+                downloader._count_request(response.status)
+                not_modified = response.status == 304 and cached is not None
+                downloader.http_cache.record(not_modified)
+                if not_modified:
+                    downloader.logger.info(f"页面未变化(304)，使用上次的解析结果: {url}")
+                    return cached['parsed']
+                if raise_for_status:
+                    response.raise_for_status()
+                body = await response.read()
+                ok, etag, last_modified = response.ok, response.headers.get('ETag'), response.headers.get('Last-Modified')
+
+        # 解析在线程池中执行 (启用 ParsePool 时线程等待子进程的结果)，不阻塞事件循环
+        parsed = await self._blocking(parse, body)
+        if ok:
+            await self._blocking(downloader.http_cache.put, url, etag, last_modified, parsed)
+        return parsed
+
+    async def _get_filename(self, downloader: GithubDownloader, url: str) -> Optional[str]:
+        """HEAD 请求获取文件名，对应 DownloaderBase.get_filename_from_response"""
+        try:
+            async with self._request_sem:
+                async with self._send('HEAD', url, allow_redirects=True, timeout=self._timeout(downloader),
+                                      **self._request_options(downloader)) as response:
+                    downloader._count_request(response.status)
+                    response.raise_for_status()
+                    return downloader._parse_filename(url, response.headers.get('Content-Disposition', ''))
+        except self._aiohttp.ClientError as e:
+            self.logger.error(f"请求失败: {e}")
+            return None
+
+    # ---------- 页面抓取 ----------
+
+    async def has_changes(self, downloader: GithubDownloader) -> bool:
+        """对应 GithubDownloader.has_changes"""
+        if isinstance(downloader, GithubApiDownloader):
+            # API 后端通过 API 的条件请求检测，在线程中执行
+            return await self._blocking(downloader.has_changes)
+        downloader._feed_fingerprint = None
+        if not downloader.feed_precheck:
+            return True
+        try:
+            head = None
+            for feed_url in downloader._feed_urls():
+                async with self._request_sem:
+                    async with self._send('GET', feed_url, timeout=self._timeout(downloader),
+                                          **self._request_options(downloader)) as response:
+                        downloader._count_request(response.status)
+                        response.raise_for_status()
+                        body = await response.read()
+                head = downloader._parse_feed_head(io.BytesIO(body))
+                if head:
+                    break
+        except Exception as e:
+            downloader.logger.warning(f"⚠获取 {downloader.project_name} feed 失败，执行完整抓取: {e}")
+            return True
+        return await self._blocking(downloader._check_feed_fingerprint, head)
+
+    async def iter_tags(self, downloader: GithubDownloader) -> AsyncIterator[Dict[str, str]]:
+        """对应 GithubDownloader.iter_tags，产出当前页的版本时下一页已经在请求"""
+        seen_versions = set()
+        url = urljoin(downloader.url, "tags")
+        seen_urls = {url}
+        pending = asyncio.ensure_future(self._get_parsed(downloader, url, downloader._parse_tag_page))
+        try:
+            while pending is not None:
+                self._check_abort(downloader)
+                tags, next_page_info = await pending
+                pending = None
+                if not downloader.only_latest and next_page_info and next_page_info['url'] not in seen_urls:
+                    self.logger.info(f"访问 tags 页面: {next_page_info['url']}")
+                    seen_urls.add(next_page_info['url'])
+                    pending = asyncio.ensure_future(
+                        self._get_parsed(downloader, next_page_info['url'], downloader._parse_tag_page))
+
+                new_tags = [tag for tag in tags if tag['version'] not in seen_versions]
+                if not new_tags and tags:
+                    downloader.logger.warning("⚠tags 页面没有新的版本，停止分页")
+                    return
+                for tag in new_tags:
+                    seen_versions.add(tag['version'])
+                    yield {"version": tag['version'], "update_time": tag['update_time'], "commit_time": tag.get('commit_time')}
+                    if downloader.only_latest:
+                        return
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    async def _analysis_main_page(self, downloader: GithubDownloader, version: Optional[str] = None) -> Dict[str, Any]:
+        """对应 GithubDownloader._analysis_main_page"""
+        main_page_url = downloader._main_page_url(version)
+        try:
+            main_info = await self._get_parsed(downloader, main_page_url,
+                                               lambda html: downloader._parse_main_page(html, version))
+        except (self._aiohttp.ClientError, asyncio.TimeoutError) as e:
+            # 解析失败时 _parse_main_page 已经发送过通知，这里只处理请求失败
+            downloader.logger.error(f"❌请求主页面失败: {str(e)}")
+            downloader._send_other_msg(title=f'访问{downloader.project_name}主页失败', message=f"URL: {main_page_url}， 版本: {version if version else 'latest'}, 错误信息: {str(e)}", msg_type='error')
+            raise
+
+        commit_time = await self._commit_time(downloader, main_info['branch'], main_info['version'])
+
+        if downloader.resolve_mode == 'fast':
+            file_name = downloader._archive_file_name(main_info['version'] or main_info['branch'])
+        else:
+            file_name = await self._get_filename(downloader, main_info['source'])
+        if not file_name:
+            downloader.logger.error("❌main页面获取源码文件名失败")
+            raise ValueError("main页面获取源码文件名失败")
+
+        return {
+            "file_name": file_name,
+            "source": main_info['source'],
+            "about": main_info['about'],
+            "exists_release": main_info['exists_release'],
+            "commit_time": commit_time,
+        }
+
+    async def _commit_time(self, downloader: GithubDownloader, branch: str, version: Optional[str] = None) -> str:
+        """对应 GithubDownloader._fetch_commit_time"""
+        commit_url = urljoin(downloader.url, f"latest-commit/{branch}")
+        commit_headers = {
+            "content-type": "application/json",
+            "cookie": "tz=Asia%2FShanghai",
+            "accept": "application/json",
+            "accept-language": "zh-CN,zh;q=0.9",
+        }
+        try:
+            return await self._get_parsed(downloader, commit_url, lambda text: json.loads(text)['date'],
+                                          headers=commit_headers)
+        except Exception as e:
+            downloader.logger.error(f"❌获取main主页的 commit 更新时间错误: {str(e)}")
+            downloader._send_other_msg(title=f'解析{downloader.project_name}主页失败', message=f"获取main主页的 commit 更新时间错误， 版本: {version or 'latest'}", msg_type='error')
+            raise
+
+    async def _analysis_release_page(self, downloader: GithubDownloader, version: str) -> Dict[str, Any]:
+        """对应 GithubDownloader._analysis_release_page，release 页面和 expanded_assets 页面并发请求"""
+        release_tag_url = urljoin(downloader.url, f"releases/tag/{version}")
+        assets_url = urljoin(downloader.url, f"releases/expanded_assets/{version}")
+        try:
+            change, data = await asyncio.gather(
+                self._get_parsed(downloader, release_tag_url, downloader._parse_release_change, raise_for_status=False),
+                self._get_parsed(downloader, assets_url, downloader._parse_expanded_assets),
+            )
+            return {"file_version": version, "change": change, "data": data}
+        except Exception as e:
+            downloader._send_other_msg(title=f'解析{downloader.project_name}项目 release 页面失败', message=f"URL: {release_tag_url}, 版本: {version}, 错误信息: {str(e)}", msg_type='error')
+            raise
+
+    async def _resolve_version(self, downloader: GithubDownloader, version: str, commit_time: Optional[str] = None,
+                               repo_info: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """对应 GithubDownloader._resolve_version，fast 模式复用 repo_info (仓库主页面的信息)"""
+        if downloader.resolve_mode == 'fast' and repo_info is not None:
+            main_page_info = downloader._version_main_info(
+                repo_info, version, commit_time or await self._commit_time(downloader, version, version))
+        else:
+            main_page_info = await self._analysis_main_page(downloader, version=version)
+        if not main_page_info['exists_release']:
+            return downloader._make_source_version(main_page_info)
+        release_info = await self._analysis_release_page(downloader, version)
+        return downloader._make_release_version(release_info, main_page_info)
+
+    async def request(self, downloader: GithubDownloader) -> List[Dict[str, Any]]:
+        """对应 GithubDownloader.request，各个版本的页面并发抓取"""
+        return [version async for version in self.iter_request(downloader, lookahead=0)]
+
+    async def iter_request(self, downloader: GithubDownloader, lookahead: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """对应 GithubDownloader.iter_request，按 tags 顺序产出版本信息，最多提前解析 lookahead 个版本 (0 为不限制)"""
+        if isinstance(downloader, GithubApiDownloader):
+            # API 后端请求数很少，直接在线程中执行，不阻塞事件循环
+            for version in await asyncio.get_running_loop().run_in_executor(None, downloader.request):
+                yield version
+            return
+
+        main_page_info = await self._analysis_main_page(downloader)
+        if not main_page_info['exists_release']:
+            yield downloader._make_source_version(main_page_info)
+            return
+
+        # 每解析完一页 tags 就开始解析该页的版本
+        lookahead = downloader.threads if lookahead is None else lookahead
+        pending = deque()
+        tags = self.iter_tags(downloader)
+        try:
+            while True:
+                try:
+                    tag = await tags.__anext__()
+                except StopAsyncIteration:
+                    break
+                except Exception as e:
+                    downloader._notify_tags_error(e)
+                    raise
+                if not downloader.asset_filter.match_version(tag['version']):
+                    continue
+                pending.append(asyncio.ensure_future(
+                    self._resolve_version(downloader, tag['version'], tag.get('commit_time'), main_page_info)))
+                if lookahead and len(pending) >= lookahead:
+                    yield await pending.popleft()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for task in pending:
+                task.cancel()
+            await tags.aclose()
+
+    async def iter_filter(self, downloader: GithubDownloader,
+                          version_information: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+        """对应 GithubDownloader.iter_filter，达到 newest 个版本后停止迭代"""
+        asset_filter = downloader.asset_filter
+        count = 0
+        try:
+            async for download in version_information:
+                download, skipped = asset_filter.apply(download)
+                if skipped:
+                    downloader._count_filtered(skipped)
+                if download is None:
+                    continue
+                yield download
+                count += 1
+                if asset_filter.reached_newest(count):
+                    return
+        finally:
+            await version_information.aclose()
+
+    # ---------- 下载 ----------
+
+    @staticmethod
+    async def _blocking(func: Callable[..., Any], *args, **kwargs) -> Any:
+        """在默认线程池中执行阻塞的文件 / 状态库操作，避免一个大文件阻塞所有项目的请求和下载"""
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+    @staticmethod
+    def _fsync(f) -> None:
+        f.flush()
+        os.fsync(f.fileno())
+
+    def _is_retryable(self, downloader: GithubDownloader, error: Exception) -> bool:
+        """对应 DownloaderBase._is_retryable：连接中断 / 超时 / 数据不完整 / 5xx 可以重试"""
+        if isinstance(error, self._aiohttp.ClientResponseError):
+            return error.status >= 500 or error.status in (408, 429)
+        if isinstance(error, (self._aiohttp.ClientConnectionError, self._aiohttp.ClientPayloadError, asyncio.TimeoutError)):
+            return True
+        return downloader._is_retryable(error)
+
+    async def _download_file(self, downloader: GithubDownloader, url: str, output_file: str,
+                             file_name: str, version: str, update_time, is_source_code,
+                             file_hash: str = None) -> bool:
+        """对应 DownloaderBase._download_file，写入时计算 sha256 并在重命名前校验，连接中断时续传重试"""
+        async with self._download_sem:
+            task_id = downloader.progress.add_task("download", filename=file_name, start=False)
+            temp_file = output_file + '.tmp'
+            try:
+                attempt = 0
+                while True:
+                    try:
+                        digest, etag = await self._download_attempt(downloader, url, temp_file, task_id)
+                        break
+                    except Exception as e:
+                        if downloader._abort_flag or attempt >= downloader.retries or not self._is_retryable(downloader, e):
+                            raise
+                        attempt += 1
+                        wait = downloader._retry_wait(attempt)
+                        downloader._count_transfer(retries=1)
+                        downloader.logger.warning(f"⚠下载 {url} 失败: {e}，{wait:.1f}s 后第 {attempt} / {downloader.retries} 次重试")
+                        await asyncio.sleep(wait)
+                        self._check_abort(downloader)
+
+                try:
+                    downloader._verify_download_digest(file_name, digest, file_hash)
+                except ValueError:
+                    await self._blocking(downloader._discard_partial, temp_file)
+                    raise
+                await self._blocking(self._complete_download, downloader, temp_file, output_file, digest, etag,
+                                     version, file_name, update_time, is_source_code)
+                downloader.progress.remove_task(task_id)
+                return True
+            except Exception as e:
+                downloader.logger.error(f"下载文件 {file_name} 版本: {version} 失败: {str(e)}")
+                downloader._send_download_failure_single_file_notification(version, file_name, str(e))
+                # 有续传记录的临时文件保留，下次运行从已保存的位置继续
+                await self._blocking(self._discard_unresumable, downloader, temp_file)
+                raise
+
+    @staticmethod
+    def _discard_unresumable(downloader: GithubDownloader, temp_file: str) -> None:
+        """删除没有续传记录的临时文件，在线程池中执行"""
+        if downloader._load_resume(temp_file) is None and os.path.exists(temp_file):
+            os.remove(temp_file)
+
+    @staticmethod
+    def _complete_download(downloader: GithubDownloader, temp_file: str, output_file: str, digest: str,
+                           etag: Optional[str], version: str, file_name: str, update_time, is_source_code) -> None:
+        """重命名临时文件 (旧的 latest 移到历史版本)、加入内容存储并记录下载，在线程池中执行"""
+        downloader._remove_resume(temp_file)
+        downloader._finalize_download(temp_file, output_file, version, update_time)
+        downloader._add_to_store(output_file, digest)
+        downloader._record_download(output_file, digest, etag, version, file_name, update_time, is_source_code)
+
+    async def _download_attempt(self, downloader: GithubDownloader, url: str, temp_file: str, task_id) -> Tuple[str, Optional[str]]:
+        """对应 DownloaderBase._download_single_attempt"""
+        # 续传记录和临时文件的读取在线程池中执行
+        offset, validator, resume = await self._blocking(downloader._resume_point, url, temp_file)
+        async with self._send('GET', url, timeout=self._timeout(downloader, stream=True),
+                              **self._request_options(downloader, downloader._resume_headers(offset, validator) or None)) as response:
+            downloader._count_request(response.status)
+            response.raise_for_status()
+            offset, total_size, validator = await self._blocking(
+                downloader._check_resume_response, url, temp_file, offset, validator, resume, response.status, response.headers)
+
+            hash_obj = hashlib.sha256()
+            if offset:
+                # 续传时已下载部分的 sha256，大文件读取时间较长，不在事件循环中执行
+                await self._blocking(downloader._hash_file_into, temp_file, hash_obj, limit=offset)
+            downloader.progress.start_task(task_id)
+            downloader.progress.update(task_id, total=total_size or 0, completed=offset)
+
+            position = synced = offset
+            with open(temp_file, 'r+b' if offset else 'wb') as f:
+                f.seek(offset)
+                f.truncate()
+                try:
+                    async for chunk in response.content.iter_chunked(
+                            BandwidthLimiter.chunk_size(downloader.project_name, self.chunk_size)):
+                        self._check_abort(downloader)
+                        f.write(chunk)
+                        hash_obj.update(chunk)
+                        position += len(chunk)
+                        downloader.progress.update(task_id, advance=len(chunk))
+                        wait = BandwidthLimiter.reserve(downloader.project_name, len(chunk))
+                        if wait > 0:
+                            await asyncio.sleep(wait)
+                        if validator and position - synced >= downloader.FSYNC_INTERVAL:
+                            synced = await self._blocking(downloader._sync_partial, f, temp_file, url, position,
+                                                          validator, total_size)
+                finally:
+                    if validator and position > synced:
+                        synced = await self._blocking(downloader._sync_partial, f, temp_file, url, position,
+                                                      validator, total_size)
+                    else:
+                        await self._blocking(self._fsync, f)
+            etag = response.headers.get('ETag')
+
+        if total_size and position != total_size:
+            raise _RetryableDownloadError(f"下载数据不完整: {position} / {total_size}")
+        return hash_obj.hexdigest(), etag
+
+    async def download(self, downloader: GithubDownloader,
+                       version_information: Union[List[Dict[str, Any]], AsyncIterator[Dict[str, Any]]]) -> int:
+        """对应 DownloaderBase._output_download，version_information 可以是 iter_request() 返回的异步迭代器，返回处理的版本数"""
+        count = 0
+        downloader._failed_downloads = 0
+        try:
+            if hasattr(version_information, '__aiter__'):
+                async for download in version_information:
+                    await self._download_version(downloader, download)
+                    count += 1
+            else:
+                for download in version_information:
+                    await self._download_version(downloader, download)
+                    count += 1
+        finally:
+            downloader.flush_notifications()
+        return count
+
+    async def _download_version(self, downloader: GithubDownloader, download: Dict[str, Any]) -> None:
+        """下载单个版本的所有文件"""
+        self._check_abort(downloader)
+
+        file_output_path = os.path.join(downloader.output_path, download["file_version"])
+        os.makedirs(file_output_path, exist_ok=True)
+
+        # 已有文件的 sha256 校验、状态库查询、从内容存储链接文件都是阻塞操作，在线程池中执行
+        download_tasks = await self._blocking(downloader._prepare_download_tasks, download, file_output_path)
+        if not download_tasks:
+            await self._blocking(downloader._record_version, download)
+            return
+
+        with downloader.progress:
+            results = await asyncio.gather(
+                *(self._download_file(downloader, *task) for task in download_tasks),
+                return_exceptions=True
+            )
+        for task, result in zip(download_tasks, results):
+            if isinstance(result, BaseException):
+                downloader._failed_downloads += 1
+                downloader.logger.error(f"文件 {task[2]} 下载失败: {str(result)}")
+            else:
+                downloader.logger.info(f"文件 {task[2]} 下载成功")
+
+        await self._blocking(downloader._process_download_results, download, file_output_path)
+
+    # ---------- 执行 ----------
+
+    async def run_project(self, downloader: GithubDownloader, action_type: str = 'download') -> Union[List[Dict[str, Any]], None]:
+        """执行单个项目：download 抓取并下载，update 只检查更新，verify 只校验已下载文件"""
+        if action_type == 'verify':
+            version_information = downloader.filter(await self.request(downloader))
+            # 校验要读取整个文件计算 hash，在线程池中执行
+            await self._blocking(downloader.verify_files, version_information)
+            return version_information
+
+        if not await self.has_changes(downloader):
+            return []
+
+        if action_type == 'update':
+            # 只检查更新，没有下载，不记录 feed 指纹 (否则之后的 download 会因为 feed 没有变化被跳过)
+            return await self._blocking(downloader.check_updates, downloader.filter(await self.request(downloader)))
+        # 边解析版本边下载
+        await self.download(downloader, self.iter_filter(downloader, self.iter_request(downloader)))
+        # 有文件下载失败时不记录，下次运行重新抓取
+        await self._blocking(downloader.commit_feed_fingerprint)
+        return None
+
+    async def run(self, jobs: List[Tuple[GithubDownloader, str]],
+                  on_complete: Optional[Callable[[GithubDownloader, Optional[BaseException]], None]] = None) -> None:
+        """并发执行所有项目
+
+        :param jobs: [(下载器, 操作类型)]
+        :param on_complete: 每个项目结束时回调 (下载器, 异常 | None)
+        """
+        self._request_sem = asyncio.Semaphore(self.max_requests)
+        self._download_sem = asyncio.Semaphore(self.max_downloads)
+        connector = self._aiohttp.TCPConnector(limit=self.max_requests + self.max_downloads)
+
+        async def _run_one(downloader: GithubDownloader, action_type: str):
+            error = None
+            try:
+                await self.run_project(downloader, action_type)
+            except Exception as e:
+                error = e
+                self.logger.error(f"项目 {downloader.project_name} 执行失败: {e}")
+            if on_complete:
+                on_complete(downloader, error)
+
+        async with self._aiohttp.ClientSession(connector=connector, trust_env=True) as session:
+            self._session = session
+            try:
+                await asyncio.gather(*(_run_one(downloader, action_type) for downloader, action_type in jobs))
+            finally:
+                self._session = None
+
+    def execute(self, jobs: List[Tuple[GithubDownloader, str]],
+                on_complete: Optional[Callable[[GithubDownloader, Optional[BaseException]], None]] = None) -> None:
+        """同步入口，在新的事件循环中执行 run()"""
+        asyncio.run(self.run(jobs, on_complete))
@@ -0,0 +1,215 @@
+import re
+import time
+import logging
+from datetime import datetime
+from threading import Lock
+from typing import Optional, Dict, Any, List, Tuple, Union
+
+from rich.progress import ProgressColumn
+from rich.text import Text
+
+from .units import parse_size, format_rate
+
+
+class BandwidthSchedule:
+    """按时间段的带宽上限，例如 09:00-18:00=2M, 18:00-09:00=0
+
+    每个时间段为 开始-结束=速率 (字节/秒，支持 K/M/G 后缀，0 为不限速)，结束时间小于开始时间时跨过午夜，
+    多个时间段用逗号或分号分隔，按顺序使用第一个匹配的时间段，都不匹配时使用默认速率。
+    """
+
+    def __init__(self, default: Union[int, str, None] = 0, schedule: Optional[str] = None):
+        self.default = parse_size(default, 0)
+        self.windows: List[Tuple[int, int, int]] = []
+        for item in re.split(r'[,;\n]', schedule or ''):
+            item = item.strip()
+            if not item:
+                continue
+            match = re.fullmatch(r'(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})\s*=\s*(.+)', item)
+            if not match:
+                raise ValueError(f"无法解析的带宽时间段: {item}, 格式为 09:00-18:00=2M")
+            start = int(match.group(1)) * 60 + int(match.group(2))
+            end = int(match.group(3)) * 60 + int(match.group(4))
+            self.windows.append((start, end, parse_size(match.group(5))))
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.default or any(rate for _, _, rate in self.windows))
+
+    def limit(self, now: Optional[datetime] = None) -> int:
+        """当前时间的带宽上限 (字节/秒)，0 为不限速"""
+        now = now or datetime.now()
+        minute = now.hour * 60 + now.minute
+        for start, end, rate in self.windows:
+            if start <= end and start <= minute < end or start > end and (minute >= start or minute < end):
+                return rate
+        return self.default
+
+
+class _ByteBucket:
+    """一个限速范围 (全局 / 单个项目) 的字节令牌桶和统计"""
+
+    __slots__ = ('schedule', 'limit', 'tokens', 'updated', 'bytes', 'waited', 'first', 'last',
+                 'window_start', 'window_bytes', 'rate')
+
+    def __init__(self, schedule: BandwidthSchedule):
+        self.schedule = schedule
+        self.limit = schedule.limit()
+        self.tokens = float(self.limit)
+        self.updated = time.monotonic()
+        self.bytes = 0
+        self.waited = 0.0
+        # 第一次 / 最后一次传输的时间，用于计算平均速率
+        self.first = None
+        self.last = None
+        # 最近一秒左右的实际速率
+        self.window_start = self.updated
+        self.window_bytes = 0
+        self.rate = 0.0
+
+    def reserve(self, size: int, now: float) -> float:
+        """记录 size 字节并返回需要等待的秒数"""
+        self.bytes += size
+        self.first = self.first if self.first is not None else now
+        self.last = now
+        self.window_bytes += size
+        if now - self.window_start >= 1.0:
+            self.rate = self.window_bytes / (now - self.window_start)
+            self.window_start, self.window_bytes = now, 0
+
+        limit = self.schedule.limit()
+        if limit != self.limit:
+            # 进入新的时间段，按新的速率重新开始
+            self.limit, self.tokens = limit, float(limit)
+        if not limit:
+            self.updated = now
+            return 0.0
+        # 最多积攒 1 秒的令牌，令牌可以为负 (已被之前的数据块预约)
+        self.tokens = min(self.tokens + (now - self.updated) * limit, float(limit))
+        self.updated = now
+        self.tokens -= size
+        wait = -self.tokens / limit if self.tokens < 0 else 0.0
+        self.waited += wait
+        return wait
+
+    def current_rate(self, now: float) -> float:
+        """最近的实际速率，超过 2 秒没有数据时为 0"""
+        if self.last is None or now - self.last > 2.0:
+            return 0.0
+        return self.rate if self.rate else self.window_bytes / max(now - self.window_start, 1e-3)
+
+    def stats(self) -> Dict[str, Any]:
+        elapsed = (self.last - self.first) if self.first is not None else 0.0
+        return {"bytes": self.bytes, "waited": self.waited, "limit": self.schedule.limit(),
+                "average": self.bytes / elapsed if elapsed > 0 else 0.0}
+
+
+class BandwidthLimiter:
+    """进程级共享的下载带宽限速 (按字节的令牌桶)
+
+    - 全局上限作用于所有项目的所有下载 (线程引擎和异步引擎共用)，项目上限只作用于该项目的下载
+    - 每个上限可以配置时间段 (BandwidthSchedule)，例如白天限速、夜间不限速
+    - 每写入一个数据块调用 reserve() 预约，同时受全局和项目的限制，返回需要等待的秒数 (调用方负责 sleep)
+    """
+
+    logger = logging.getLogger('BandwidthLimiter')
+    _lock = Lock()
+    _global = _ByteBucket(BandwidthSchedule())
+    _projects: Dict[str, _ByteBucket] = {}
+
+    @classmethod
+    def configure(cls, limit: Union[int, str, None] = None, schedule: Optional[str] = None) -> None:
+        """设置全局的带宽上限和时间段，统计重新开始"""
+        bucket = _ByteBucket(BandwidthSchedule(limit, schedule))
+        with cls._lock:
+            cls._global = bucket
+        if bucket.schedule.enabled:
+            cls.logger.info(f"全局下载带宽上限: {cls.describe_schedule(bucket.schedule)}")
+
+    @classmethod
+    def configure_project(cls, project: str, limit: Union[int, str, None] = None, schedule: Optional[str] = None) -> None:
+        """设置项目的带宽上限和时间段 (没有配置时只统计不限速)"""
+        bucket = _ByteBucket(BandwidthSchedule(limit, schedule))
+        with cls._lock:
+            cls._projects[project] = bucket
+        if bucket.schedule.enabled:
+            cls.logger.info(f"{project} 下载带宽上限: {cls.describe_schedule(bucket.schedule)}")
+
+    @staticmethod
+    def describe_schedule(schedule: BandwidthSchedule) -> str:
+        parts = [f"{start // 60:02d}:{start % 60:02d}-{end // 60:02d}:{end % 60:02d} "
+                 f"{format_rate(rate) if rate else '不限速'}" for start, end, rate in schedule.windows]
+        parts.append(f"其他时间 {format_rate(schedule.default) if schedule.default else '不限速'}")
+        return ", ".join(parts)
+
+    @classmethod
+    def _project(cls, project: str) -> _ByteBucket:
+        bucket = cls._projects.get(project)
+        if bucket is None:
+            bucket = cls._projects[project] = _ByteBucket(BandwidthSchedule())
+        return bucket
+
+    @classmethod
+    def reserve(cls, project: str, size: int) -> float:
+        """记录项目下载的 size 字节，返回发送下一个数据块前需要等待的秒数"""
+        now = time.monotonic()
+        with cls._lock:
+            buckets = (cls._global, cls._project(project))
+            wait = max([bucket.reserve(size, now) for bucket in buckets])
+            # 等待结束才算传输完成 (平均速率按传输完成的时间计算)
+            for bucket in buckets:
+                bucket.last = now + wait
+            return wait
+
+    @classmethod
+    def consume(cls, project: str, size: int) -> float:
+        """reserve() 并等待，返回等待的秒数"""
+        wait = cls.reserve(project, size)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    @classmethod
+    def limit(cls, project: str) -> int:
+        """项目当前生效的带宽上限 (全局和项目上限中较小的)，0 为不限速"""
+        with cls._lock:
+            limits = [limit for limit in (cls._global.schedule.limit(), cls._project(project).schedule.limit()) if limit]
+        return min(limits) if limits else 0
+
+    @classmethod
+    def chunk_size(cls, project: str, chunk_size: int) -> int:
+        """限速时缩小每次读取的数据块 (约 1/4 秒的数据)，让速率更平稳，避免长时间不读取连接"""
+        limit = cls.limit(project)
+        return min(chunk_size, max(limit // 4, 16 * 1024)) if limit else chunk_size
+
+    @classmethod
+    def current_rate(cls, project: Optional[str] = None) -> float:
+        """项目 (不指定时为全局) 最近的实际下载速率 (字节/秒)"""
+        now = time.monotonic()
+        with cls._lock:
+            return (cls._project(project) if project else cls._global).current_rate(now)
+
+    @classmethod
+    def stats(cls) -> Dict[str, Dict[str, Any]]:
+        """{"global": {...}, 项目名称: {...}}，每项为 {"bytes", "waited", "limit", "average"}"""
+        with cls._lock:
+            result = {"global": cls._global.stats()}
+            result.update({project: bucket.stats() for project, bucket in cls._projects.items()})
+            return result
+
+
+class BandwidthColumn(ProgressColumn):
+    """进度条中显示项目的实际下载速率和当前生效的带宽上限"""
+
+    max_refresh = 0.5
+
+    def __init__(self, project: str):
+        super().__init__()
+        self.project = project
+
+    def render(self, task) -> Text:
+        limit = BandwidthLimiter.limit(self.project)
+        if not limit:
+            return Text("")
+        rate = BandwidthLimiter.current_rate(self.project)
+        return Text(f"项目 {format_rate(rate)} / 限速 {format_rate(limit)}", style="progress.data.speed")
@@ -1,5 +1,7 @@
 import os
 import re
+import json
+import random
 import shutil
 import requests
 import hashlib
@@ -19,7 +21,7 @@ from dateutil import parser
 from threading import Lock
 from abc import ABC, abstractmethod
 from urllib.parse import unquote, urlparse
-from typing import Optional, Dict, Any, List, Union
+from typing import Optional, Dict, Any, List, Union, Iterable
 from urllib3.exceptions import InsecureRequestWarning
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from colorama import Fore, Style, init
@@ -34,12 +36,25 @@ from rich.progress import (
     TimeRemainingColumn,
     TextColumn
 )
+from .session import SessionManager
+from .hash_cache import HashCache
+from .state import StateStore
+from .http_cache import HttpCache
+from .scheduler import DownloadScheduler
+from .units import parse_size
+from .content_store import ContentStore
+from .bandwidth import BandwidthLimiter, BandwidthColumn
+from .notifier import NotificationQueue
 
 
 init(autoreset=True)
 ROOT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
 
 
+class _RetryableDownloadError(Exception):
+    """可以重试的下载错误 (数据不完整 / Content-Range 与请求不一致)，重试时从上次 fsync 的位置继续"""
+
+
 class DingTalkNotifier:
     """钉钉机器人通知类"""
 
@@ -154,8 +169,27 @@ class DownloaderBase(ABC):
                  only_latest: bool = True,
                  threads: int = 4,
                  log_file: str = None,
+                 segments: int = 1,
+                 min_segment_size: Union[int, str] = 16 * 1024 * 1024,
+                 full_verify: bool = False,
+                 state_db: str = None,
+                 retries: int = 3,
+                 content_store: Union[bool, str, None] = None,
+                 bandwidth_limit: Union[int, str, None] = None,
+                 bandwidth_schedule: Optional[str] = None,
                  **kwargs):
-        """初始化下载基类。"""
+        """初始化下载基类。
+
+        segments 大于 1 时，支持 Range 的大文件会被拆分为多段并行下载，每段不小于 min_segment_size 字节；
+        第一段之外的分段占用下载调度器的名额 (计入全局、主机和项目的并发上限)，名额不足时减少分段数。
+        full_verify 为 True 时校验文件忽略哈希缓存，全部重新计算。
+        state_db 为版本状态库路径，默认 <程序目录>/.state/state.sqlite。
+        retries 为单个文件 (分段下载时为单个分段) 连接中断 / 服务器错误后的重试次数，每次重试从已保存的位置继续。
+        content_store 为内容寻址存储的根目录，True 时使用输出目录上一级的 .store 目录 (各项目共用)，
+        相同 sha256 的文件只保存一份，版本目录中是链接。
+        bandwidth_limit / bandwidth_schedule 为本项目的下载带宽上限 (字节/秒，支持 K/M/G 后缀) 和按时间段的上限
+        (例如 09:00-18:00=2M)，和全局上限 (BandwidthLimiter.configure) 同时生效。
+        """
         # Rich 控制台和进度条初始化
         self.console = Console()
         self.progress = Progress(
@@ -168,6 +202,7 @@ class DownloaderBase(ABC):
             TransferSpeedColumn(),
             "•",
             TimeRemainingColumn(),
+            BandwidthColumn(project_name),
             console=self.console
         )
 
@@ -192,9 +227,20 @@ class DownloaderBase(ABC):
         self.project_name = project_name
         self.dingtalk_notifier = DingTalkNotifier(dingtalk_webhook, dingtalk_secret)
         self.threads = int(threads)
+        self.segments = max(int(segments or 1), 1)
+        self.min_segment_size = max(parse_size(min_segment_size, 16 * 1024 * 1024), 1)
+        self.full_verify = bool(full_verify)
+        self.retries = max(int(retries or 0), 0)
+        BandwidthLimiter.configure_project(project_name, bandwidth_limit, bandwidth_schedule)
 
         self._abort_flag = False
         self._last_progress = 0
+        # 本次运行是否有版本的文件不完整，下载失败的文件数
+        self._download_failed = False
+        self._failed_downloads = 0
+        # 下载过程中计算的 sha256 {输出文件路径: sha256}
+        self.file_digests: Dict[str, str] = {}
+        self._digest_lock = Lock()
 
         self.kwargs = kwargs
         self.kwargs["verify"] = True if bool(self.kwargs.get("verify")) else False
@@ -203,6 +249,18 @@ class DownloaderBase(ABC):
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
                           '(KHTML, like Gecko) Chrome/136.0.7103.48 Safari/537.36'
         })
+        # 本项目发出的 HTTP 请求计数 (响应钩子，包括页面、API、HEAD 和文件下载请求)
+        self._request_counts = {"requests": 0, "not_modified": 0}
+        self._request_count_lock = Lock()
+        self.kwargs['hooks'] = {'response': [self._count_response]}
+        # 传输统计 {"retries": 重试次数, "saved_bytes": 续传时不需要重新下载的字节, "refetched_bytes": 丢弃后重新下载的字节,
+        #           "store_files" / "store_bytes": 从内容存储链接、不需要下载的文件数 / 字节,
+        #           "filtered_files" / "filtered_bytes": 被过滤规则跳过的文件数 / 字节}
+        self._transfer_stats = {"retries": 0, "saved_bytes": 0, "refetched_bytes": 0, "store_files": 0, "store_bytes": 0,
+                                "filtered_files": 0, "filtered_bytes": 0}
+
+        # 共享连接池会话（按代理和SSL校验区分）
+        self.session = SessionManager.get_session(self.kwargs.get('proxies'), self.kwargs['verify'])
 
         try:
             if not os.path.exists(self.output_path):
@@ -213,6 +271,17 @@ class DownloaderBase(ABC):
             self._send_dingtalk_alert(f"{self.project_name} - 初始化失败", f"创建输出目录失败: {e}")
             raise
 
+        # 输出目录下的持久化哈希缓存
+        self.hash_cache = HashCache.for_directory(self.output_path)
+        # 已发现的版本 / 已下载的文件
+        self.state = StateStore.open(state_db or os.path.join(ROOT_PATH, '.state', 'state.sqlite'))
+        # 抓取页面的条件请求缓存，和状态库放在同一目录
+        self.http_cache = HttpCache.open(os.path.join(os.path.dirname(self.state.db_path), 'http_cache.sqlite'))
+        # 内容寻址存储，未启用时为 None
+        if content_store is True:
+            content_store = os.path.join(os.path.dirname(os.path.abspath(self.output_path)), '.store')
+        self.content_store = ContentStore.open(content_store) if content_store else None
+
         # 显示启动横幅
         self._show_startup_banner()
 
@@ -279,12 +348,44 @@ class DownloaderBase(ABC):
         """请求中止下载"""
         self._abort_flag = True
 
-    def _send_dingtalk_alert(self, title: str, message: str, msg_type: str = 'info') -> None:
-        """发送钉钉告警。"""
+    def _count_request(self, status_code: Optional[int] = None) -> None:
+        """记录一次 HTTP 请求 (异步引擎直接调用)"""
+        with self._request_count_lock:
+            self._request_counts["requests"] += 1
+            if status_code == 304:
+                self._request_counts["not_modified"] += 1
+
+    def _count_response(self, response: requests.Response, *args, **kwargs) -> None:
+        """requests 的响应钩子，重定向的每一跳都计数"""
+        self._count_request(response.status_code)
+
+    def request_stats(self) -> Dict[str, int]:
+        """本项目发出的请求数 {"requests": 总数, "not_modified": 其中 304 的次数}"""
+        with self._request_count_lock:
+            return dict(self._request_counts)
+
+    def _count_transfer(self, **counts: int) -> None:
+        with self._request_count_lock:
+            for name, value in counts.items():
+                self._transfer_stats[name] += value
+
+    def transfer_stats(self) -> Dict[str, int]:
+        """本项目的传输统计 {"retries", "saved_bytes", "refetched_bytes", "store_files", "store_bytes", "filtered_files", "filtered_bytes"}"""
+        with self._request_count_lock:
+            return dict(self._transfer_stats)
+
+    def _send_dingtalk_alert(self, title: str, message: str, msg_type: str = 'info', digest: bool = False) -> None:
+        """发送钉钉告警 (放入后台通知队列，不阻塞下载)。
+
+        digest 为 True 时 (单个文件 / 单个版本的通知) 合并到项目的汇总通知中，项目结束时作为一条消息发送。
+        """
         self.logger.info(f"发送钉钉消息: 标题: {title}, 信息: {message}")
         if not message and not title:
             self.logger.warning("⚠空标题，空消息，跳过发送")
             return
+        if digest:
+            NotificationQueue.add_to_digest(self.dingtalk_notifier, self.project_name, title, message, msg_type)
+            return
 
         if msg_type == 'success':
             title = f"✅ {title}\n\n"
@@ -304,7 +405,11 @@ class DownloaderBase(ABC):
         else:
             title = f"{title}\n\n"
             message = f"### \n\n{message}\n\n"
-        self.dingtalk_notifier.send_message(title, message)
+        NotificationQueue.submit(self.dingtalk_notifier, title, message)
+
+    def flush_notifications(self) -> None:
+        """把本项目合并中的汇总通知放入发送队列"""
+        NotificationQueue.flush(self.project_name)
 
     def _send_download_success_notification(self, version: str, file_count: str) -> None:
         """发送下载成功通知。（全局粗略信息）"""
@@ -319,7 +424,7 @@ class DownloaderBase(ABC):
                    f"**版本**: {version}</br>\n\n"
                    f"**文件数量**: {file_count}</br>\n\n"
                    f"**下载时间**: {time.strftime('%Y-%m-%d %H:%M:%S')}</br>")
-        self._send_dingtalk_alert(title, message, msg_type='success')
+        self._send_dingtalk_alert(title, message, msg_type='success', digest=True)
 
     def _send_download_warning_notification(self, version: str, file_count: str) -> None:
         """发送下载成功通知（粗略信息）。"""
@@ -334,7 +439,7 @@ class DownloaderBase(ABC):
                    f"**版本**: {version}</br>\n\n"
                    f"**文件数量**: {file_count}</br>\n\n"
                    f"**下载时间**: {time.strftime('%Y-%m-%d %H:%M:%S')}</br>")
-        self._send_dingtalk_alert(title, message, msg_type='warning')
+        self._send_dingtalk_alert(title, message, msg_type='warning', digest=True)
 
     def _send_download_failure_notification(self, version: str, file_count: str,) -> None:
         """ 发送下载错误信息，（全局粗略信息）"""
@@ -349,7 +454,7 @@ class DownloaderBase(ABC):
                    f"**版本**: {version}</br>\n\n"
                    f"**文件数量**: {file_count}</br>\n\n"
                    f"**下载时间**: {time.strftime('%Y-%m-%d %H:%M:%S')}</br>")
-        self._send_dingtalk_alert(title, message, msg_type='error')
+        self._send_dingtalk_alert(title, message, msg_type='error', digest=True)
 
     def _send_download_failure_single_file_notification(self, version: str, file_name: str, error: str) -> None:
         """发送下载失败通知。（单个文件的）"""
@@ -363,7 +468,7 @@ class DownloaderBase(ABC):
                    f"**文件**: {file_name}\n\n"
                    f"**错误**: {error}\n\n"
                    f"**时间**: {time.strftime('%Y-%m-%d %H:%M:%S')}")
-        self._send_dingtalk_alert(title, message, msg_type='error')
+        self._send_dingtalk_alert(title, message, msg_type='error', digest=True)
 
     def _send_update_notification(self, version_information: List[Dict]) -> None:
         """发送更新发现通知。"""
@@ -392,12 +497,11 @@ class DownloaderBase(ABC):
             message = (f"**项目**: {self.project_name}\n\n"
                        f"**项目描述:**\n\n: {about}\n\n"
                        f"**更新时间**: {update_time}\n\n"
-                       f"**文件列表**:\n\n\n{file_list}"
+                       f"**文件列表**:\n\n\n{file_list}\n\n"
+                       f"**版本变化**:\n\n{change}\n"
                        )
 
-            self._send_dingtalk_alert(title, message, msg_type='info')
-            message = f"{change}\n"
-            self._send_dingtalk_alert("版本变化", message, msg_type='info')
+            self._send_dingtalk_alert(title, message, msg_type='info', digest=True)
 
     def _send_other_msg(self, title: str, message: str, msg_type='info') -> None:
         """发送其他信息"""
@@ -444,8 +548,12 @@ class DownloaderBase(ABC):
         return hash_obj.hexdigest().lower().strip()
 
     @classmethod
-    def verify_hash(cls, file_path: str, file_hash: str = None, hash_type: str = 'md5') -> bool:
-        """验证文件哈希值是否符合预期。"""
+    def verify_hash(cls, file_path: str, file_hash: str = None, hash_type: str = 'md5',
+                    cache: Optional[HashCache] = None, force: bool = False) -> bool:
+        """验证文件哈希值是否符合预期。
+
+        传入 cache 时优先使用缓存的哈希值（文件大小/修改时间/inode 未变化），force 为 True 时强制重新计算。
+        """
         if not file_path or not file_hash:
             cls.logger.error("验证哈希失败, 参数不完整")
             raise ValueError("验证哈希失败, 参数不完整")
@@ -460,7 +568,12 @@ class DownloaderBase(ABC):
         else:
             hash_str = file_hash.lower().strip()
 
-        local_file_hash = DownloaderBase._get_file_hash(file_path, hash_type)
+        if cache is not None:
+            local_file_hash = cache.get_or_compute(
+                file_path, hash_type, lambda: DownloaderBase._get_file_hash(file_path, hash_type), force=force
+            )
+        else:
+            local_file_hash = DownloaderBase._get_file_hash(file_path, hash_type)
         is_same = local_file_hash.lower().strip() == hash_str
 
         if is_same:
@@ -471,28 +584,32 @@ class DownloaderBase(ABC):
         return is_same
 
     @staticmethod
-    def get_filename_from_response(url: str) -> Optional[str]:
+    def get_filename_from_response(url: str, **kwargs) -> Optional[str]:
         """从URL响应中获取文件名。"""
         try:
-            response = requests.head(url, allow_redirects=True)
+            session = SessionManager.get_session(kwargs.get('proxies'), kwargs.get('verify', True))
+            response = session.head(url, allow_redirects=True, **kwargs)
             response.raise_for_status()
-
-            content_disposition = response.headers.get('Content-Disposition', '')
-            if content_disposition:
-                filename_match = re.findall('filename[^;=\n]*=(([\'"]).*?\2|[^;\n]*)', content_disposition)
-                if filename_match:
-                    return unquote(filename_match[0][0].strip('"\''))
-
-            parsed_url = urlparse(url)
-            path = parsed_url.path
-            if path:
-                return unquote(path.split('/')[-1]).replace('@', '-')
-
-            return None
+            return DownloaderBase._parse_filename(url, response.headers.get('Content-Disposition', ''))
         except requests.exceptions.RequestException as e:
             print(f"请求失败: {e}")
             return None
 
+    @staticmethod
+    def _parse_filename(url: str, content_disposition: str = '') -> Optional[str]:
+        """优先从 Content-Disposition 中获取文件名，失败则从URL中获取。"""
+        if content_disposition:
+            filename_match = re.findall('filename[^;=\n]*=(([\'"]).*?\2|[^;\n]*)', content_disposition)
+            if filename_match:
+                return unquote(filename_match[0][0].strip('"\''))
+
+        parsed_url = urlparse(url)
+        path = parsed_url.path
+        if path:
+            return unquote(path.split('/')[-1]).replace('@', '-')
+
+        return None
+
     @staticmethod
     def _convert_to_timestamp(time_input: Union[datetime, float, str]) -> float:
         """
@@ -608,7 +725,13 @@ class DownloaderBase(ABC):
         data_markdown_list = """| 名称 | hash | 更新时间 |
 | ----------- | ----------- |-----------|"""
         for data in version_information["data"]:
-            data_markdown_list += f"""\n|{data['file_name']} | {data['file_hash']} | {data['update_time']} |"""
+            file_hash = data['file_hash']
+            if not file_hash:
+                # 页面没有提供 hash 时，使用下载过程中计算的 sha256
+                sub_dir = 'source' if data.get('source_code') else ''
+                digest = self.file_digests.get(os.path.join(file_output_path, sub_dir, data['file_name']))
+                file_hash = f"sha256:{digest}" if digest else ""
+            data_markdown_list += f"""\n|{data['file_name']} | {file_hash} | {data['update_time']} |"""
 
         markdown_info = f""" 
 ## 版本: 
@@ -623,22 +746,34 @@ class DownloaderBase(ABC):
         with open(os.path.join(file_output_path, "说明.md"), 'w', encoding='utf-8') as f:
             f.write(markdown_info)
 
-    def check_updates(self) -> List[Dict[str, Any]]:
-        """检查是否有新版本可用（只检查不下载）。"""
+    def check_updates(self, version_information: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """检查是否有新版本可用（只检查不下载）。
+
+        version_information 为空时调用 request() 获取并按过滤规则过滤，已获取过下载信息（例如异步引擎）时可直接传入。
+        """
         self.console.print(f"[bold]正在检查 {self.project_name} 的更新...[/]")
 
         try:
-            version_information = self.request()
+            if version_information is None:
+                version_information = self.filter(self.request())
             if not version_information:
                 self.console.print("[yellow]⚠ 未获取到下载信息[/]")
                 return []
 
+            # 状态库中没有该项目的记录时（首次运行/旧版本升级），退回检测输出目录
+            use_state = self.state.has_versions(self.project_name)
+
             new_versions = []
             for version_info in version_information:
                 version = version_info.get("file_version")
                 if not version:
                     continue
 
+                if use_state:
+                    if self._is_new_version(version_info):
+                        new_versions.append(version_info)
+                    continue
+
                 version_path = os.path.join(self.output_path, version)
 
                 # 版本路径不存在 - 直接判断为存在新的版本
@@ -657,18 +792,53 @@ class DownloaderBase(ABC):
             if new_versions:
                 self.console.print(f"[green]✓ 发现 {len(new_versions)} 个新版本[/]")
                 self._send_update_notification(new_versions)
+                self.flush_notifications()
             else:
                 self.console.print("[yellow]✓ 未发现新版本[/]")
+
+            # 记录已发现的版本，下次检查不再重复通知
+            for version_info in version_information:
+                if version_info.get("file_version"):
+                    self._record_version(version_info)
             return new_versions
         except Exception as e:
             self.console.print(f"[red]✗ 检查更新失败: {e}[/]")
             self._send_dingtalk_alert(f"{self.project_name} - 检查更新失败", f"检查更新失败: {e}")
             return []
 
-    def _output_download(self, version_information: List[Dict[str, Any]],
-                         threads: int = None, chunk_size: int = 1024 * 1024) -> None:
+    @staticmethod
+    def _version_commit_time(version_info: Dict[str, Any]) -> Optional[str]:
+        """版本的 commit 时间（源码文件的更新时间）"""
+        for data in version_info.get('data', []):
+            if data.get('source_code'):
+                return data.get('update_time')
+        return None
+
+    def _is_new_version(self, version_info: Dict[str, Any]) -> bool:
+        """根据状态库判断是否为新版本：未记录过的版本，或 commit 时间晚于记录的 latest"""
+        record = self.state.get_version(self.project_name, version_info['file_version'])
+        if record is None:
+            return True
+        if version_info['file_version'] == 'latest':
+            commit_time = self._version_commit_time(version_info)
+            if commit_time and record.get('commit_time'):
+                return self._convert_to_timestamp(record['commit_time']) < self._convert_to_timestamp(commit_time)
+        return False
+
+    def _record_version(self, version_info: Dict[str, Any]) -> None:
+        self.state.record_version(self.project_name, version_info['file_version'], self._version_commit_time(version_info))
+
+    def _output_download(self, version_information: Iterable[Dict[str, Any]],
+                         threads: int = None, chunk_size: int = 1024 * 1024) -> int:
+        """逐个版本下载，version_information 可以是列表或迭代器 (边获取边下载)，返回处理的版本数
+
+        下载失败的文件数记录在 _failed_downloads，有失败时不记录 feed 指纹
+        """
+        count = 0
+        self._failed_downloads = 0
         try:
             for download in version_information:
+                count += 1
                 self._check_abort()
 
                 # 创建对应的版本目录
@@ -686,10 +856,16 @@ class DownloaderBase(ABC):
 
                     with self._project_lock:
                         self._process_download_results(download, file_output_path)
+                else:
+                    self._record_version(download)
 
         except Exception as e:
             self.logger.error(f"下载过程中出错: {str(e)}")
             raise
+        finally:
+            # 本项目各版本 / 各文件的通知合并为一条发送
+            self.flush_notifications()
+        return count
 
     def _prepare_download_tasks(self, download: Dict, output_path: str) -> List[tuple]:
         """准备下载任务（线程安全）"""
@@ -710,7 +886,14 @@ class DownloaderBase(ABC):
             else:
                 output_file = os.path.join(output_path, file_name)
 
-            if os.path.exists(output_file):
+            # 状态库中有下载记录：直接比较记录，不需要计算hash或读取修改时间
+            record = self.state.get_asset(self.project_name, file_version, file_name)
+            if record and os.path.exists(output_file):
+                if self._asset_record_matches(record, data):
+                    self.logger.info(f"文件 {file_name} 已下载（状态库记录），跳过下载")
+                    continue
+                self.logger.info(f"文件 {file_name} 与状态库记录不一致，重新下载")
+            elif os.path.exists(output_file):
                 if file_hash and not self.check_file(output_file, file_hash):
                     self.logger.warning(f"文件 {file_name} 校验不通过，重新下载")
                 else:
@@ -720,11 +903,89 @@ class DownloaderBase(ABC):
                         self.logger.info(f"源码文件 {file_name} 版本更新了")
                     else:
                         self.logger.info(f"文件 {file_name} 通过，跳过下载")
+                        # 补充状态库记录，下次不再检测文件
+                        self.state.record_asset(self.project_name, file_version, file_name,
+                                                source_code=file_is_source_code,
+                                                size=os.path.getsize(output_file),
+                                                sha256=self._expected_sha256(file_hash),
+                                                update_time=file_update_time)
                         continue
 
-            tasks.append((file_url, output_file, file_name, file_version, file_update_time, file_is_source_code))
+            # 内容存储中已有页面给出的 sha256 对应的文件 (其他版本 / 其他项目下载过)：直接链接，不需要下载
+            if self._link_from_store(output_file, file_version, file_name, file_update_time, file_is_source_code, file_hash):
+                continue
+
+            tasks.append((file_url, output_file, file_name, file_version, file_update_time, file_is_source_code, file_hash))
         return tasks
 
+    def _link_from_store(self, output_file: str, version: str, file_name: str, update_time,
+                         is_source_code, file_hash: Optional[str]) -> bool:
+        """从内容存储链接文件到输出路径，存储未启用 / 页面没有 sha256 / 存储中没有时返回 False"""
+        expected = self._expected_sha256(file_hash)
+        if self.content_store is None or not expected:
+            return False
+        temp_file = output_file + '.tmp'
+        try:
+            if not self.content_store.link(expected, temp_file):
+                return False
+            self._finalize_download(temp_file, output_file, version, update_time)
+        except OSError as e:
+            self.logger.warning(f"从内容存储链接 {file_name} 失败，重新下载: {e}")
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+            return False
+        self._record_download(output_file, expected, None, version, file_name, update_time, is_source_code)
+        self._count_transfer(store_files=1, store_bytes=os.path.getsize(output_file))
+        self.logger.info(f"文件 {file_name} 在内容存储中已存在，从存储链接，跳过下载")
+        return True
+
+    def _asset_record_matches(self, record: Dict[str, Any], data: Dict[str, Any]) -> bool:
+        """状态库中的下载记录是否仍然是当前页面上的文件（hash 一致，且 latest 没有更新）"""
+        expected = self._expected_sha256(data.get('file_hash'))
+        if expected and record.get('sha256') and record['sha256'] != expected:
+            return False
+        if record.get('update_time') and data.get('update_time'):
+            return self._convert_to_timestamp(record['update_time']) >= self._convert_to_timestamp(data['update_time'])
+        return True
+
+    @staticmethod
+    def _output_file_path(output_path: str, data: Dict) -> str:
+        """文件在版本目录中的输出路径，源码放在 source 子目录"""
+        if data['source_code']:
+            return os.path.join(output_path, 'source', data['file_name'])
+        return os.path.join(output_path, data['file_name'])
+
+    def verify_files(self, version_information: List[Dict[str, Any]]) -> Dict[str, int]:
+        """校验已下载文件的哈希值（只校验不下载），full_verify 为 True 时忽略哈希缓存
+
+        :returns
+            {"passed": 通过数, "failed": 不通过数, "missing": 本地不存在数, "no_hash": 页面未提供hash数}
+        """
+        result = {"passed": 0, "failed": 0, "missing": 0, "no_hash": 0}
+        for download in version_information:
+            file_output_path = os.path.join(self.output_path, download["file_version"])
+            for data in download["data"]:
+                self._check_abort()
+                output_file = self._output_file_path(file_output_path, data)
+                if not os.path.exists(output_file):
+                    result["missing"] += 1
+                elif not data.get("file_hash"):
+                    result["no_hash"] += 1
+                elif self.check_file(output_file, data["file_hash"]):
+                    result["passed"] += 1
+                else:
+                    result["failed"] += 1
+
+        cache_stats = self.hash_cache.stats()
+        self.console.print(f"[bold]{self.project_name} 校验结果:[/] "
+                           f"通过 [green]{result['passed']}[/], 不通过 [red]{result['failed']}[/], "
+                           f"不存在 [yellow]{result['missing']}[/], 无hash {result['no_hash']}; "
+                           f"哈希缓存 命中 {cache_stats['hits']} / 未命中 {cache_stats['misses']}")
+        if result["failed"]:
+            self._send_other_msg(f"{self.project_name} 文件校验不通过",
+                                 f"{result['failed']} 个文件的 hash 与 release 页面不一致", msg_type='warning')
+        return result
+
     def _process_download_results(self, download: Dict, output_path: str):
         """处理下载结果（线程安全）"""
         version = download["file_version"]
@@ -740,10 +1001,12 @@ class DownloaderBase(ABC):
                 success_count += 1
 
         self._generate_markdown(download, output_path)
+        self._record_version(download)
         if success_count == total_count:
             self._send_download_success_notification(version, f"{success_count} / {total_count}")
             self.logger.info(f"{self.project_name} 下载成功 {success_count} / {total_count} 个文件")
         elif success_count < total_count:
+            self._download_failed = True
             self._send_download_warning_notification(version, f"{success_count} / {total_count}")
             self.logger.warning(f"{self.project_name} 部分下载成功下载 {success_count} / {total_count} 个文件")
         else:
@@ -756,6 +1019,8 @@ class DownloaderBase(ABC):
         # 关闭线程池
         if hasattr(self, '_executor') and self._executor:
             self._executor.shutdown(wait=False)
+        # 取消还在全局调度队列中排队的文件
+        DownloadScheduler.cancel_project(self.project_name)
 
         # 停止进度条
         if hasattr(self, '_progress'):
@@ -766,97 +1031,463 @@ class DownloaderBase(ABC):
 
     def _execute_downloads(self, download_tasks: List[tuple],
                            threads: int = None, chunk_size: int = 8192) -> int:
-        """执行下载任务并返回成功数量"""
+        """提交到全局下载调度器执行并返回成功数量，threads 为本项目同时下载的文件数上限
+
+        下载失败的文件数累加到 _failed_downloads
+        """
         threads = threads if threads else self.threads
         success_count = 0
-        lock = Lock()
 
         with self.progress:
-            # 保存executor引用以便停止
-            self._executor = ThreadPoolExecutor(max_workers=threads)
-            with self._executor as executor:
-                futures = {}
-                for file_url, output_file, file_name, file_version, update_time, is_source_code in download_tasks:
-                    self._check_abort()
-                    future = executor.submit(
-                        self._download_file,
-                        file_url, output_file, file_name, file_version, update_time, is_source_code, chunk_size
-                    )
-                    futures[future] = file_name
+            futures = {}
+            for file_url, output_file, file_name, file_version, update_time, is_source_code, file_hash in download_tasks:
+                self._check_abort()
+                future = DownloadScheduler.submit(
+                    self.project_name, file_url, self._download_file,
+                    file_url, output_file, file_name, file_version, update_time, is_source_code, chunk_size, file_hash,
+                    project_limit=threads
+                )
+                futures[future] = file_name
 
+            try:
                 for future in as_completed(futures):
                     self._check_abort()
                     file_name = futures[future]
+                    wait_time = getattr(future, 'wait_time', 0.0)
                     try:
                         if future.result():
-                            with lock:
-                                success_count += 1
-                            self.logger.info(f"文件 {file_name} 下载成功")
+                            success_count += 1
+                            self.logger.info(f"文件 {file_name} 下载成功 (排队 {wait_time:.2f}s, 提交时队列深度 {future.queue_depth})")
+                        else:
+                            self._failed_downloads += 1
                     except Exception as e:
+                        self._failed_downloads += 1
                         self.logger.error(f"文件 {file_name} 下载失败: {str(e)}")
+            finally:
+                # 中止时取消还在排队的文件
+                if self._abort_flag:
+                    DownloadScheduler.cancel_project(self.project_name)
 
-        # 清除executor引用
-        self._executor = None
         return success_count
 
     def _download_file(self, url: str, output_file: str,
-                       file_name: str, version: str, update_time, is_source_code, chunk_size: int = 8192) -> bool:
-        """下载单个文件"""
+                       file_name: str, version: str, update_time, is_source_code, chunk_size: int = 8192,
+                       file_hash: str = None) -> bool:
+        """下载单个文件，下载过程中计算 sha256，存在 file_hash 时在重命名前校验"""
         task_id = self.progress.add_task("download", filename=file_name, start=False)
 
         try:
             temp_file = output_file + '.tmp'
-            downloaded_size = 0
 
-            if os.path.exists(temp_file):
-                downloaded_size = os.path.getsize(temp_file)
-                headers = self.kwargs.get('headers', {}).copy()
-                headers['Range'] = f'bytes={downloaded_size}-'
-                self.kwargs['headers'] = headers
+            # 分段下载，服务器不支持 Range 或文件太小时退回单连接下载；有上次中断的续传记录时单连接继续下载
+            result = (self.segments > 1 and self._load_resume(temp_file) is None
+                      and self._download_segmented(url, temp_file, task_id, chunk_size))
+            if not result:
+                result = self._download_single(url, temp_file, task_id, chunk_size)
+            digest, etag = result
+
+            try:
+                self._verify_download_digest(file_name, digest, file_hash)
+            except ValueError:
+                # 内容错误的临时文件不能用于续传
+                self._discard_partial(temp_file)
+                raise
+            self._remove_resume(temp_file)
+            self._finalize_download(temp_file, output_file, version, update_time)
+            self._add_to_store(output_file, digest)
+            self._record_download(output_file, digest, etag, version, file_name, update_time, is_source_code)
+
+            self.progress.remove_task(task_id)
+            return True
+
+        except Exception as e:
+            self.progress.stop()
+            self.logger.error(f"下载文件 {file_name} 版本: {version} 失败: {str(e)}")
+            self._send_download_failure_single_file_notification(version, file_name, str(e))
+            # 有续传记录的临时文件保留，下次运行从已保存的位置继续
+            if self._load_resume(temp_file) is None and os.path.exists(temp_file):
+                os.remove(temp_file)
+            raise
+
+    # 临时文件落盘 (fsync) 并更新续传记录的间隔字节数
+    FSYNC_INTERVAL = 8 * 1024 * 1024
+
+    # ---------- 重试和断点续传 ----------
 
-            response = requests.get(url, stream=True, **self.kwargs)
+    @staticmethod
+    def _resume_path(temp_file: str) -> str:
+        return temp_file + '.resume'
+
+    def _load_resume(self, temp_file: str) -> Optional[Dict[str, Any]]:
+        """读取临时文件的续传记录 {"url", "offset": 已 fsync 的字节数, "validator": ETag / Last-Modified, "total"}"""
+        try:
+            with open(self._resume_path(temp_file), 'r', encoding='utf-8') as f:
+                resume = json.load(f)
+            int(resume['offset'])
+            return resume
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _save_resume(self, temp_file: str, url: str, offset: int, validator: Optional[str], total: Optional[int]) -> None:
+        """在临时文件 fsync 之后调用，记录可以安全续传的位置 (先写临时文件再替换，避免记录不完整)"""
+        path = self._resume_path(temp_file)
+        with open(path + '.new', 'w', encoding='utf-8') as f:
+            json.dump({"url": url, "offset": offset, "validator": validator, "total": total}, f)
+        os.replace(path + '.new', path)
+
+    def _remove_resume(self, temp_file: str) -> None:
+        try:
+            os.remove(self._resume_path(temp_file))
+        except FileNotFoundError:
+            pass
+
+    def _discard_partial(self, temp_file: str) -> None:
+        """删除临时文件和续传记录"""
+        self._remove_resume(temp_file)
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+
+    @staticmethod
+    def _parse_content_range(value: Optional[str]) -> Optional[tuple]:
+        """ 'bytes 100-199/1000' -> (100, 199, 1000)，总大小未知 (*) 时为 None；格式错误返回 None """
+        match = re.fullmatch(r'\s*bytes\s+(\d+)-(\d+)/(\d+|\*)\s*', value or '')
+        if not match:
+            return None
+        total = match.group(3)
+        return int(match.group(1)), int(match.group(2)), None if total == '*' else int(total)
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        """连接中断 / 超时 / 数据不完整 / 5xx 可以重试，4xx 等其他错误直接失败"""
+        if isinstance(error, _RetryableDownloadError):
+            return True
+        if isinstance(error, requests.exceptions.HTTPError):
+            status = error.response.status_code if error.response is not None else 0
+            return status >= 500 or status in (408, 429)
+        return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                                  requests.exceptions.ChunkedEncodingError,
+                                  requests.exceptions.ContentDecodingError))
+
+    def _retry_wait(self, attempt: int) -> float:
+        """第 attempt 次重试前等待的秒数 (指数退避 + 随机抖动，最长 30 秒)"""
+        return random.uniform(0.5, 1.0) * min(30.0, 2.0 ** (attempt - 1))
+
+    def _with_retries(self, description: str, fn, *args):
+        """调用 fn(*args)，可以重试的错误按 self.retries 次数重试 (fn 负责从已保存的位置继续)"""
+        attempt = 0
+        while True:
+            try:
+                return fn(*args)
+            except Exception as e:
+                if self._abort_flag or attempt >= self.retries or not self._is_retryable(e):
+                    raise
+                attempt += 1
+                wait = self._retry_wait(attempt)
+                self._count_transfer(retries=1)
+                self.logger.warning(f"⚠{description} 失败: {e}，{wait:.1f}s 后第 {attempt} / {self.retries} 次重试")
+                time.sleep(wait)
+                self._check_abort()
+
+    def _download_single(self, url: str, temp_file: str, task_id, chunk_size: int = 8192) -> tuple:
+        """单连接流式下载到临时文件，连接中断时重试，临时文件有续传记录时从上次 fsync 的位置继续
+
+        :returns
+            (临时文件的 sha256 (写入的同时计算，断点续传时先计算已下载部分), ETag | None)
+        """
+        return self._with_retries(f"下载 {url}", self._download_single_attempt, url, temp_file, task_id, chunk_size)
+
+    def _resume_point(self, url: str, temp_file: str) -> tuple:
+        """ 根据续传记录确定本次请求的起始位置
+
+        :returns (起始位置, 校验器 ETag / Last-Modified | None, 续传记录 | None)
+        """
+        resume = self._load_resume(temp_file)
+        size_on_disk = os.path.getsize(temp_file) if os.path.exists(temp_file) else 0
+        offset = 0
+        validator = None
+        if resume and resume.get('validator') and resume.get('url') == url and 0 < resume['offset'] <= size_on_disk:
+            offset = resume['offset']
+            validator = resume['validator']
+        if resume:
+            # 最后一次 fsync 之后写入的数据不可信，和不能续传的部分一起重新下载
+            self._count_transfer(refetched_bytes=size_on_disk - offset)
+        return offset, validator, resume
+
+    def _resume_headers(self, offset: int, validator: Optional[str]) -> Dict[str, str]:
+        """续传请求头：Range + If-Range，文件发生变化时服务器返回 200 完整内容，不会把新旧两个版本的数据拼接在一起"""
+        if not offset:
+            return {}
+        return {'Range': f'bytes={offset}-', 'If-Range': validator}
+
+    def _check_resume_response(self, url: str, temp_file: str, offset: int, validator: Optional[str],
+                               resume: Optional[Dict[str, Any]], status: int, headers) -> tuple:
+        """ 校验续传请求的响应：206 的 Content-Range 必须从请求的位置开始且总大小不变，200 时从头下载
+
+        :returns (写入的起始位置, 文件总大小 | None, 用于之后续传的校验器 | None)
+
+        _RetryableDownloadError:
+            Content-Range 和续传位置不一致 (续传记录已删除，重试时从头下载)
+        """
+        # 压缩传输时写入的字节数和 Content-Length / Range 不对应，不做完整性检查也不续传
+        encoded = headers.get('Content-Encoding', 'identity').lower() not in ('identity', '')
+        if offset and status == 206:
+            content_range = self._parse_content_range(headers.get('Content-Range'))
+            if content_range is None or content_range[0] != offset or \
+                    (resume.get('total') and content_range[2] and content_range[2] != resume['total']):
+                self._discard_partial(temp_file)
+                self._count_transfer(refetched_bytes=offset)
+                raise _RetryableDownloadError(f"Content-Range 与续传位置不一致: {headers.get('Content-Range')}, 续传位置: {offset}")
+            self._count_transfer(saved_bytes=offset)
+            self.logger.info(f"从 {offset} 字节继续下载 {url}")
+            return offset, content_range[2], validator
+
+        if offset:
+            self.logger.warning(f"⚠服务器返回 {status}，文件已变化或不支持续传，从头下载 {url}")
+            self._count_transfer(refetched_bytes=offset)
+        self._remove_resume(temp_file)
+        if encoded:
+            return 0, None, None
+        return 0, int(headers.get('Content-Length', 0)) or None, headers.get('ETag') or headers.get('Last-Modified')
+
+    def _download_single_attempt(self, url: str, temp_file: str, task_id, chunk_size: int = 8192) -> tuple:
+        """单次下载尝试，临时文件每 FSYNC_INTERVAL 字节落盘一次并记录续传位置"""
+        offset, validator, resume = self._resume_point(url, temp_file)
+
+        # 每次请求单独复制请求头，不修改 self.kwargs (多个线程共用)
+        headers = dict(self.kwargs.get('headers') or {}, **self._resume_headers(offset, validator))
+        response = self.session.get(url, stream=True, **dict(self.kwargs, headers=headers))
+        try:
             response.raise_for_status()
-            total_size = int(response.headers.get('content-length', 0)) + downloaded_size
+            offset, total_size, validator = self._check_resume_response(
+                url, temp_file, offset, validator, resume, response.status_code, response.headers)
+
+            hash_obj = hashlib.sha256()
+            if offset:
+                self._hash_file_into(temp_file, hash_obj, limit=offset)
 
             # 开始进度条
             self.progress.start_task(task_id)
-            self.progress.update(task_id, total=total_size, completed=downloaded_size)
+            self.progress.update(task_id, total=total_size or 0, completed=offset)
 
-            mode = 'ab' if downloaded_size > 0 else 'wb'
-            with open(temp_file, mode) as f:
-                for chunk in response.iter_content(chunk_size=chunk_size):
-                    self._check_abort()
-                    if chunk:
-                        f.write(chunk)
-                        downloaded_size += len(chunk)
-                        self.progress.update(task_id, advance=len(chunk))
+            position = synced = offset
+            with open(temp_file, 'r+b' if offset else 'wb') as f:
+                f.seek(offset)
+                f.truncate()
+                try:
+                    for chunk in response.iter_content(chunk_size=BandwidthLimiter.chunk_size(self.project_name, chunk_size)):
+                        self._check_abort()
+                        if chunk:
+                            f.write(chunk)
+                            hash_obj.update(chunk)
+                            position += len(chunk)
+                            self.progress.update(task_id, advance=len(chunk))
+                            BandwidthLimiter.consume(self.project_name, len(chunk))
+                            if validator and position - synced >= self.FSYNC_INTERVAL:
+                                synced = self._sync_partial(f, temp_file, url, position, validator, total_size)
+                finally:
+                    # 完成或中断时都落盘并记录位置，中断后的重试 (包括下次运行) 从这里继续；没有 ETag / Last-Modified 的文件无法安全续传
+                    if validator and position > synced:
+                        synced = self._sync_partial(f, temp_file, url, position, validator, total_size)
+                    else:
+                        f.flush()
+                        os.fsync(f.fileno())
+        finally:
+            response.close()
 
+        if total_size and position != total_size:
+            raise _RetryableDownloadError(f"下载数据不完整: {position} / {total_size}")
+        return hash_obj.hexdigest(), response.headers.get('ETag')
 
-            # 处理特殊情况的 latest 版本的 (是最新版本，且更新时间发生了变化，且本地文件已经存在，且文件修改时间不一样)
-            if (version == 'latest' and os.path.exists(output_file) and
-                    self._convert_to_timestamp(self.get_modification_time(output_file)) < self._convert_to_timestamp(update_time)):
-                old_file_time = self.get_modification_time(output_file)
-                dst_dir = os.path.join(os.path.split(output_file)[0], 'history', str(self._convert_to_timestamp(old_file_time)))
-                self.logger.info(f"创建目录 {dst_dir} 存放历史版本")
-                os.makedirs(dst_dir, exist_ok=True)
-                self.logger.info(f"移动旧版本 -> {dst_dir}")
-                shutil.move(output_file, dst_dir)
+    def _sync_partial(self, f, temp_file: str, url: str, position: int, validator: str, total_size: Optional[int]) -> int:
+        """临时文件 fsync 后记录续传位置，返回已落盘的位置"""
+        f.flush()
+        os.fsync(f.fileno())
+        self._save_resume(temp_file, url, position, validator, total_size)
+        return position
 
+    def _probe_ranges(self, url: str) -> Optional[tuple]:
+        """探测是否支持分段下载
 
-            os.rename(temp_file, output_file)
-            # 下载的修改文件的修改时间为commit时间
-            self.set_modification_time(file_path=output_file, modification_time=self._convert_to_timestamp(update_time))
+        :returns
+            (跟随重定向后的最终URL, 文件大小, ETag) | None (不支持 Range 或获取不到大小)
+        """
+        try:
+            response = self.session.head(url, allow_redirects=True, **self.kwargs)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            self.logger.warning(f"⚠探测分段下载失败，使用单连接下载: {e}")
+            return None
 
-            self.progress.remove_task(task_id)
-            return True
+        total_size = int(response.headers.get('Content-Length') or 0)
+        if response.headers.get('Accept-Ranges', '').lower() != 'bytes' or total_size <= 0:
+            return None
+        return response.url, total_size, response.headers.get('ETag')
 
-        except Exception as e:
-            self.progress.stop()
-            self.logger.error(f"下载文件 {file_name} 版本: {version} 失败: {str(e)}")
-            self._send_download_failure_single_file_notification(version, file_name, str(e))
-            if os.path.exists(temp_file):
-                os.remove(temp_file)
-            raise
+    def _download_segmented(self, url: str, temp_file: str, task_id, chunk_size: int = 8192) -> Union[tuple, bool]:
+        """多连接分段下载到预分配的临时文件
+
+        :returns
+            (临时文件的 sha256, ETag) | False 表示不适合分段下载（不支持 Range / 文件太小），由调用方改用单连接下载
+        """
+        probe = self._probe_ranges(url)
+        if not probe:
+            return False
+
+        final_url, total_size, etag = probe
+        segment_count = min(self.segments, total_size // self.min_segment_size)
+        if segment_count < 2:
+            return False
+
+        # 第一段使用本任务的名额，其余分段向调度器额外申请 (不超过 max_workers 和 per_host)，没有空闲名额时改用单连接下载
+        extra = DownloadScheduler.reserve(self.project_name, final_url, segment_count - 1)
+        try:
+            if not extra:
+                return False
+            return self._download_ranges(final_url, temp_file, task_id, chunk_size, total_size, etag, extra + 1)
+        finally:
+            DownloadScheduler.release(self.project_name, final_url, extra)
+
+    def _download_ranges(self, final_url: str, temp_file: str, task_id, chunk_size: int, total_size: int,
+                         etag: Optional[str], segment_count: int) -> tuple:
+        """分 segment_count 段并行下载，返回 (临时文件的 sha256, ETag)"""
+        # 每段的字节范围 [start, end]，最后一段包含余数
+        segment_size = total_size // segment_count
+        ranges = [(i * segment_size, total_size - 1 if i == segment_count - 1 else (i + 1) * segment_size - 1)
+                  for i in range(segment_count)]
+        self.logger.info(f"分 {segment_count} 段下载 {final_url}, 大小: {total_size}")
+
+        # 预分配临时文件（分段文件无法断点续传，总是重新下载）
+        with open(temp_file, 'wb') as f:
+            f.truncate(total_size)
+
+        self.progress.start_task(task_id)
+        self.progress.update(task_id, total=total_size, completed=0)
+
+        with ThreadPoolExecutor(max_workers=segment_count) as executor:
+            futures = [executor.submit(self._download_segment, final_url, temp_file, start, end, task_id, chunk_size, etag)
+                       for start, end in ranges]
+            for future in as_completed(futures):
+                future.result()
+
+        # 分段乱序写入，无法边写边算，完成后读取一遍临时文件
+        return self._hash_file_into(temp_file, hashlib.sha256()).hexdigest(), etag
+
+    @staticmethod
+    def _hash_file_into(file_path: str, hash_obj, chunk_size: int = 1024 * 1024, limit: Optional[int] = None):
+        """读取文件内容 (指定 limit 时只读取前 limit 字节) 更新到 hash_obj 并返回"""
+        remaining = limit
+        with open(file_path, 'rb') as f:
+            while remaining is None or remaining > 0:
+                chunk = f.read(chunk_size if remaining is None else min(chunk_size, remaining))
+                if not chunk:
+                    break
+                hash_obj.update(chunk)
+                if remaining is not None:
+                    remaining -= len(chunk)
+        return hash_obj
+
+    @staticmethod
+    def _expected_sha256(file_hash: Optional[str]) -> Optional[str]:
+        """从页面提供的 hash (sha256:xxx 或 64位十六进制) 中取出 sha256，其他格式返回 None"""
+        if not file_hash:
+            return None
+        value = file_hash.strip().lower()
+        if value.startswith('sha256:'):
+            value = value[len('sha256:'):]
+        return value if re.fullmatch(r'[0-9a-f]{64}', value) else None
+
+    def _verify_download_digest(self, file_name: str, digest: str, file_hash: Optional[str]) -> None:
+        """重命名前校验下载得到的 sha256，不一致时抛出 ValueError"""
+        expected = self._expected_sha256(file_hash)
+        if not expected:
+            return
+        if digest != expected:
+            self.logger.error(f"❌文件 {file_name} 下载后验证hash不通过, 期望: {expected}, 实际: {digest}")
+            raise ValueError(f"文件 {file_name} sha256 不匹配, 期望: {expected}, 实际: {digest}")
+        self.logger.info(f"✅文件 {file_name}, 下载后验证hash通过")
+
+    def _add_to_store(self, output_file: str, digest: str) -> None:
+        """下载完成的文件加入内容存储 (已有相同内容时替换为链接)，失败不影响下载结果"""
+        if self.content_store is None:
+            return
+        try:
+            self.content_store.add(output_file, digest)
+        except OSError as e:
+            self.logger.warning(f"文件 {os.path.basename(output_file)} 加入内容存储失败: {e}")
+
+    def _record_download(self, output_file: str, digest: str, etag: Optional[str],
+                         version: str, file_name: str, update_time, is_source_code) -> None:
+        """记录下载文件的 sha256 (哈希缓存，后续校验无需再读取文件) 和下载记录 (状态库)"""
+        with self._digest_lock:
+            self.file_digests[output_file] = digest
+        self.hash_cache.put(output_file, 'sha256', digest)
+        self.state.record_asset(self.project_name, version, file_name,
+                                source_code=is_source_code, size=os.path.getsize(output_file),
+                                sha256=digest, etag=etag, update_time=update_time)
+
+    def _download_segment(self, url: str, temp_file: str, start: int, end: int, task_id, chunk_size: int = 8192,
+                          etag: Optional[str] = None) -> None:
+        """下载 [start, end] 字节范围并写入临时文件的对应位置，连接中断时从本段已写入的位置重试"""
+        progress = {"received": 0}
+        self._with_retries(f"下载分段 bytes={start}-{end}", self._download_segment_attempt,
+                           url, temp_file, start, end, task_id, chunk_size, etag, progress)
+
+    def _download_segment_attempt(self, url: str, temp_file: str, start: int, end: int, task_id, chunk_size: int,
+                                  etag: Optional[str], progress: Dict[str, int]) -> None:
+        expected = end - start + 1
+        received = progress["received"]
+        if received:
+            self._count_transfer(saved_bytes=received)
+
+        kwargs = dict(self.kwargs)
+        kwargs['headers'] = dict(self.kwargs.get('headers') or {})
+        kwargs['headers']['Range'] = f'bytes={start + received}-{end}'
+        if etag:
+            kwargs['headers']['If-Range'] = etag
+
+        response = self.session.get(url, stream=True, **kwargs)
+        try:
+            response.raise_for_status()
+            if response.status_code != 206:
+                raise ValueError(f"分段请求 bytes={start + received}-{end} 未返回 206 (文件可能已变化), 状态码: {response.status_code}")
+            content_range = self._parse_content_range(response.headers.get('Content-Range'))
+            if content_range is None or content_range[:2] != (start + received, end):
+                raise ValueError(f"分段请求 bytes={start + received}-{end} 返回的 Content-Range 不一致: {response.headers.get('Content-Range')}")
+
+            with open(temp_file, 'r+b') as f:
+                f.seek(start + received)
+                for chunk in response.iter_content(chunk_size=BandwidthLimiter.chunk_size(self.project_name, chunk_size)):
+                    self._check_abort()
+                    if chunk:
+                        chunk = chunk[:expected - received]
+                        f.write(chunk)
+                        received += len(chunk)
+                        progress["received"] = received
+                        self.progress.update(task_id, advance=len(chunk))
+                        BandwidthLimiter.consume(self.project_name, len(chunk))
+                        if received >= expected:
+                            break
+        finally:
+            response.close()
+
+        if received != expected:
+            raise _RetryableDownloadError(f"分段 bytes={start}-{end} 数据不完整: {received} / {expected}")
+
+    def _finalize_download(self, temp_file: str, output_file: str, version: str, update_time) -> None:
+        """临时文件下载完成后的处理：归档旧的 latest 版本，重命名并设置修改时间为commit时间"""
+        # 处理特殊情况的 latest 版本的 (是最新版本，且更新时间发生了变化，且本地文件已经存在，且文件修改时间不一样)
+        if (version == 'latest' and os.path.exists(output_file) and
+                self._convert_to_timestamp(self.get_modification_time(output_file)) < self._convert_to_timestamp(update_time)):
+            old_file_time = self.get_modification_time(output_file)
+            dst_dir = os.path.join(os.path.split(output_file)[0], 'history', str(self._convert_to_timestamp(old_file_time)))
+            self.logger.info(f"创建目录 {dst_dir} 存放历史版本")
+            os.makedirs(dst_dir, exist_ok=True)
+            self.logger.info(f"移动旧版本 -> {dst_dir}")
+            shutil.move(output_file, dst_dir)
+
+        os.rename(temp_file, output_file)
+        # 下载的修改文件的修改时间为commit时间
+        self.set_modification_time(file_path=output_file, modification_time=self._convert_to_timestamp(update_time))
 
     @abstractmethod
     def request(self) -> List[Dict[str, Any]]:
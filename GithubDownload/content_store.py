@@ -0,0 +1,180 @@
+import os
+import sys
+import shutil
+import hashlib
+import logging
+from threading import Lock
+from typing import Optional, Dict, List
+
+from .hash_cache import HashCache
+
+
+class ContentStore:
+    """按 sha256 保存文件的内容寻址存储
+
+    对象保存在 <根目录>/<sha256前两位>/<sha256>，版本目录中的文件是对象的链接：
+    - 优先使用 reflink (写时复制，文件系统支持时，各链接互不影响)
+    - 其次使用硬链接 (同一文件系统，修改任一链接会影响所有链接，修改时间也共享)
+    - 都不支持时 (跨文件系统 / 文件系统不支持) 不进入存储，保持原来的独立文件
+
+    同一根目录在进程内共用一个实例，多个项目的输出目录指向同一根目录时可以跨项目去重。
+    """
+
+    logger = logging.getLogger('ContentStore')
+
+    _instances: Dict[str, 'ContentStore'] = {}
+    _instances_lock = Lock()
+
+    # Linux FICLONE ioctl (btrfs / xfs / bcachefs 等支持 reflink 的文件系统)
+    FICLONE = 0x40049409
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        os.makedirs(self.root, exist_ok=True)
+        # 存储对象的哈希缓存，链接前确认对象没有被改动
+        self.hash_cache = HashCache.for_directory(self.root)
+        self._lock = Lock()
+        self._stats = {"linked": 0, "linked_bytes": 0, "stored": 0, "deduplicated": 0, "deduplicated_bytes": 0}
+
+    @classmethod
+    def open(cls, root: str) -> 'ContentStore':
+        """获取根目录对应的存储（同一路径在进程内共用一个实例）"""
+        root = os.path.abspath(root)
+        with cls._instances_lock:
+            store = cls._instances.get(root)
+            if store is None:
+                store = cls._instances[root] = cls(root)
+            return store
+
+    @classmethod
+    def opened(cls) -> List['ContentStore']:
+        """进程内已打开的存储"""
+        with cls._instances_lock:
+            return list(cls._instances.values())
+
+    def object_path(self, sha256: str) -> str:
+        sha256 = sha256.lower()
+        return os.path.join(self.root, sha256[:2], sha256)
+
+    def _count(self, **counts: int) -> None:
+        with self._lock:
+            for name, value in counts.items():
+                self._stats[name] += value
+
+    def stats(self) -> Dict[str, int]:
+        """{"linked": 从存储链接的文件数, "linked_bytes", "stored": 新加入存储的对象数,
+        "deduplicated": 下载后发现已有相同内容并替换为链接的文件数, "deduplicated_bytes"}"""
+        with self._lock:
+            return dict(self._stats)
+
+    @staticmethod
+    def _compute_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+        sha256 = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                sha256.update(chunk)
+        return sha256.hexdigest()
+
+    def _sha256(self, path: str) -> str:
+        return self.hash_cache.get_or_compute(path, 'sha256', lambda: self._compute_sha256(path))
+
+    def lookup(self, sha256: str) -> Optional[str]:
+        """存储中有内容为 sha256 的对象时返回对象路径；对象被改动过时删除对象并返回 None"""
+        path = self.object_path(sha256)
+        if not os.path.isfile(path):
+            return None
+        try:
+            if self._sha256(path) == sha256.lower():
+                return path
+        except OSError as e:
+            self.logger.warning(f"读取存储对象 {path} 失败: {e}")
+            return None
+        self.logger.warning(f"存储对象 {path} 的内容与 sha256 不一致，已删除")
+        self._remove(path)
+        return None
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    @classmethod
+    def _reflink(cls, src: str, dst: str) -> bool:
+        """创建写时复制的副本，不支持时返回 False"""
+        if not sys.platform.startswith('linux'):
+            return False
+        import fcntl
+        try:
+            with open(src, 'rb') as s, open(dst, 'wb') as d:
+                fcntl.ioctl(d.fileno(), cls.FICLONE, s.fileno())
+            shutil.copystat(src, dst)
+            return True
+        except OSError:
+            cls._remove(dst)
+            return False
+
+    @classmethod
+    def _link(cls, src: str, dst: str) -> Optional[str]:
+        """把 src 链接到 dst (dst 不能存在)，返回使用的方式 reflink / hardlink，都不支持时返回 None"""
+        if cls._reflink(src, dst):
+            return 'reflink'
+        try:
+            os.link(src, dst)
+            return 'hardlink'
+        except (OSError, NotImplementedError) as e:
+            # 跨文件系统 (EXDEV)、文件系统不支持硬链接、链接数达到上限等
+            cls.logger.debug(f"不能创建链接 {dst} -> {src}: {e}")
+            return None
+
+    def _link_replace(self, src: str, dst: str) -> Optional[str]:
+        """用 src 的链接原子替换 dst (dst 可以不存在)"""
+        temp = dst + '.link'
+        self._remove(temp)
+        method = self._link(src, temp)
+        if method is None:
+            return None
+        os.replace(temp, dst)
+        return method
+
+    def link(self, sha256: str, dst: str) -> bool:
+        """从存储中链接内容为 sha256 的文件到 dst，存储中没有或不能链接时返回 False"""
+        path = self.lookup(sha256)
+        if path is None:
+            return False
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        method = self._link_replace(path, dst)
+        if method is None:
+            return False
+        self._count(linked=1, linked_bytes=os.path.getsize(dst))
+        self.logger.debug(f"{dst} -> {path} ({method})")
+        return True
+
+    def add(self, path: str, sha256: str) -> None:
+        """把下载完成的文件加入存储：
+
+        - 存储中没有该内容时，把文件链接为新的存储对象
+        - 已有相同内容时，用存储对象的链接替换文件，释放重复占用的空间 (保留文件的修改时间)
+        """
+        obj = self.object_path(sha256)
+        os.makedirs(os.path.dirname(obj), exist_ok=True)
+        with self._lock:
+            existing = self.lookup(sha256)
+            if existing is None:
+                if self._link_replace(path, obj):
+                    self.hash_cache.put(obj, 'sha256', sha256)
+                    self._stats["stored"] += 1
+                else:
+                    self.logger.debug(f"{path} 不能链接到内容存储 {self.root}，保留独立文件")
+                return
+
+        st = os.stat(path)
+        if os.path.samefile(existing, path):
+            return
+        if self._link_replace(existing, path):
+            # 硬链接共享修改时间，恢复为下载时设置的时间 (commit / 上传时间)
+            os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+            self.hash_cache.put(existing, 'sha256', sha256)
+            self._count(deduplicated=1, deduplicated_bytes=st.st_size)
+            self.logger.info(f"{os.path.basename(path)} 与内容存储中的对象相同，已替换为链接")
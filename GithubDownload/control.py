@@ -0,0 +1,195 @@
+import os
+import json
+import glob
+import socket
+import secrets
+import logging
+from threading import Lock, Thread
+from typing import Optional, Dict, Any, List, Callable
+
+
+class ControlServer:
+    """运行中的命令行进程的控制通道 (stop / 停止单个项目 / drain)
+
+    每个进程在状态目录中监听一个端点，命令行 stop 连接所有端点发送命令，运行中的进程立即处理，不需要轮询状态文件：
+    - 支持 AF_UNIX 时为 <状态目录>/<pid>.sock (仅当前用户可访问)
+    - 否则 (Windows、路径过长) 监听 127.0.0.1 的随机端口，端口和令牌写入 <状态目录>/<pid>.port
+
+    协议为一行 JSON 请求 {"command", "projects", ...}，返回一行 JSON {"pid", "ok", "projects", ...}。
+    同一进程中的多个执行器 (定时任务中并发执行的多批项目) 各自注册处理函数，共用一个端点。
+    """
+
+    logger = logging.getLogger('ControlServer')
+    _lock = Lock()
+    _handlers: List[Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]] = []
+    _sock: Optional[socket.socket] = None
+    _endpoint: Optional[str] = None
+    _token = ''
+
+    MAX_MESSAGE = 64 * 1024
+
+    @classmethod
+    def register(cls, status_dir: str, handler: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]) -> None:
+        """注册命令处理函数，第一个处理函数注册时开始监听
+
+        处理函数返回的 projects 列表会合并到响应中，返回 None 表示没有处理
+        """
+        with cls._lock:
+            if cls._sock is None:
+                try:
+                    cls._listen(status_dir)
+                except OSError as e:
+                    cls.logger.warning(f"无法创建控制通道，stop 命令对本进程无效: {e}")
+                    return
+            cls._handlers.append(handler)
+
+    @classmethod
+    def unregister(cls, handler: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]) -> None:
+        """移除处理函数，没有处理函数时关闭端点"""
+        with cls._lock:
+            if handler in cls._handlers:
+                cls._handlers.remove(handler)
+            if not cls._handlers:
+                cls._close()
+
+    @classmethod
+    def _listen(cls, status_dir: str) -> None:
+        os.makedirs(status_dir, exist_ok=True)
+        pid = os.getpid()
+        if hasattr(socket, 'AF_UNIX'):
+            path = os.path.join(status_dir, f"{pid}.sock")
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                if os.path.exists(path):
+                    os.unlink(path)
+                sock.bind(path)
+                os.chmod(path, 0o600)
+                sock.listen(8)
+                cls._sock, cls._endpoint, cls._token = sock, path, ''
+                cls._start_thread()
+                return
+            except OSError as e:
+                # 路径超过 AF_UNIX 的长度限制等，改用 TCP
+                sock.close()
+                cls.logger.debug(f"不能监听 {path}: {e}")
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind(('127.0.0.1', 0))
+        sock.listen(8)
+        token = secrets.token_hex(16)
+        path = os.path.join(status_dir, f"{pid}.port")
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump({"port": sock.getsockname()[1], "token": token}, f)
+        cls._sock, cls._endpoint, cls._token = sock, path, token
+        cls._start_thread()
+
+    @classmethod
+    def _start_thread(cls) -> None:
+        Thread(target=cls._serve, args=(cls._sock,), name="control-server", daemon=True).start()
+
+    @classmethod
+    def _close(cls) -> None:
+        sock, endpoint = cls._sock, cls._endpoint
+        cls._sock = cls._endpoint = None
+        if endpoint:
+            try:
+                os.unlink(endpoint)
+            except OSError:
+                pass
+        if sock is not None:
+            # shutdown 唤醒阻塞在 accept 中的线程
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+
+    @classmethod
+    def _serve(cls, sock: socket.socket) -> None:
+        while True:
+            try:
+                conn, _ = sock.accept()
+            except OSError:
+                # 端点已关闭
+                return
+            with conn:
+                try:
+                    conn.settimeout(5)
+                    request = json.loads(cls._read_line(conn) or '{}')
+                    response = cls._dispatch(request)
+                except (OSError, ValueError) as e:
+                    response = {"pid": os.getpid(), "ok": False, "error": str(e)}
+                try:
+                    conn.sendall(json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n')
+                except OSError:
+                    pass
+
+    @classmethod
+    def _read_line(cls, conn: socket.socket) -> str:
+        data = b''
+        while not data.endswith(b'\n'):
+            chunk = conn.recv(4096)
+            if not chunk:
+                break
+            data += chunk
+            if len(data) > cls.MAX_MESSAGE:
+                raise ValueError("控制命令过长")
+        return data.decode('utf-8').strip()
+
+    @classmethod
+    def _dispatch(cls, request: Dict[str, Any]) -> Dict[str, Any]:
+        with cls._lock:
+            if cls._token and request.get('token') != cls._token:
+                return {"pid": os.getpid(), "ok": False, "error": "令牌不正确"}
+            handlers = list(cls._handlers)
+        cls.logger.info(f"收到控制命令: {request.get('command')} {' '.join(request.get('projects') or [])}")
+        projects, handled = [], False
+        for handler in handlers:
+            try:
+                result = handler(request)
+            except Exception as e:
+                cls.logger.error(f"处理控制命令 {request.get('command')} 失败: {e}")
+                continue
+            if result is not None:
+                handled = True
+                projects.extend(result.get('projects', []))
+        return {"pid": os.getpid(), "ok": handled, "projects": projects}
+
+    # ---------- 客户端 ----------
+
+    @classmethod
+    def send(cls, status_dir: str, command: str, projects: Optional[List[str]] = None,
+             timeout: float = 5.0) -> List[Dict[str, Any]]:
+        """向状态目录中所有运行中的进程发送命令，返回各进程的响应；连接不上的端点 (进程已退出) 会被删除"""
+        request = {"command": command, "projects": list(projects or [])}
+        responses = []
+        for endpoint in sorted(glob.glob(os.path.join(status_dir, '*.sock')) + glob.glob(os.path.join(status_dir, '*.port'))):
+            try:
+                responses.append(cls._send_one(endpoint, request, timeout))
+            except (ConnectionRefusedError, FileNotFoundError):
+                cls.logger.debug(f"控制端点 {endpoint} 没有进程监听，已删除")
+                try:
+                    os.unlink(endpoint)
+                except OSError:
+                    pass
+            except (OSError, ValueError) as e:
+                cls.logger.warning(f"向 {endpoint} 发送控制命令失败: {e}")
+        return responses
+
+    @classmethod
+    def _send_one(cls, endpoint: str, request: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        if endpoint.endswith('.sock'):
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            address = endpoint
+        else:
+            with open(endpoint, encoding='utf-8') as f:
+                info = json.load(f)
+            request = dict(request, token=info['token'])
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            address = ('127.0.0.1', int(info['port']))
+        with sock:
+            sock.settimeout(timeout)
+            sock.connect(address)
+            sock.sendall(json.dumps(request, ensure_ascii=False).encode('utf-8') + b'\n')
+            return json.loads(cls._read_line(sock) or '{}')
@@ -0,0 +1,147 @@
+import time
+import random
+import logging
+from datetime import datetime
+from typing import Optional, Dict, Any, List
+
+from croniter import croniter
+
+from .state import StateStore
+
+
+class _Entry:
+    """一个项目的定时设置和下一次执行时间"""
+
+    __slots__ = ('project', 'cron', 'jitter', 'catchup', 'tick', 'next_run', 'running')
+
+    def __init__(self, project: str, cron: str, jitter: float, catchup: str):
+        self.project = project
+        self.cron = cron
+        self.jitter = jitter
+        self.catchup = catchup
+        # 下一次 cron 触发的时间，和加上随机延迟后的实际执行时间 (时间戳)
+        self.tick: Optional[float] = None
+        self.next_run: Optional[float] = None
+        self.running = False
+
+
+class CronSchedule:
+    """按项目的 cron 定时表 (下次执行时间保存在状态库的 schedules 表中，重启后继续)
+
+    - 每个项目有自己的 cron 表达式，实际执行时间在 cron 触发时间后随机延迟 0 ~ jitter 秒，
+      延迟不超过两次触发间隔的一半，避免所有项目在同一秒开始请求
+    - 项目正在执行时不会再次开始 (不重叠)，执行期间错过的触发按 catchup 处理:
+      once 结束后立即补执行一次 (多次错过也只补一次)，skip 跳过错过的触发，等待下一次
+    - 守护进程停止期间错过的触发同样按 catchup 处理
+    """
+
+    logger = logging.getLogger('CronSchedule')
+
+    CATCHUP = ('once', 'skip')
+
+    def __init__(self, state: StateStore):
+        self.state = state
+        self.entries: Dict[str, _Entry] = {}
+
+    @staticmethod
+    def validate(cron: str) -> bool:
+        return croniter.is_valid(cron)
+
+    @staticmethod
+    def next_tick(cron: str, after: float) -> float:
+        """after 之后的下一次触发时间 (按本地时间计算 cron)"""
+        return croniter(cron, datetime.fromtimestamp(after)).get_next(datetime).timestamp()
+
+    def _jitter(self, entry: _Entry, tick: float) -> float:
+        if entry.jitter <= 0:
+            return 0.0
+        interval = self.next_tick(entry.cron, tick) - tick
+        return random.uniform(0, min(entry.jitter, interval / 2))
+
+    def _schedule(self, entry: _Entry, tick: float, run_at: Optional[float] = None) -> None:
+        """设置下一次触发时间并保存，run_at 为补执行的时间 (不按 tick 计算随机延迟)"""
+        entry.tick = tick
+        entry.next_run = run_at if run_at is not None else tick + self._jitter(entry, tick)
+        self.state.record_schedule(entry.project, entry.cron, entry.tick, entry.next_run)
+
+    def set_projects(self, projects: Dict[str, Dict[str, Any]], now: Optional[float] = None) -> None:
+        """设置定时执行的项目 {项目: {"cron", "jitter", "catchup"}}
+
+        cron 没有变化的项目沿用状态库中保存的下次执行时间，已经过期时按 catchup 处理
+        """
+        now = now or time.time()
+        saved = self.state.get_schedules()
+        entries = {}
+        for project, options in projects.items():
+            cron = options['cron']
+            catchup = options.get('catchup') if options.get('catchup') in self.CATCHUP else 'once'
+            entry = self.entries.get(project)
+            if entry is not None and entry.cron == cron:
+                entry.jitter, entry.catchup = float(options.get('jitter') or 0), catchup
+                entries[project] = entry
+                continue
+            entry = _Entry(project, cron, float(options.get('jitter') or 0), catchup)
+            # cron 变化时项目可能正在执行，结束后按新的 cron 计算下一次执行时间
+            entry.running = project in self.entries and self.entries[project].running
+            entries[project] = entry
+            row = saved.get(project)
+            if row and row['cron'] == cron and row['next_run']:
+                if row['next_run'] > now:
+                    entry.tick, entry.next_run = row['tick'], row['next_run']
+                elif catchup == 'once':
+                    self.logger.info(f"{project} 错过了 {datetime.fromtimestamp(row['tick'] or row['next_run']):%Y-%m-%d %H:%M:%S} 的定时执行，补执行一次")
+                    self._schedule(entry, row['tick'] or now, now + self._jitter(entry, now))
+                else:
+                    self._schedule(entry, self.next_tick(cron, now))
+            else:
+                self._schedule(entry, self.next_tick(cron, now))
+        self.entries = entries
+        self.state.remove_schedules(list(entries))
+
+    def due(self, now: Optional[float] = None) -> List[str]:
+        """已经到执行时间且没有在执行的项目，按执行时间排序"""
+        now = now or time.time()
+        due = [entry for entry in self.entries.values()
+               if not entry.running and entry.next_run is not None and entry.next_run <= now]
+        return [entry.project for entry in sorted(due, key=lambda entry: entry.next_run)]
+
+    def next_wakeup(self) -> Optional[float]:
+        """最近一个没有在执行的项目的执行时间，没有时返回 None"""
+        times = [entry.next_run for entry in self.entries.values() if not entry.running and entry.next_run is not None]
+        return min(times) if times else None
+
+    def started(self, project: str, now: Optional[float] = None) -> None:
+        entry = self.entries[project]
+        entry.running = True
+        self.state.record_schedule_run(project, now or time.time())
+
+    def finished(self, project: str, start: float, status: str, now: Optional[float] = None) -> None:
+        """项目执行结束，计算下一次执行时间；执行期间错过的触发按 catchup 处理"""
+        now = now or time.time()
+        self.state.record_schedule_run(project, start, now, status)
+        entry = self.entries.get(project)
+        if entry is None:
+            # 执行期间配置已变化，不再定时执行
+            return
+        entry.running = False
+        tick = self.next_tick(entry.cron, start)
+        if tick > now:
+            self._schedule(entry, tick)
+            return
+        missed = 0
+        while tick <= now and missed < 1000:
+            missed += 1
+            tick = self.next_tick(entry.cron, tick)
+        if entry.catchup == 'once':
+            self.logger.info(f"{project} 执行期间错过了 {missed} 次定时执行，立即补执行一次")
+            self._schedule(entry, now, now)
+        else:
+            self.logger.info(f"{project} 执行期间错过了 {missed} 次定时执行，已跳过")
+            self._schedule(entry, tick)
+
+    def table(self) -> List[Dict[str, Any]]:
+        """下次执行时间表，按执行时间排序"""
+        rows = self.state.get_schedules()
+        return [dict(rows.get(project, {}), project=project, cron=entry.cron, running=entry.running,
+                     next_run=entry.next_run, tick=entry.tick)
+                for project, entry in sorted(self.entries.items(), key=lambda item: item[1].next_run or 0)]
@@ -1,23 +1,46 @@
 import os
+import re
 import shutil
 import requests
-from bs4 import BeautifulSoup
+from xml.etree import ElementTree
 from urllib.parse import urljoin
-from typing import Optional, List, Dict, Union, Callable
+from typing import Optional, List, Dict, Union, Callable, Tuple, Any, Iterator, Iterable
+from collections import deque
+from threading import Lock
+from concurrent.futures import ThreadPoolExecutor, Future
 from .base import DownloaderBase
+from .asset_filter import AssetFilter
+from . import parsers
+from .parse_pool import ParsePool
 from urllib.parse import urlparse, parse_qs
-from markdownify import markdownify as md
+
+
+ATOM_NS = '{http://www.w3.org/2005/Atom}'
 
 
 class GithubDownloader(DownloaderBase):
     """GitHub资源下载器基类，提供GitHub仓库的解析和下载功能"""
 
+    # 版本解析模式: fast 复用仓库主页面的信息并直接计算源码包文件名，full 每个版本请求 tree 页面和 HEAD
+    RESOLVE_MODES = ('fast', 'full')
+
     def __init__(self, url: str, output: str = None,
                  dingtalk_webhook: str = None, dingtalk_secret: str = None,
                  project_name: str = "Github项目更新监控",
                  only_latest: bool = True,
                  threads: int = 4,
                  log_file: str = None,
+                 segments: int = 1,
+                 min_segment_size: Union[int, str] = 16 * 1024 * 1024,
+                 full_verify: bool = False,
+                 state_db: str = None,
+                 retries: int = 3,
+                 feed_precheck: bool = True,
+                 resolve_mode: str = 'fast',
+                 content_store: Union[bool, str, None] = None,
+                 bandwidth_limit: Union[int, str, None] = None,
+                 bandwidth_schedule: Optional[str] = None,
+                 asset_filter: Union[AssetFilter, Dict[str, Any], None] = None,
                  **kwargs):
         """初始化GitHub下载器
 
@@ -28,6 +51,17 @@ class GithubDownloader(DownloaderBase):
             dingtalk_secret: 钉钉API的密钥
             only_latest: 只下载最新版本的
             threads: 下载线程
+            segments: 单个文件的分段下载连接数 (1 为不分段)
+            min_segment_size: 每段最小字节数 (支持 K/M/G 后缀)
+            full_verify: 校验文件时忽略哈希缓存
+            state_db: 版本状态库路径
+            retries: 单个文件下载中断后的重试次数 (从已保存的位置继续)
+            feed_precheck: 完整抓取前先通过 tags.atom / commits.atom 判断仓库是否有变化
+            resolve_mode: 版本解析模式 fast / full
+            content_store: 内容寻址存储的根目录，True 时使用输出目录上一级的 .store 目录
+            bandwidth_limit: 本项目的下载带宽上限 (字节/秒，支持 K/M/G 后缀)
+            bandwidth_schedule: 本项目按时间段的带宽上限，例如 09:00-18:00=2M
+            asset_filter: 下载文件的过滤规则 (AssetFilter 或项目配置中的 include / exclude / max_size 等)
         """
         super().__init__(url, output,
                          dingtalk_webhook, dingtalk_secret,
@@ -35,28 +69,172 @@ class GithubDownloader(DownloaderBase):
                          only_latest,
                          threads,
                          log_file,
+                         segments,
+                         min_segment_size,
+                         full_verify,
+                         state_db,
+                         retries,
+                         content_store,
+                         bandwidth_limit,
+                         bandwidth_schedule,
                          **kwargs)
         self.github_output_path = os.path.join(self.output_path, 'github') if output is None else output
+        self.feed_precheck = bool(feed_precheck)
+        self._feed_fingerprint = None
+        self.asset_filter = asset_filter if isinstance(asset_filter, AssetFilter) else AssetFilter.from_config(asset_filter)
+        self.resolve_mode = (resolve_mode or 'fast').lower()
+        if self.resolve_mode not in self.RESOLVE_MODES:
+            raise ValueError(f"不支持的版本解析模式: {resolve_mode}, 可选: {', '.join(self.RESOLVE_MODES)}")
+        # 本次运行中只请求一次的结果 {key: Future}
+        self._memo: Dict[Tuple, Future] = {}
+        self._memo_lock = Lock()
         self.logger.info(f"正在初始化GitHub下载器，URL: {kwargs.get('url')}")
 
 
+    # 从仓库URL中解析 owner / name
+    @staticmethod
+    def parse_repository(url: str) -> Tuple[str, str]:
+        """ https://github.com/owner/name/ -> ("owner", "name")
+
+        ValueError:
+            URL 中没有 owner/name
+        """
+        parts = [part for part in urlparse(url).path.split('/') if part]
+        if len(parts) < 2:
+            raise ValueError(f"无法从URL中解析仓库 owner/name: {url}")
+        return parts[0], parts[1]
+
+    # 源码zip包的文件名
+    def _archive_file_name(self, ref: str) -> str:
+        """ 和 GitHub 返回的 Content-Disposition 一致: <仓库名>-<ref>.zip，
+        版本号前的 v 会被去掉 (v1.2 -> 1.2)，分支名中的 / 替换为 - """
+        ref = re.sub(r'^v(?=\d)', '', ref).replace('/', '-')
+        return f"{self.parse_repository(self.url)[1]}-{ref}.zip"
+
+    # 同一次运行中相同 key 只计算一次
+    def _memoize(self, key: Tuple, fn: Callable[[], Any]) -> Any:
+        """ 并发解析的版本共用同一个结果 (其他线程等待第一个线程的请求)，失败时不缓存 """
+        with self._memo_lock:
+            future = self._memo.get(key)
+            owner = future is None
+            if owner:
+                future = self._memo[key] = Future()
+        if owner:
+            try:
+                future.set_result(fn())
+            except BaseException as e:
+                with self._memo_lock:
+                    self._memo.pop(key, None)
+                future.set_exception(e)
+        return future.result()
+
+    # 开始新一次运行时清空缓存的结果
+    def _reset_memo(self) -> None:
+        with self._memo_lock:
+            self._memo.clear()
+
+    # 带条件请求头的 GET 请求
+    def _conditional_get(self, url: str, **kwargs) -> Tuple[requests.Response, Any]:
+        """ 发送带 If-None-Match / If-Modified-Since 的 GET 请求，kwargs 为空时使用 self.kwargs
+
+        :returns
+            (响应, 缓存的解析结果)，服务器返回 304 时第二项为上次的解析结果，否则为 None
+        """
+        kwargs = kwargs or self.kwargs
+        headers, cached = self.http_cache.conditional_headers(url, kwargs.get('headers'))
+        response = self.session.get(url, **dict(kwargs, headers=headers))
+
+        not_modified = response.status_code == 304 and cached is not None
+        self.http_cache.record(not_modified)
+        if not_modified:
+            self.logger.info(f"页面未变化(304)，使用上次的解析结果: {url}")
+            return response, cached['parsed']
+        return response, None
+
+    # 记录页面的解析结果，用于后续的条件请求
+    def _cache_parsed(self, url: str, response: requests.Response, parsed: Any) -> Any:
+        self.http_cache.put(url, response.headers.get('ETag'), response.headers.get('Last-Modified'), parsed)
+        return parsed
+
+    # Atom feed 的访问链接，tags.atom 没有记录时（没有 tag 的仓库）使用 commits.atom
+    def _feed_urls(self) -> List[str]:
+        return [urljoin(self.url, "tags.atom"), urljoin(self.url, "commits.atom")]
+
+    # 流式解析 Atom feed 的第一条记录
+    @staticmethod
+    def _parse_feed_head(source) -> Optional[str]:
+        """ 流式解析 Atom feed (文件对象)，读取到第一个 <entry> 结束即停止
+
+        :returns
+            "第一条记录的id|更新时间" | None (没有记录)
+        """
+        for _, elem in ElementTree.iterparse(source, events=('end',)):
+            if elem.tag == f'{ATOM_NS}entry':
+                return f"{elem.findtext(f'{ATOM_NS}id', '')}|{elem.findtext(f'{ATOM_NS}updated', '')}"
+        return None
+
+    def _fetch_feed_head(self, url: str) -> Optional[str]:
+        response = self.session.get(url, stream=True, **self.kwargs)
+        try:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            return self._parse_feed_head(response.raw)
+        finally:
+            # 只读取了第一条记录，剩余内容直接丢弃
+            response.close()
+
+    def _check_feed_fingerprint(self, head: Optional[str]) -> bool:
+        """ 比较 feed 第一条记录和上次完整抓取时的记录，有变化(或无法判断)返回 True """
+        if not head:
+            return True
+        # 输出目录和过滤规则变化时即使 feed 没有变化也需要重新抓取
+        self._feed_fingerprint = (f"{head}|only_latest={self.only_latest}|output={os.path.abspath(self.output_path)}"
+                                  f"|filter={self.asset_filter.fingerprint()}")
+        if self.state.get_feed(self.project_name) == self._feed_fingerprint:
+            self.logger.info(f"{self.project_name} feed 无变化，跳过抓取")
+            return False
+        return True
+
+    # 抓取前的快速检测
+    def has_changes(self) -> bool:
+        """ 通过 tags.atom (没有 tag 时使用 commits.atom) 的第一条记录判断仓库自上次完整抓取后是否有变化
+
+        请求失败或无法判断时返回 True，按有变化处理
+        """
+        self._feed_fingerprint = None
+        if not self.feed_precheck:
+            return True
+        try:
+            head = None
+            for feed_url in self._feed_urls():
+                head = self._fetch_feed_head(feed_url)
+                if head:
+                    break
+        except Exception as e:
+            self.logger.warning(f"⚠获取 {self.project_name} feed 失败，执行完整抓取: {e}")
+            return True
+        return self._check_feed_fingerprint(head)
+
+    # 完整下载成功后记录 feed 指纹
+    def commit_feed_fingerprint(self) -> None:
+        """ 记录本次 has_changes() 获取的 feed 指纹，只在 download 的所有文件都下载成功后调用；
+        有文件下载失败时不记录，下次运行会重新抓取 (update 只检查更新，不记录) """
+        if self._feed_fingerprint and not self._download_failed and not self._failed_downloads:
+            self.state.record_feed(self.project_name, self._feed_fingerprint)
+
     # 辅助解析tags页面，获取下一个页面的访问链接和链接中的after参数后的值（版本信息）
-    def __get_next_page(self, soup: BeautifulSoup) -> Union[Dict[str, str], None]:
-        """ 辅助解析tags页面，获取下一个tags页面的访问链接和after参数后的版本
+    def __get_next_page(self, href: Optional[str]) -> Union[Dict[str, str], None]:
+        """ 辅助解析tags页面，由页面上 Next 链接的 href 得到下一个tags页面的访问链接和after参数后的版本
         :return:
         {"url": "下一页的链接 (str)", "after_version": "下一个链接中显示的版本（str | None)"} | None
 
         ValueError:
             解析URL参数失败的时候
         """
-        # 查找文本为"Next"的<a>标签
-        next_link = soup.find('a', string='Next')
-
-        if not next_link or not next_link.get('href'):
+        if not href:
             self.logger.warning("⚠获取tags页面获取下一页访问链接失败，元素不存在")
             return None
 
-        href = next_link['href']
         # 解析URL中的after参数
         parsed_url = urlparse(href)
         query_params = parse_qs(parsed_url.query)
@@ -72,141 +250,134 @@ class GithubDownloader(DownloaderBase):
             self.logger.error("❌解析tagas页面，下一页URL参数 ?after=<version> 失败")
             raise ValueError("解析tagas页面，下一页URL参数 ?after=<version> 失败")
 
-    # 辅助解析tags页面，获取版本信息和更新时间
-    def __get_page_tags(self, soup: BeautifulSoup) -> List[Dict[str, str]]:
-        """
+    # 解析单个 tags 页面
+    def _parse_tag_page(self, html: Union[str, bytes]) -> Tuple[List[Dict[str, str]], Union[Dict[str, str], None]]:
+        """ 解析单个 tags 页面的HTML，不发送请求 (启用解析进程池时在子进程中解析)
 
         :returns
-            [
-                {
-                    "version": 版本 (str),
-                    "update_time": 更新时间 (str),
-                }
-            ]
+            ([{"version": "", "update_time": "", "commit_time": "tag 的 commit 时间 (ISO 8601 str | None)"}], 下一页信息 | None)，
+            不存在 tags 时返回 ([], None)
         """
-        tags_box = []
-
-        # 获取所有的tags标签 div
         self.logger.info("解析页面，获取版本信息和更新时间")
+        try:
+            tags, next_href = ParsePool.run(parsers.parse_tag_page, html, parsers.ParserBackend.get())
+        except ValueError as e:
+            self.logger.error(f"❌{e}")
+            raise
+
+        if tags is None:
+            self.logger.warning("⚠ 不存在tags页面")
+            return [], None
+
+        for tag in tags:
+            self.logger.info(f"☺ 成功获取 {tag['version']} tag 信息, 此版本更新时间: {tag['update_time']}")
+        return tags, self.__get_next_page(next_href)
 
-        all_divs = soup.find_all('div', class_='Box-row position-relative d-flex')
+    # 请求并解析单个 tags 页面
+    def _fetch_tag_page(self, url: str) -> Tuple[List[Dict[str, str]], Union[Dict[str, str], None]]:
+        """ 请求 tags 页面 (条件请求)，返回 _parse_tag_page 的结果 """
+        response, cached = self._conditional_get(url)
+        response.raise_for_status()
+        if cached:
+            return cached[0], cached[1]
+        return self._cache_parsed(url, response, self._parse_tag_page(response.content))
 
-        if not all_divs:
-            self.logger.error("❌解析tags页面，获取版本信息和更新时间失败")
-            raise ValueError("解析tags页面，获取版本信息和更新时间失败")
+    # 逐页获取 tags
+    def iter_tags(self) -> Iterator[Dict[str, str]]:
+        """ 按页产出 tags (版本去重)，每解析完一页就产出该页的版本，
+        同时在后台请求下一页，调用方处理当前页的版本时下一页已经在下载/解析
 
-        for div in all_divs:
-            version = div.select('a', class_="Link--primary Link")[0].get_text(strip=True)
-            update_time = div.select("relative-time")[0].get_text(strip=True)
-            url = div.select('a', class_="Link--primary Link")[0].get('href')
-            tags_box.append({"version": version, "update_time": update_time})
-            self.logger.info(f"☺ 成功获取 {version} tag 信息, 此版本更新时间: {update_time}")
+        only_latest 时只产出第一个版本；下一页游标重复或某一页没有新版本时停止（防止分页循环）
 
-        return tags_box
+        :returns
+            {"version": "", "update_time": "", "commit_time": ""} 的迭代器
+        """
+        seen_versions = set()
+        seen_urls = set()
+        url = urljoin(self.url, "tags")
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            future = pool.submit(self._fetch_tag_page, url)
+            seen_urls.add(url)
+            while future is not None:
+                self._check_abort()
+                tags, next_page_info = future.result()
+
+                # 先提交下一页的请求，再产出当前页
+                future = None
+                if not self.only_latest and next_page_info and next_page_info['url'] not in seen_urls:
+                    self.logger.info(f"访问 tags 页面: {next_page_info['url']}")
+                    seen_urls.add(next_page_info['url'])
+                    future = pool.submit(self._fetch_tag_page, next_page_info['url'])
+
+                new_tags = [tag for tag in tags if tag['version'] not in seen_versions]
+                if not new_tags and tags:
+                    self.logger.warning("⚠tags 页面没有新的版本，停止分页")
+                    if future is not None:
+                        future.cancel()
+                    return
+                for tag in new_tags:
+                    seen_versions.add(tag['version'])
+                    yield {"version": tag['version'], "update_time": tag['update_time'], "commit_time": tag.get('commit_time')}
+                    if self.only_latest:
+                        self.logger.info("只获取最新的版本")
+                        return
 
     # 解析 tags 页面
-    def _analysis_tag_page(self):
-        """ 解析 tag 标签页面 ，获取版当页显示的本信息
+    def _analysis_tag_page(self) -> List[Dict[str, str]]:
+        """ 解析 tag 标签页面，获取所有页的版本信息（only_latest 时只获取最新的版本）
 
         :returns
             [
                 {“version": "",  "update_time": ""},
             ]
         """
-        result = []
-
-        # 请求第一个tags页面
-        tags_url = urljoin(self.url, "tags")
         try:
-            response = requests.get(tags_url, **self.kwargs)
-            response.raise_for_status()
-
-
-            soup = BeautifulSoup(response.text, 'html.parser')
-
-            # 没有tags页面
-            if 'There aren’t any releases here' in soup.text:
-                self.logger.warning("⚠ 不存在tags页面")
-                return []
-
-            # 无论如何先解析第一页，获取所有的版本
-            first_page_tags = self.__get_page_tags(soup)
-            first_page_oldest_version = first_page_tags[-1]['version'] # 获取第一页的最后一个版本名称
-            next_page_info = self.__get_next_page(soup) # 下一页的版本信息和访问链接
-
-            if self.only_latest:
-                self.logger.info("只获取最新的版本")
-                result.append({"version": first_page_tags[0]['version'], "update_time":  first_page_tags[0]['update_time']})
-                return result
-            # 如果没有找到导航链接，说明只有1页
-            elif next_page_info is None:
-                self.logger.info("tags 只有1页")
-                result.extend(first_page_oldest_version)
-                return result
-            else:
-                self.logger.info("tags 存在多页")
-                # 首页肯定是相等的
-                next_after_version = next_page_info['after_version']
-                current_page_oldest_version = first_page_oldest_version
-
-                # 循环获取下一页的数据，直到此页最后一个版本和 after=版本 的值不相同
-                while next_after_version == current_page_oldest_version:
-                    self.logger.info(f"访问 tags 页面: {next_page_info['url']}")
-                    # 访问下一页
-                    next_page_request = requests.get(next_page_info['url'], **self.kwargs)
-                    # 解析页面
-                    next_page_soup = BeautifulSoup(next_page_request.content, 'html.parser')
-                    # 获取所有版本信息
-                    next_page_tags = self.__get_page_tags(next_page_soup)
-                    # 记录版本信息
-                    result.extend(next_page_tags)
-                    # 更新访问信息
-                    current_page_oldest_version = next_page_tags[-1]['version'] # 获取第一页的最后一个版本名称
-                    next_after_version = self.__get_next_page(next_page_soup) # 下一页的下一页版本信息和访问链接
-                return result
+            return list(self.iter_tags())
         except Exception as e:
-            self.logger.error(f"解析 {self.project_name} tags 页面失败: URL: {urljoin(self.url, 'tags')}, 错误信息: {str(e)}")
-            self._send_other_msg(title=f"解析 {self.project_name} tags 页面失败", message=f"URL: {tags_url}, 错误信息: {str(e)}", msg_type='error')
+            self._notify_tags_error(e)
             raise
 
-    # 解析主页面
-    def _analysis_main_page(self, version: Optional[str] = None) -> Dict[str, str]:
-        """ 解析主页面
+    # tags 页面解析失败的日志和通知
+    def _notify_tags_error(self, error: Exception) -> None:
+        tags_url = urljoin(self.url, 'tags')
+        self.logger.error(f"解析 {self.project_name} tags 页面失败: URL: {tags_url}, 错误信息: {str(error)}")
+        self._send_other_msg(title=f"解析 {self.project_name} tags 页面失败", message=f"URL: {tags_url}, 错误信息: {str(error)}", msg_type='error')
+
+    # 主页面的访问URL
+    def _main_page_url(self, version: Optional[str] = None) -> str:
+        return urljoin(self.url, f"tree/{version}") if version else self.url
+
+    # 获取 commit 时间时使用的请求参数
+    def _commit_kwargs(self) -> Dict:
+        """ 复制请求头后再修改，不影响 self.kwargs (多个版本并发解析时共用) """
+        headers = dict(self.kwargs.get('headers') or {})
+        headers['content-type'] = "application/json"
+        headers['content-encoding'] = "gzip"
+        headers['cookie'] = "tz=Asia%2FShanghai"
+        headers['accept'] = "application/json"
+        headers['accept-language'] = "zh-CN,zh;q=0.9"
+        return dict(self.kwargs, headers=headers)
+
+    # 解析主页面HTML
+    def _parse_main_page(self, html: Union[str, bytes], version: Optional[str] = None) -> Dict[str, Union[str, bool]]:
+        """ 解析主页面的HTML，不发送请求（commit 时间和文件名需要另外请求）
 
         :returns
-            {"source": "源码下载链接", "about": "about (str)", "exists_release": 是否存在 release (bool), "commit_time": "最后一次 commit时间"}
+            {"branch": "分支/tags名称", "version": "版本", "source": "源码下载链接", "about": "about (str)", "exists_release": 是否存在 release (bool)}
 
         ValueError:
-            获取commit失败 / 获取 about 信息失败
+            获取分支名称失败 / 获取 about 信息失败
         """
-
-        if version:
-            main_page_url = urljoin(self.url, f"tree/{version}")
-        else:
-            main_page_url = self.url
-
-        self.logger.info(f"访问版本: {version if version else 'latest'}")
-        self.logger.info(f"访问URL: {main_page_url}")
-
-        try:
-            main_response = requests.get(main_page_url, **self.kwargs)
-            main_response.raise_for_status()
-        except Exception as e:
-            self.logger.error(f"❌请求主页面失败: {str(e)}")
-            self._send_other_msg(title=f'访问{self.project_name}主页失败', message=f"URL: {main_page_url if self.url else '未填写项目URL'}， 版本: {version if version else 'latest'}, 错误信息: {str(e)}", msg_type='error')
-            raise
-
         try:
-            # 解析主页面
-            soup = BeautifulSoup(main_response.text, 'html.parser')
+            # 解析主页面 (启用解析进程池时在子进程中解析)
+            page = ParsePool.run(parsers.parse_main_page, html, parsers.ParserBackend.get())
 
             # 首先获取右上角的分支/版本名称
-            branches_tags_name = soup.find('div', class_='Layout-main').find('button').get_text(strip=True)
+            branches_tags_name = page['branch']
             self.logger.info("解析主页面分支/tags名称: " + branches_tags_name)
-            if not branches_tags_name:
-                self.logger.error("解析失败")
-                raise ValueError("解析主页面分支/tags名称失败")
         except Exception as e:
+            self.logger.error(f"❌解析失败: {e}")
             self._send_other_msg(title=f'解析{self.project_name}主页失败', message=f"解析主页面分支/tags名称失败， 版本: {version if version else 'latest'}, 错误信息: {str(e)}", msg_type='error')
             raise
 
@@ -230,51 +401,60 @@ class GithubDownloader(DownloaderBase):
             self.logger.error("❌获取源码zip包URL失败！！！")
             raise ValueError("获取源码zip包URL失败！！！")
 
-        # 请求获取请最后的提交时间 (主页面显示的最近的更新的时间) 而不是这个版本更新的时间:
-        try:
-            commit_kwargs = self.kwargs.copy()
-            commit_kwargs['headers']['content-type'] = "application/json"
-            commit_kwargs['headers']['content-encoding'] = "gzip"
-            commit_kwargs['headers']['cookie'] = "tz=Asia%2FShanghai"
-            commit_kwargs['headers']['accept'] = "application/json"
-            commit_kwargs['headers']['accept-language'] = "zh-CN,zh;q=0.9"
-
-            commit_response = requests.get(urljoin(self.url, f"latest-commit/{branches_tags_name}"), **commit_kwargs)
-            commit_response.raise_for_status()
+        # about 信息
+        about_text = page['about']
+        if about_text is None:
+            self.logger.error("❌获取项目描述信息失败: 页面中没有 about 信息")
+            raise ValueError("获取项目about信息失败: 页面中没有 about 信息")
+        self.logger.debug(f"获取到的项目描述信息: {about_text[:50]}...")
 
-            if commit_response.status_code == 200:
-                commit_time = commit_response.json()['date']
-            else:
-                self.logger.error(f"❌获取main主页的commit更新时间错误, 状态码: {commit_response.status_code}")
-                raise ValueError("自己抛出异常，状态码不为 200")
-            self.logger.info(f"最后一次commit时间: {commit_time}")
+        exists_release = page['exists_release']
+        self.logger.info(f"{'✅存在' if exists_release else '⚠不存在'}release页面")
 
-            # 重新把设置的归为原本的，
-            self.kwargs['headers']['content-type'] = None
-            self.kwargs['headers']['content-encoding'] = None
-            self.kwargs['headers']['cookie'] = None
-            self.kwargs['headers']['accept'] = None
-            self.kwargs['headers']['accept-language'] = None
-        except Exception as e:
-            self.logger.error(f"❌获取main主页的 commit 更新时间错误: {str(e)}")
-            self._send_other_msg(title=f'解析{self.project_name}主页失败', message=f"获取main主页的 commit 更新时间错误， 版本: {version if version else 'latest'}", msg_type='error')
-            raise
+        return {
+            "branch": branches_tags_name,
+            "version": version,
+            "source": source_zip,
+            "about": about_text,
+            "exists_release": exists_release,
+        }
 
-        # 解析 about 信息
-        try:
-            about_text = soup.select('p.f4.my-3')[0].text.strip()
-            self.logger.debug(f"获取到的项目描述信息: {about_text[:50]}...")
+    # 解析主页面
+    def _analysis_main_page(self, version: Optional[str] = None) -> Dict[str, str]:
+        """ 解析主页面
+
+        :returns
+            {"source": "源码下载链接", "about": "about (str)", "exists_release": 是否存在 release (bool), "commit_time": "最后一次 commit时间"}
+
+        ValueError:
+            获取commit失败 / 获取 about 信息失败
+        """
+
+        main_page_url = self._main_page_url(version)
+
+        self.logger.info(f"访问版本: {version if version else 'latest'}")
+        self.logger.info(f"访问URL: {main_page_url}")
 
-            # 为什么不获取对应的 访问链接，应为不同版显示的都是最新的版本的链接，所以不获取
-            exists_release = bool(soup.find('div', class_="ml-2 min-width-0"))
-            self.logger.info(f"{'✅存在' if exists_release else '⚠不存在'}release页面")
+        try:
+            main_response, cached = self._conditional_get(main_page_url)
+            main_response.raise_for_status()
         except Exception as e:
-            self.logger.error(f"❌获取项目描述信息失败: {e}")
+            self.logger.error(f"❌请求主页面失败: {str(e)}")
+            self._send_other_msg(title=f'访问{self.project_name}主页失败', message=f"URL: {main_page_url if self.url else '未填写项目URL'}， 版本: {version if version else 'latest'}, 错误信息: {str(e)}", msg_type='error')
+            raise
+
+        main_info = cached or self._cache_parsed(main_page_url, main_response, self._parse_main_page(main_response.content, version))
+        version = main_info['version']
+        source_zip = main_info['source']
 
-            raise ValueError(f"获取项目about信息失败: {str(e)}")
+        commit_time = self._fetch_commit_time(main_info['branch'], version)
 
-        # 获取文件名（优先使用head方法/然后失败自动使用从URL中获取文件名）
-        file_name = self.get_filename_from_response(source_zip)
+        if self.resolve_mode == 'fast':
+            # 源码包文件名由仓库名和版本直接计算，不再发送 HEAD 请求
+            file_name = self._archive_file_name(version or main_info['branch'])
+        else:
+            # 获取文件名（优先使用head方法/然后失败自动使用从URL中获取文件名）
+            file_name = self.get_filename_from_response(source_zip, **self.kwargs)
         if not file_name:
             self.logger.error("❌main页面获取源码文件名失败")
             raise ValueError("main页面获取源码文件名失败")
@@ -282,11 +462,50 @@ class GithubDownloader(DownloaderBase):
         return {
             "file_name": file_name,    #从响应中获取文件名称
             "source": source_zip,
-            "about": about_text,
-            "exists_release": exists_release,
+            "about": main_info['about'],
+            "exists_release": main_info['exists_release'],
             "commit_time": commit_time,
         }
 
+    # 请求分支/版本最后的 commit 时间
+    def _fetch_commit_time(self, branch: str, version: Optional[str] = None) -> str:
+        """ latest-commit/<branch> 接口返回的时间 (主页面显示的最近的更新的时间)，同一次运行中每个分支只请求一次 """
+        return self._memoize(('commit', branch), lambda: self.__request_commit_time(branch, version))
+
+    def __request_commit_time(self, branch: str, version: Optional[str] = None) -> str:
+        # 请求获取请最后的提交时间 (主页面显示的最近的更新的时间) 而不是这个版本更新的时间:
+        try:
+            commit_url = urljoin(self.url, f"latest-commit/{branch}")
+            commit_response, cached_commit_time = self._conditional_get(commit_url, **self._commit_kwargs())
+            commit_response.raise_for_status()
+
+            if cached_commit_time:
+                commit_time = cached_commit_time
+            elif commit_response.status_code == 200:
+                commit_time = self._cache_parsed(commit_url, commit_response, commit_response.json()['date'])
+            else:
+                self.logger.error(f"❌获取main主页的commit更新时间错误, 状态码: {commit_response.status_code}")
+                raise ValueError("自己抛出异常，状态码不为 200")
+            self.logger.info(f"最后一次commit时间: {commit_time}")
+            return commit_time
+        except Exception as e:
+            self.logger.error(f"❌获取main主页的 commit 更新时间错误: {str(e)}")
+            self._send_other_msg(title=f'解析{self.project_name}主页失败', message=f"获取main主页的 commit 更新时间错误， 版本: {version if version else 'latest'}", msg_type='error')
+            raise
+
+    # 解析 release 页面的版本变化描述
+    def _parse_release_change(self, html: Union[str, bytes]) -> str:
+        """ 解析 release 页面HTML中的版本变化描述，返回 markdown，没有描述时返回空字符串 """
+        return ParsePool.run(parsers.parse_release_change, html, parsers.ParserBackend.get())
+
+    # 解析 expanded_assets 页面中的所有下载信息
+    def _parse_expanded_assets(self, html: Union[str, bytes]) -> List[Dict[str, Union[str, bool]]]:
+        """ 解析 expanded_assets 页面HTML，获取每一个存储文件名 / 下载链接 /hash / 更新日期 """
+        data_list = ParsePool.run(parsers.parse_expanded_assets, html, self.url, parsers.ParserBackend.get())
+        for data in data_list:
+            self.logger.info(f"获取 {data['file_name']}, 更新时间: {data['update_time']}, 下载URL: {data['file_url']}, 文件hash: {data['file_hash'] or '无'}")
+        return data_list
+
     # 解析对应版本的 release 页面
     def _analysis_release_page(self, version: str) -> Dict[str, Union[str, List[Dict[str, str]]]]:
         """ 解析 version 对应的 release 页面
@@ -302,6 +521,7 @@ class GithubDownloader(DownloaderBase):
                     "file_url": "下载URL (str)",
                     "update_time": "(更新的时间) (str)",
                     "source_code": "是否为源码 (bool),
+                    "size": "页面上显示的文件大小 (int)，没有时为 None",
                 },
             ]
         }
@@ -312,16 +532,17 @@ class GithubDownloader(DownloaderBase):
         release_tag_url = urljoin(self.url, f"releases/tag/{version}")
 
         try:
-            release_response = requests.get(release_tag_url, **self.kwargs)
-            release_page_soup = BeautifulSoup(release_response.text, 'html.parser')
-            change = release_page_soup.find('div', {'data-view-component': 'true', 'class': 'Box-body'})
+            release_response, cached = self._conditional_get(release_tag_url)
+            if cached is not None:
+                change_markdown = cached
+            else:
+                change_markdown = self._parse_release_change(release_response.content)
+                if release_response.ok:
+                    self._cache_parsed(release_tag_url, release_response, change_markdown)
 
-            if not change:
+            if not change_markdown:
                 self.logger.info(f"⚠版本{version}没有编写版本变化描述")
                 self.logger.debug(f"查看确认URL: {release_tag_url} 是否正确，状态码： {release_response.status_code}")
-            else:
-                # 转为markdown
-                change_markdown = md(html=str(change))
         except requests.exceptions as e:
             self.logger.error(f"❌获取版本变化信息失败: {str(e)}")
             self._send_other_msg(title=f'访问{self.project_name}项目 release 页面失败', message=f"URL: {release_tag_url}, 版本: {version}, 错误信息: {str(e)}", msg_type='error')
@@ -332,22 +553,12 @@ class GithubDownloader(DownloaderBase):
 
         try:
             # 获取版本下载URL
-            download_response = requests.get(assets_url, **self.kwargs)
+            download_response, cached = self._conditional_get(assets_url)
             download_response.raise_for_status()
 
-            assets_soup = BeautifulSoup(download_response.text, 'html.parser')
             # 获取每一个存储文件名 / 下载链接 /hash / 文件大小 / 更新日期
-            all_li = assets_soup.find_all('li')
-
-            data_list = []
-            for li in all_li:
-                file_name = li.find('span', class_='Truncate-text text-bold').get_text(strip=True)
-                if file_name != 'Source code':
-                    file_url = "https://github.com" + li.find('span', class_='Truncate-text text-bold').parent.get('href')
-                    file_hash = "" if not li.find('span', class_='Truncate text-mono text-small color-fg-muted') else li.find('span', class_='Truncate text-mono text-small color-fg-muted').get_text(strip=True)
-                    update_time = li.find('relative-time').get('datetime')
-                    data_list.append({"file_name": file_name, "file_hash": file_hash if file_hash else "", "update_time": update_time, "file_url": file_url, "source_code": False})
-                    self.logger.info(f"获取 {file_name}, 更新时间: {update_time}, 下载URL: {file_url}, 文件hash: {file_hash if file_hash else '无'}")
+            data_list = cached if cached is not None else self._cache_parsed(
+                assets_url, download_response, self._parse_expanded_assets(download_response.content))
             self.logger.debug(f"为版本 {version} 找到 {len(data_list)} 个下载URL")
 
             result['file_version'] = version
@@ -380,72 +591,117 @@ class GithubDownloader(DownloaderBase):
             }
         ]
         """
-        result = []
-        # 请求主页面
-        main_page_info = self._analysis_main_page()
+        return list(self.iter_request())
+
+    # 流式获取下载信息
+    def iter_request(self, lookahead: Optional[int] = None) -> Iterator[Dict[str, Union[str, List[Dict[str, str]]]]]:
+        """ request() 的流式版本：按 tags 顺序逐个产出版本信息，格式和 request() 的列表元素相同
+
+        每解析完一页 tags 就开始并发解析其中的版本，最多提前解析 lookahead 个版本 (默认 threads)，
+        调用方处理 (下载) 当前版本时后面的版本继续解析，内存占用和版本总数无关
+        """
+        self._reset_memo()
+        # 请求主页面 (fast 模式下各个版本复用这里的 about / release 信息)
+        main_page_info = self._repository_main_info()
 
         if not main_page_info['exists_release']:
-            return [{"file_version": "latest",
-                     "about": main_page_info['about'],
-                     "change": "",
-                     "data": [
-                         {
-                             "file_name": main_page_info['file_name'],
-                             "file_hash": "",
-                             "file_url": main_page_info['source'],
-                             "update_time": main_page_info['commit_time'],
-                             "source_code": True
-                         }
-                     ]}]
-        # 存在 release 页面
-        else:
-            # 获取所有的版本信息（已在内部实现了只获取最新的版本)
-            tags_info = self._analysis_tag_page()
-            # 遍历所有 tag 获取时间/版本
-            for tag in tags_info:
-                # 前往的版本
-                go_version = tag['version']
-
-                # 解析对应版本主页面
-                go_version_main_page_info = self._analysis_main_page(version=go_version)
-
-                if not go_version_main_page_info['exists_release']:
-                    result.append({"file_version": "latest",
-                                   "about": go_version_main_page_info['about'],
-                                   "change": "",
-                                   "data": [
-                                       {
-                                           "file_name": go_version_main_page_info['file_name'],
-                                           "file_hash": "",
-                                           "file_url": go_version_main_page_info['source'],
-                                           "update_time": go_version_main_page_info['commit_time'],
-                                           "source_code": True
-                                       }
-                                   ]})
-                else:
-                    # 前往 release页面
-                    release_info = self._analysis_release_page(version=go_version)
-                    result.append({"file_version": release_info['file_version'],
-                                   "about": go_version_main_page_info['about'],
-                                   "change": release_info['change'],
-                                   "data": release_info['data'] + [{
-                                       "file_name": go_version_main_page_info['file_name'],
-                                       "file_hash": "",
-                                       "file_url": go_version_main_page_info['source'],
-                                       "update_time": go_version_main_page_info['commit_time'],
-                                       "source_code": True
-                                   }]})
+            yield self._make_source_version(main_page_info)
+            return
+
+        lookahead = max(int(lookahead or self.threads), 1)
+        pending = deque()
+        tags = self.iter_tags()
+        with ThreadPoolExecutor(max_workers=lookahead) as pool:
+            try:
+                while True:
+                    try:
+                        tag = next(tags)
+                    except StopIteration:
+                        break
+                    except Exception as e:
+                        self._notify_tags_error(e)
+                        raise
+                    # 不在版本范围内的版本不需要解析
+                    if not self.asset_filter.match_version(tag['version']):
+                        continue
+                    pending.append(pool.submit(self._resolve_version, tag['version'], tag.get('commit_time')))
+                    if len(pending) >= lookahead:
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+            finally:
+                # 中途停止 (异常 / 调用方不再迭代) 时取消还没开始的解析
+                for future in pending:
+                    future.cancel()
+                tags.close()
+
+    # 仓库主页面的信息，同一次运行中只请求一次
+    def _repository_main_info(self) -> Dict:
+        return self._memoize(('main',), self._analysis_main_page)
+
+    # fast 模式下版本的主页面信息
+    def _version_main_info(self, repo_info: Dict, version: str, commit_time: Optional[str] = None) -> Dict:
+        """ 不请求 tree/<version> 页面 (about 和 release 侧边栏与仓库主页面相同)，
+        源码包文件名直接计算，commit 时间优先使用 tags 页面上的时间，没有时才请求 latest-commit/<version>
+
+        :returns 格式和 _analysis_main_page 相同
+        """
+        return {
+            "file_name": self._archive_file_name(version),
+            "source": urljoin(self.url, f"archive/refs/tags/{version}.zip"),
+            "about": repo_info['about'],
+            "exists_release": repo_info['exists_release'],
+            "commit_time": commit_time or self._fetch_commit_time(version, version),
+        }
 
-            return result
+    # 解析单个版本 (版本主页面 + release 页面)
+    def _resolve_version(self, version: str, commit_time: Optional[str] = None) -> Dict:
+        """ commit_time: tags 页面上该版本的 commit 时间 (fast 模式使用) """
+        self._check_abort()
+        if self.resolve_mode == 'fast':
+            main_page_info = self._version_main_info(self._repository_main_info(), version, commit_time)
+        else:
+            main_page_info = self._analysis_main_page(version=version)
+        if not main_page_info['exists_release']:
+            return self._make_source_version(main_page_info)
+        release_info = self._analysis_release_page(version=version)
+        return self._make_release_version(release_info, main_page_info)
+
+    # 只有源码的版本信息
+    @staticmethod
+    def _make_source_version(main_page_info: Dict) -> Dict:
+        return {"file_version": "latest",
+                "about": main_page_info['about'],
+                "change": "",
+                "data": [GithubDownloader._make_source_data(main_page_info)]}
+
+    # release 文件 + 源码的版本信息
+    @staticmethod
+    def _make_release_version(release_info: Dict, main_page_info: Dict) -> Dict:
+        return {"file_version": release_info['file_version'],
+                "about": main_page_info['about'],
+                "change": release_info['change'],
+                "data": release_info['data'] + [GithubDownloader._make_source_data(main_page_info)]}
+
+    # 源码zip包的下载信息
+    @staticmethod
+    def _make_source_data(main_page_info: Dict) -> Dict:
+        return {
+            "file_name": main_page_info['file_name'],
+            "file_hash": "",
+            "file_url": main_page_info['source'],
+            "update_time": main_page_info['commit_time'],
+            "source_code": True
+        }
 
     # 重写输出
-    def download(self, version_information: List[Dict[str, Union[str, List[Dict[str, str]]]]]) -> None:
+    def download(self, version_information: Iterable[Dict[str, Union[str, List[Dict[str, str]]]]]) -> None:
         """信息列表中的文件下载，分类输出。
 
         Parameters
         ----------
-        version_information : List[Dict[str, List[Dict[str, str]]]]
-        下载信息列表，约定传入的格式为：
+        version_information : Iterable[Dict[str, List[Dict[str, str]]]]
+        下载信息列表 (也可以是 iter_request() 返回的迭代器)，约定传入的格式为：
         [
             {
                 "file_version": "" (str),
@@ -457,14 +713,33 @@ class GithubDownloader(DownloaderBase):
 
         输出路径，如果不指定就使用类中指定的 self.github_output_path/version路径，否则就是指定的路径
         """
-        self._output_download(version_information=version_information, threads=self.threads,)
+        self._output_download(version_information=self.iter_filter(version_information), threads=self.threads,)
 
+    # 边解析边下载
+    def download_stream(self) -> int:
+        """ 消费 iter_request()，下载第 N 个版本时后面的版本继续解析，不需要先获取完整的版本列表
+
+        :returns 处理的版本数
+        """
+        return self._output_download(version_information=self.iter_filter(self.iter_request()), threads=self.threads)
 
     # 检测hash值是否符合预期
     def check_file(self, file_path, file_hash) -> bool:
         file_hash = file_hash.replace("sha256:", "")
-        return self.verify_hash(file_path=file_path, file_hash=file_hash, hash_type='sha256')
+        return self.verify_hash(file_path=file_path, file_hash=file_hash, hash_type='sha256',
+                                cache=self.hash_cache, force=self.full_verify)
 
     # 过滤
     def filter(self, version_information: List[Dict[str, Union[str, List[Dict[str, str]]]]], *args, **kwargs) -> List[Dict[str, Union[str, List[Dict[str, str]]]]]:
-        pass
+        """ 按项目的过滤规则 (asset_filter) 去掉不需要的版本和文件，格式和 request() 的返回值相同 """
+        return list(self.iter_filter(version_information))
+
+    # 流式过滤
+    def iter_filter(self, version_information: Iterable[Dict[str, Union[str, List[Dict[str, str]]]]]) -> Iterator[Dict[str, Union[str, List[Dict[str, str]]]]]:
+        """ filter() 的流式版本，可以直接包装 iter_request()：达到 newest 个版本后停止迭代，不再解析更早的版本 """
+        return self.asset_filter.select(version_information, on_skip=self._count_filtered)
+
+    # 记录被过滤掉的文件数 / 字节 (页面上有大小的文件)
+    def _count_filtered(self, skipped: List[Dict[str, Any]]) -> None:
+        self._count_transfer(filtered_files=len(skipped),
+                             filtered_bytes=sum(int(data.get('size') or 0) for data in skipped))
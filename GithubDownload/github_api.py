@@ -0,0 +1,336 @@
+import os
+import time
+import requests
+from threading import Lock
+from urllib.parse import urljoin
+from typing import Optional, List, Dict, Union, Tuple, Any, Iterator
+from .github import GithubDownloader
+from .session import SessionManager
+
+
+# GraphQL 中单个仓库查询的字段，$o{i} / $n{i} / $f{i} 为第 i 个仓库的 owner / name / release 数量
+_REPOSITORY_FIELDS = """
+    description
+    url
+    defaultBranchRef { name target { ... on Commit { committedDate } } }
+    releases(first: $f%(i)d, after: $a%(i)d, orderBy: {field: CREATED_AT, direction: DESC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        tagName
+        description
+        isDraft
+        tagCommit { committedDate }
+        releaseAssets(first: 100) { nodes { name downloadUrl updatedAt size digest } }
+      }
+    }
+"""
+
+
+class GithubApiDownloader(GithubDownloader):
+    """通过 GitHub REST / GraphQL API 获取下载信息的下载器
+
+    request() 的返回格式和 GithubDownloader 相同，下载、校验、输出沿用 GithubDownloader 的实现。
+    rest 模式每个版本 1 次请求 (releases 列表分页) + 每个版本 1 次 commit 时间请求；
+    graphql 模式一次查询即可获取最新 release、文件、digest 和默认分支的 commit 时间，
+    并且可以通过 prefetch() 把多个仓库合并为一个查询。
+    """
+
+    DEFAULT_API_BASE = 'https://api.github.com'
+    API_VERSION = '2022-11-28'
+    MODES = ('rest', 'graphql')
+    # 单次 GraphQL 查询合并的仓库数
+    BATCH_SIZE = 20
+    PAGE_SIZE = 100
+    # 批量查询结果的有效期 (秒)，定时执行时不会使用上一次运行的结果
+    PREFETCH_TTL = 300
+
+    # prefetch() 批量查询的结果 {(api_base, owner, name, only_latest): (查询时间, repository)}
+    _prefetched: Dict[Tuple[str, str, str, bool], Tuple[float, Dict[str, Any]]] = {}
+    _prefetch_lock = Lock()
+
+    def __init__(self, url: str, *args,
+                 api_mode: str = 'rest',
+                 api_base: Optional[str] = None,
+                 token: Optional[str] = None,
+                 **kwargs):
+        """初始化 API 下载器
+
+        Args:
+            api_mode: rest / graphql
+            api_base: API 地址，默认 https://api.github.com，可指向本地模拟服务器
+            token: GitHub token，未指定时使用环境变量 GITHUB_TOKEN (graphql 模式必须)
+        """
+        super().__init__(url, *args, **kwargs)
+        self.api_mode = (api_mode or 'rest').lower()
+        if self.api_mode not in self.MODES:
+            raise ValueError(f"不支持的 API 模式: {api_mode}, 可选: {', '.join(self.MODES)}")
+        self.api_base = (api_base or self.DEFAULT_API_BASE).rstrip('/')
+        self.token = token or os.environ.get('GITHUB_TOKEN') or None
+        self.owner, self.repo = self.parse_repository(self.url)
+
+    @classmethod
+    def _api_headers(cls, token: Optional[str] = None) -> Dict[str, str]:
+        headers = {
+            'Accept': 'application/vnd.github+json',
+            'X-GitHub-Api-Version': cls.API_VERSION,
+        }
+        if token:
+            headers['Authorization'] = f"Bearer {token}"
+        return headers
+
+    # API 请求参数（保留 User-Agent / 超时等设置）
+    def _api_kwargs(self) -> Dict[str, Any]:
+        headers = {k: v for k, v in (self.kwargs.get('headers') or {}).items()
+                   if v is not None and k.lower() not in ('accept', 'content-type', 'content-encoding', 'cookie')}
+        headers.update(self._api_headers(self.token))
+        return dict(self.kwargs, headers=headers)
+
+    def _api_url(self, path: str) -> str:
+        return f"{self.api_base}/repos/{self.owner}/{self.repo}/{path}".rstrip('/')
+
+    # 带条件请求的 API GET，304 不计入 GitHub 的速率限制
+    def _api_get(self, url: str) -> Dict[str, Any]:
+        """ :returns {"data": JSON, "next": 下一页的URL | None} """
+        response, cached = self._conditional_get(url, **self._api_kwargs())
+        if cached is not None:
+            return cached
+        response.raise_for_status()
+        return self._cache_parsed(url, response, {"data": response.json(),
+                                                  "next": response.links.get('next', {}).get('url')})
+
+    # 抓取前的快速检测 (不请求 github.com 的 Atom feed)
+    def has_changes(self) -> bool:
+        """ 通过 API 的最新 release (没有 release 时为默认分支最新的 commit) 判断仓库自上次完整下载后是否有变化
+
+        使用 api_base 和 token 的条件请求，304 不计入速率限制；请求失败或无法判断时返回 True，按有变化处理
+        """
+        self._feed_fingerprint = None
+        if not self.feed_precheck:
+            return True
+        try:
+            releases = self._api_get(self._api_url("releases?per_page=1"))['data']
+            if releases:
+                release = releases[0]
+                head = f"release:{release.get('id')}|{release['tag_name']}|{release.get('published_at')}"
+            else:
+                commits = self._api_get(self._api_url("commits?per_page=1"))['data']
+                head = f"commit:{commits[0]['sha']}" if commits else None
+        except Exception as e:
+            self.logger.warning(f"⚠通过 API 检测 {self.project_name} 的变化失败，执行完整获取: {e}")
+            return True
+        return self._check_feed_fingerprint(head)
+
+    # 源码zip包的下载信息（文件名和 HTML 抓取方式一致，fast 模式直接计算，full 模式从响应头中获取）
+    def _source_info(self, ref: str, source_zip: str, about: str, commit_time: str) -> Dict[str, str]:
+        if self.resolve_mode == 'fast':
+            file_name = self._archive_file_name(ref)
+        else:
+            file_name = self.get_filename_from_response(source_zip, **self.kwargs)
+        if not file_name:
+            self.logger.error("❌获取源码文件名失败")
+            raise ValueError("获取源码文件名失败")
+        return {"file_name": file_name, "source": source_zip, "about": about, "commit_time": commit_time}
+
+    # release 中的文件下载信息
+    def _asset_data(self, name: str, url: str, update_time: str, digest: Optional[str], size: Optional[int]) -> Dict[str, Any]:
+        self.logger.info(f"获取 {name}, 更新时间: {update_time}, 下载URL: {url}, 文件hash: {digest if digest else '无'}")
+        return {"file_name": name, "file_hash": digest or "", "file_url": url, "update_time": update_time,
+                "source_code": False, "size": size}
+
+    # 根据 release 列表组装版本信息
+    def _build_versions(self, about: str, default_branch: str, branch_commit_time: Optional[str],
+                        releases: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """ releases: [{"tag": "", "change": "", "commit_time": "" | None, "assets": [_asset_data()]}] """
+        if not releases:
+            self.logger.info("⚠不存在release页面")
+            commit_time = branch_commit_time or self._rest_commit_time(default_branch)
+            source_zip = urljoin(self.url, f"archive/refs/heads/{default_branch}.zip")
+            return [self._make_source_version(self._source_info(default_branch, source_zip, about, commit_time))]
+
+        result = []
+        for release in releases:
+            tag = release['tag']
+            commit_time = release['commit_time'] or self._rest_commit_time(tag)
+            source_zip = urljoin(self.url, f"archive/refs/tags/{tag}.zip")
+            release_info = {"file_version": tag, "change": release['change'], "data": release['assets']}
+            result.append(self._make_release_version(release_info, self._source_info(tag, source_zip, about, commit_time)))
+        return result
+
+    # ---------- REST ----------
+
+    def _rest_commit_time(self, ref: str) -> str:
+        """ 同一次运行中每个 ref 只请求一次 """
+        return self._memoize(('api-commit', ref), lambda: self.__request_rest_commit_time(ref))
+
+    def __request_rest_commit_time(self, ref: str) -> str:
+        data = self._api_get(self._api_url(f"commits/{ref}"))['data']
+        commit_time = data['commit']['committer']['date']
+        self.logger.info(f"{ref} 最后一次commit时间: {commit_time}")
+        return commit_time
+
+    def _rest_releases(self) -> List[Dict[str, Any]]:
+        """ 按创建时间从新到旧获取 release (only_latest 时只获取第一个) """
+        releases = []
+        url = self._api_url(f"releases?per_page={1 if self.only_latest else self.PAGE_SIZE}")
+        while url:
+            page = self._api_get(url)
+            for release in page['data']:
+                if release.get('draft'):
+                    continue
+                releases.append({
+                    "tag": release['tag_name'],
+                    "change": release.get('body') or "",
+                    "commit_time": None,
+                    "assets": [self._asset_data(asset['name'], asset['browser_download_url'], asset['updated_at'],
+                                                asset.get('digest'), asset.get('size'))
+                               for asset in release.get('assets', [])],
+                })
+            if self.only_latest and releases:
+                return releases[:1]
+            url = page['next']
+        return releases
+
+    def _request_rest(self) -> List[Dict[str, Any]]:
+        repository = self._api_get(self._api_url(""))['data']
+        return self._build_versions(repository.get('description') or "", repository['default_branch'], None,
+                                    self._rest_releases())
+
+    # ---------- GraphQL ----------
+
+    @classmethod
+    def _graphql_query(cls, count: int) -> str:
+        variables = ", ".join(f"$o{i}: String!, $n{i}: String!, $f{i}: Int!, $a{i}: String" for i in range(count))
+        fields = "\n".join(f"  r{i}: repository(owner: $o{i}, name: $n{i}) {{{_REPOSITORY_FIELDS % {'i': i}}  }}"
+                           for i in range(count))
+        return f"query({variables}) {{\n{fields}\n}}"
+
+    @classmethod
+    def _graphql(cls, session: requests.Session, api_base: str, token: Optional[str],
+                 repos: List[Tuple[str, str, int, Optional[str]]], **kwargs) -> List[Optional[Dict[str, Any]]]:
+        """ 一次查询多个仓库 repos: [(owner, name, release 数量, 分页游标)]，按顺序返回 repository (不存在时为 None)
+
+        ValueError:
+            未设置 token / 查询返回错误且没有数据
+        """
+        if not token:
+            raise ValueError("GraphQL API 需要设置 token (github_token 或环境变量 GITHUB_TOKEN)")
+        variables = {}
+        for i, (owner, name, first, after) in enumerate(repos):
+            variables.update({f"o{i}": owner, f"n{i}": name, f"f{i}": first, f"a{i}": after})
+
+        headers = dict(kwargs.pop('headers', None) or {}, **cls._api_headers(token))
+        headers = {k: v for k, v in headers.items() if v is not None}
+        response = session.post(f"{api_base}/graphql", json={"query": cls._graphql_query(len(repos)), "variables": variables},
+                                headers=headers, **kwargs)
+        response.raise_for_status()
+        body = response.json()
+        data = body.get('data') or {}
+        if body.get('errors'):
+            cls.logger.warning(f"⚠GraphQL 查询返回错误: {body['errors']}")
+            if not data:
+                raise ValueError(f"GraphQL 查询失败: {body['errors'][0].get('message')}")
+        return [data.get(f"r{i}") for i in range(len(repos))]
+
+    @classmethod
+    def prefetch(cls, urls: List[str], only_latest: Union[bool, List[bool]] = True,
+                 api_base: Optional[str] = None, token: Optional[str] = None,
+                 proxies: Optional[Dict[str, str]] = None, verify: bool = True, timeout: int = 30) -> int:
+        """ 把多个仓库合并为少量 GraphQL 查询 (每次 BATCH_SIZE 个)，结果供之后 graphql 模式的 request() 使用
+
+        :returns 成功获取的仓库数，查询失败时返回已获取的数量，对应项目在 request() 中单独查询
+        """
+        api_base = (api_base or cls.DEFAULT_API_BASE).rstrip('/')
+        token = token or os.environ.get('GITHUB_TOKEN') or None
+        flags = only_latest if isinstance(only_latest, list) else [only_latest] * len(urls)
+        repos = []
+        for url, latest in zip(urls, flags):
+            try:
+                repos.append((*cls.parse_repository(url), bool(latest)))
+            except ValueError as e:
+                cls.logger.warning(f"⚠{e}")
+
+        session = SessionManager.get_session(proxies, verify)
+        fetched = 0
+        for start in range(0, len(repos), cls.BATCH_SIZE):
+            batch = repos[start:start + cls.BATCH_SIZE]
+            try:
+                nodes = cls._graphql(session, api_base, token,
+                                     [(owner, name, 1 if latest else cls.PAGE_SIZE, None) for owner, name, latest in batch],
+                                     timeout=timeout)
+            except Exception as e:
+                cls.logger.warning(f"⚠批量 GraphQL 查询失败，改为逐个查询: {e}")
+                return fetched
+            with cls._prefetch_lock:
+                for (owner, name, latest), node in zip(batch, nodes):
+                    if node is not None:
+                        cls._prefetched[(api_base, owner.lower(), name.lower(), latest)] = (time.monotonic(), node)
+                        fetched += 1
+        cls.logger.info(f"GraphQL 批量查询 {len(repos)} 个仓库，成功 {fetched} 个")
+        return fetched
+
+    def _graphql_repository(self) -> Dict[str, Any]:
+        """ 优先使用 prefetch() 的结果 (使用后移除，下次运行重新查询)，否则单独查询；
+        非 only_latest 时按游标获取剩余的 release 并合并 """
+        key = (self.api_base, self.owner.lower(), self.repo.lower(), self.only_latest)
+        with self._prefetch_lock:
+            fetched_at, repository = self._prefetched.pop(key, (0, None))
+        if repository is not None and time.monotonic() - fetched_at > self.PREFETCH_TTL:
+            repository = None
+
+        kwargs = {k: v for k, v in self._api_kwargs().items() if k not in ('verify', 'proxies')}
+        first = 1 if self.only_latest else self.PAGE_SIZE
+        if repository is None:
+            repository = self._graphql(self.session, self.api_base, self.token,
+                                       [(self.owner, self.repo, first, None)], **dict(kwargs))[0]
+            if repository is None:
+                raise ValueError(f"仓库不存在: {self.owner}/{self.repo}")
+
+        releases = repository['releases']
+        while not self.only_latest and releases['pageInfo']['hasNextPage']:
+            page = self._graphql(self.session, self.api_base, self.token,
+                                 [(self.owner, self.repo, first, releases['pageInfo']['endCursor'])], **dict(kwargs))[0]
+            releases = {"pageInfo": page['releases']['pageInfo'],
+                        "nodes": releases['nodes'] + page['releases']['nodes']}
+        repository['releases'] = releases
+        return repository
+
+    def _request_graphql(self) -> List[Dict[str, Any]]:
+        repository = self._graphql_repository()
+        branch = repository.get('defaultBranchRef') or {}
+        releases = []
+        for node in repository['releases']['nodes']:
+            if node.get('isDraft'):
+                continue
+            releases.append({
+                "tag": node['tagName'],
+                "change": node.get('description') or "",
+                "commit_time": (node.get('tagCommit') or {}).get('committedDate'),
+                "assets": [self._asset_data(asset['name'], asset['downloadUrl'], asset['updatedAt'],
+                                            asset.get('digest'), asset.get('size'))
+                           for asset in node['releaseAssets']['nodes']],
+            })
+        if self.only_latest:
+            releases = releases[:1]
+        return self._build_versions(repository.get('description') or "", branch.get('name') or 'main',
+                                    (branch.get('target') or {}).get('committedDate'), releases)
+
+    # 流式获取下载信息
+    def iter_request(self, lookahead: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """ API 后端每个项目只需要少量请求，获取完整列表后逐个产出 """
+        yield from self.request()
+
+    # 获取下载信息
+    def request(self) -> List[Dict[str, Union[str, List[Dict[str, str]]]]]:
+        """ 通过 API 获取下载信息，返回格式和 GithubDownloader.request() 相同 """
+        self.logger.info(f"通过 {self.api_mode} API 获取 {self.owner}/{self.repo} 的版本信息: {self.api_base}")
+        self._reset_memo()
+        try:
+            if self.api_mode == 'graphql':
+                return self._request_graphql()
+            return self._request_rest()
+        except Exception as e:
+            self.logger.error(f"❌通过API获取 {self.project_name} 版本信息失败: {e}")
+            self._send_other_msg(title=f"通过API获取{self.project_name}版本信息失败",
+                                 message=f"API: {self.api_base}, 仓库: {self.owner}/{self.repo}, 错误信息: {str(e)}",
+                                 msg_type='error')
+            raise
@@ -0,0 +1,178 @@
+import time
+import random
+import logging
+from threading import Lock
+from email.utils import parsedate_to_datetime
+from typing import Optional, Dict, Any, Mapping
+
+
+class _HostBucket:
+    """单个主机的令牌桶和限流状态"""
+
+    __slots__ = ('rate', 'tokens', 'updated', 'blocked_until', 'attempts', 'successes',
+                 'requests', 'throttled', 'waited')
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.tokens = burst
+        self.updated = time.monotonic()
+        # 在此时间之前不发送请求 (Retry-After / X-RateLimit-Reset / 退避)
+        self.blocked_until = 0.0
+        # 连续被限流的次数，用于指数退避
+        self.attempts = 0
+        # 上次调整速率后连续成功的次数
+        self.successes = 0
+        self.requests = 0
+        self.throttled = 0
+        self.waited = 0.0
+
+
+class RateGovernor:
+    """进程级共享的按主机请求限速器
+
+    - 每个主机一个令牌桶 (所有下载器实例、线程引擎和异步引擎共用)，请求前 reserve() 预约令牌并等待
+    - 响应后 observe() 读取 Retry-After / X-RateLimit-* 响应头：
+      429、403 二级限流、X-RateLimit-Remaining 为 0 时暂停该主机，返回建议的重试等待秒数
+    - 被限流时速率减半 (不低于 min_rate)，之后每连续成功 recover_after 次恢复 10%，直到配置的 rate
+    - 没有 Retry-After / X-RateLimit-Reset 时使用带随机抖动的指数退避
+    """
+
+    logger = logging.getLogger('RateGovernor')
+    _lock = Lock()
+    _buckets: Dict[str, _HostBucket] = {}
+
+    # 每个主机每秒的请求数，0 为不限速 (仍然处理 Retry-After 和重试)
+    rate = 10.0
+    burst = 10.0
+    min_rate = 0.5
+    # 被限流后单个请求最多重试的次数
+    max_retries = 3
+    # 单次等待的上限 (秒)，超过时不再重试，直接返回被限流的响应
+    max_wait = 60.0
+    backoff_base = 1.0
+    recover_after = 20
+
+    @classmethod
+    def configure(cls, rate: Optional[float] = None, burst: Optional[float] = None,
+                  max_retries: Optional[int] = None, max_wait: Optional[float] = None) -> None:
+        """设置每个主机的速率、突发数、最大重试次数和单次最长等待，已有的主机状态会被重置"""
+        with cls._lock:
+            if rate is not None:
+                cls.rate = max(float(rate), 0.0)
+            if burst is not None:
+                cls.burst = max(float(burst), 1.0)
+            if max_retries is not None:
+                cls.max_retries = max(int(max_retries), 0)
+            if max_wait is not None:
+                cls.max_wait = max(float(max_wait), 0.0)
+            cls._buckets.clear()
+
+    @classmethod
+    def _bucket(cls, host: str) -> _HostBucket:
+        bucket = cls._buckets.get(host)
+        if bucket is None:
+            bucket = cls._buckets[host] = _HostBucket(cls.rate, cls.burst)
+        return bucket
+
+    @classmethod
+    def reserve(cls, host: str) -> float:
+        """为一次请求预约令牌，返回发送前需要等待的秒数 (调用方负责 sleep，不持有锁等待)"""
+        now = time.monotonic()
+        with cls._lock:
+            bucket = cls._bucket(host)
+            bucket.requests += 1
+            wait = max(bucket.blocked_until - now, 0.0)
+            if bucket.rate > 0:
+                bucket.tokens = min(bucket.tokens + (now - bucket.updated) * bucket.rate, cls.burst)
+                bucket.updated = now
+                # 令牌可以为负，表示已经被之前的请求预约，等待时间按欠下的令牌计算
+                bucket.tokens -= 1
+                if bucket.tokens < 0:
+                    wait = max(wait, -bucket.tokens / bucket.rate)
+            bucket.waited += wait
+            return wait
+
+    @classmethod
+    def acquire(cls, host: str) -> float:
+        """reserve() 并等待，返回等待的秒数"""
+        wait = cls.reserve(host)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    @staticmethod
+    def _retry_after(headers: Mapping[str, str], now: float) -> Optional[float]:
+        """Retry-After (秒数或 HTTP 日期) / X-RateLimit-Reset (Unix 时间戳) 表示的等待秒数"""
+        value = headers.get('Retry-After')
+        if value:
+            try:
+                return max(float(value), 0.0)
+            except ValueError:
+                try:
+                    return max(parsedate_to_datetime(value).timestamp() - now, 0.0)
+                except (TypeError, ValueError):
+                    pass
+        if headers.get('X-RateLimit-Remaining') == '0' and headers.get('X-RateLimit-Reset'):
+            try:
+                return max(float(headers['X-RateLimit-Reset']) - now, 0.0)
+            except ValueError:
+                pass
+        return None
+
+    @staticmethod
+    def is_throttled(status: int, headers: Mapping[str, str]) -> bool:
+        """429，或 403 且带有 Retry-After / X-RateLimit-Remaining: 0 (GitHub 的主要 / 二级限流)"""
+        if status == 429:
+            return True
+        return status == 403 and bool(headers.get('Retry-After') or headers.get('X-RateLimit-Remaining') == '0')
+
+    @classmethod
+    def observe(cls, host: str, status: int, headers: Mapping[str, str], attempt: int = 0) -> Optional[float]:
+        """根据响应调整主机的速率
+
+        :param attempt: 当前请求已经重试的次数
+        :returns 被限流时建议重试前等待的秒数，不需要重试 (未被限流 / 超过重试次数 / 等待过长) 时返回 None
+        """
+        now = time.monotonic()
+        wall_now = time.time()
+        retry_after = cls._retry_after(headers, wall_now)
+        throttled = cls.is_throttled(status, headers)
+
+        with cls._lock:
+            bucket = cls._bucket(host)
+            if not throttled:
+                bucket.attempts = 0
+                # 额度用完 (请求本身成功) 时暂停到重置时间，避免下一个请求被拒绝
+                if retry_after is not None and headers.get('X-RateLimit-Remaining') == '0':
+                    bucket.blocked_until = max(bucket.blocked_until, now + min(retry_after, cls.max_wait))
+                if cls.rate > 0 and bucket.rate < cls.rate:
+                    bucket.successes += 1
+                    if bucket.successes >= cls.recover_after:
+                        bucket.successes = 0
+                        bucket.rate = min(cls.rate, bucket.rate * 1.1)
+                return None
+
+            bucket.throttled += 1
+            bucket.successes = 0
+            bucket.attempts += 1
+            if retry_after is None:
+                # 指数退避 + 随机抖动 (full jitter)
+                retry_after = random.uniform(0, min(cls.max_wait, cls.backoff_base * 2 ** bucket.attempts))
+            if cls.rate > 0:
+                bucket.rate = max(cls.min_rate, bucket.rate / 2)
+                bucket.tokens = min(bucket.tokens, 0.0)
+            bucket.blocked_until = max(bucket.blocked_until, now + min(retry_after, cls.max_wait))
+
+        if attempt >= cls.max_retries or retry_after > cls.max_wait:
+            cls.logger.warning(f"{host} 返回 {status}，请求被限流 (需要等待 {retry_after:.1f}s)，已重试 {attempt} 次，不再重试")
+            return None
+        cls.logger.warning(f"{host} 返回 {status}，请求被限流，{retry_after:.1f}s 后重试，当前速率 {bucket.rate:.2f} 次/秒")
+        return retry_after
+
+    @classmethod
+    def stats(cls) -> Dict[str, Dict[str, Any]]:
+        """{主机: {"requests", "throttled", "waited", "rate"}}"""
+        with cls._lock:
+            return {host: {"requests": bucket.requests, "throttled": bucket.throttled,
+                           "waited": bucket.waited, "rate": bucket.rate}
+                    for host, bucket in cls._buckets.items()}
@@ -0,0 +1,105 @@
+import os
+import sqlite3
+import logging
+from threading import Lock
+from typing import Optional, Dict, Callable
+
+
+class HashCache:
+    """持久化的文件哈希缓存 (SQLite)
+
+    以 (路径, 哈希类型) 为键，记录计算哈希时文件的 (大小, mtime_ns, inode)，
+    文件的 stat 签名没有变化时直接返回缓存的哈希值，不再重新读取文件。
+    """
+
+    logger = logging.getLogger('HashCache')
+    DB_NAME = '.hash_cache.sqlite'
+
+    _instances: Dict[str, 'HashCache'] = {}
+    _instances_lock = Lock()
+
+    def __init__(self, db_path: str):
+        self.db_path = os.path.abspath(db_path)
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS file_hash (
+                path TEXT NOT NULL,
+                hash_type TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                inode INTEGER NOT NULL,
+                digest TEXT NOT NULL,
+                PRIMARY KEY (path, hash_type)
+            )
+        """)
+        self._conn.commit()
+
+    @classmethod
+    def for_directory(cls, directory: str) -> 'HashCache':
+        """获取目录对应的缓存（同一目录在进程内共用一个实例）"""
+        db_path = os.path.abspath(os.path.join(directory, cls.DB_NAME))
+        with cls._instances_lock:
+            cache = cls._instances.get(db_path)
+            if cache is None:
+                cache = cls(db_path)
+                cls._instances[db_path] = cache
+            return cache
+
+    @staticmethod
+    def _signature(file_path: str) -> tuple:
+        st = os.stat(file_path)
+        return st.st_size, st.st_mtime_ns, st.st_ino
+
+    def get(self, file_path: str, hash_type: str) -> Optional[str]:
+        """文件 stat 签名与缓存一致时返回缓存的哈希值，否则返回 None"""
+        path = os.path.abspath(file_path)
+        signature = self._signature(path)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, inode, digest FROM file_hash WHERE path = ? AND hash_type = ?",
+                (path, hash_type.lower())
+            ).fetchone()
+            if row and tuple(row[:3]) == signature:
+                self.hits += 1
+                return row[3]
+            self.misses += 1
+            return None
+
+    def put(self, file_path: str, hash_type: str, digest: str) -> None:
+        """记录文件当前 stat 签名对应的哈希值"""
+        path = os.path.abspath(file_path)
+        size, mtime_ns, inode = self._signature(path)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO file_hash (path, hash_type, size, mtime_ns, inode, digest) VALUES (?, ?, ?, ?, ?, ?)",
+                (path, hash_type.lower(), size, mtime_ns, inode, digest.lower())
+            )
+            self._conn.commit()
+
+    def get_or_compute(self, file_path: str, hash_type: str, compute: Callable[[], str], force: bool = False) -> str:
+        """优先使用缓存，签名变化、没有缓存或 force 时调用 compute 重新计算并写入缓存"""
+        if not force:
+            digest = self.get(file_path, hash_type)
+            if digest:
+                return digest
+        else:
+            with self._lock:
+                self.misses += 1
+
+        digest = compute()
+        self.put(file_path, hash_type, digest)
+        return digest
+
+    def stats(self) -> Dict[str, int]:
+        """命中/未命中次数"""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
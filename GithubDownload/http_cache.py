@@ -0,0 +1,103 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+from threading import Lock
+from typing import Optional, Dict, Any
+
+
+class HttpCache:
+    """抓取页面的条件请求缓存 (SQLite)
+
+    按 URL 记录响应的 ETag / Last-Modified 和页面解析后的结果 (JSON)，
+    再次请求时带上 If-None-Match / If-Modified-Since，服务器返回 304 时直接复用上次的解析结果。
+    """
+
+    logger = logging.getLogger('HttpCache')
+
+    _instances: Dict[str, 'HttpCache'] = {}
+    _instances_lock = Lock()
+
+    def __init__(self, db_path: str):
+        self.db_path = os.path.abspath(db_path)
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS http_cache (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                parsed TEXT NOT NULL,
+                stored_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    @classmethod
+    def open(cls, db_path: str) -> 'HttpCache':
+        """获取数据库文件对应的缓存（同一文件在进程内共用一个实例）"""
+        db_path = os.path.abspath(db_path)
+        with cls._instances_lock:
+            cache = cls._instances.get(db_path)
+            if cache is None:
+                cache = cls(db_path)
+                cls._instances[db_path] = cache
+            return cache
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """返回 {"etag": "", "last_modified": "", "parsed": 解析结果} | None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, parsed FROM http_cache WHERE url = ?", (url,)
+            ).fetchone()
+        if not row:
+            return None
+        return {"etag": row[0], "last_modified": row[1], "parsed": json.loads(row[2])}
+
+    def conditional_headers(self, url: str, headers: Optional[Dict[str, str]] = None) -> tuple:
+        """在请求头中加入条件请求头
+
+        :returns
+            (新的请求头, 缓存记录 | None)
+        """
+        headers = dict(headers or {})
+        cached = self.get(url)
+        if cached:
+            if cached['etag']:
+                headers['If-None-Match'] = cached['etag']
+            if cached['last_modified']:
+                headers['If-Modified-Since'] = cached['last_modified']
+        return headers, cached
+
+    def put(self, url: str, etag: Optional[str], last_modified: Optional[str], parsed: Any) -> None:
+        """记录解析结果，响应没有 ETag 和 Last-Modified 时无法发送条件请求，不记录"""
+        if not etag and not last_modified:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO http_cache (url, etag, last_modified, parsed, stored_at) VALUES (?, ?, ?, ?, ?)",
+                (url, etag, last_modified, json.dumps(parsed, ensure_ascii=False), time.time())
+            )
+            self._conn.commit()
+
+    def record(self, not_modified: bool) -> None:
+        """统计 304 命中 / 未命中"""
+        with self._lock:
+            if not_modified:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
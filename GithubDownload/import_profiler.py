@@ -0,0 +1,120 @@
+import sys
+import time
+from typing import Optional, Dict, List, Tuple
+
+
+class _TimedLoader:
+    """包装模块的 loader，记录 exec_module 的耗时"""
+
+    def __init__(self, loader, name: str):
+        self._loader = loader
+        self._name = name
+
+    def create_module(self, spec):
+        create = getattr(self._loader, 'create_module', None)
+        return create(spec) if create else None
+
+    def exec_module(self, module):
+        ImportProfiler._enter(self._name)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            ImportProfiler._leave()
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class _TimedFinder:
+    """放在 sys.meta_path 最前面，用其余的 finder 查找模块后包装 loader"""
+
+    @classmethod
+    def find_spec(cls, name, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is cls:
+                continue
+            find_spec = getattr(finder, 'find_spec', None)
+            if find_spec is None:
+                continue
+            spec = find_spec(name, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                    spec.loader = _TimedLoader(spec.loader, name)
+                return spec
+        return None
+
+
+class ImportProfiler:
+    """命令行启动耗时分析 (--profile-startup)
+
+    install() 之后导入的每个模块记录自身耗时 (不含其导入的子模块) 和累计耗时，
+    report() 输出按顶层包汇总的导入耗时和最慢的模块，类似 python -X importtime
+    """
+
+    _installed = False
+    _start: Optional[float] = None
+    # [名称, 开始时间, 子模块耗时]
+    _stack: List[list] = []
+    # 名称 -> (自身耗时, 累计耗时)
+    _modules: Dict[str, Tuple[float, float]] = {}
+    _marks: List[Tuple[str, float]] = []
+
+    @classmethod
+    def install(cls) -> None:
+        if cls._installed:
+            return
+        cls._installed = True
+        cls._start = time.perf_counter()
+        sys.meta_path.insert(0, _TimedFinder)
+
+    @classmethod
+    def enabled(cls) -> bool:
+        return cls._installed
+
+    @classmethod
+    def mark(cls, label: str) -> None:
+        """记录一个阶段的结束时间 (例如 参数解析 / 读取配置 / 执行命令)"""
+        if cls._installed:
+            cls._marks.append((label, time.perf_counter()))
+
+    @classmethod
+    def _enter(cls, name: str) -> None:
+        cls._stack.append([name, time.perf_counter(), 0.0])
+
+    @classmethod
+    def _leave(cls) -> None:
+        name, start, children = cls._stack.pop()
+        elapsed = time.perf_counter() - start
+        cls._modules[name] = (elapsed - children, elapsed)
+        if cls._stack:
+            cls._stack[-1][2] += elapsed
+
+    @classmethod
+    def report(cls, top: int = 15, file=None) -> None:
+        """输出导入耗时统计 (默认输出到 stderr，不影响命令的输出)"""
+        if not cls._installed:
+            return
+        file = file or sys.stderr
+        end = time.perf_counter()
+        total = sum(own for own, _ in cls._modules.values())
+
+        packages: Dict[str, List[float]] = {}
+        for name, (own, _) in cls._modules.items():
+            package = packages.setdefault(name.split('.')[0], [0.0, 0])
+            package[0] += own
+            package[1] += 1
+
+        print(f"\n启动耗时分析: 总耗时 {(end - cls._start) * 1000:.1f} ms, "
+              f"导入 {len(cls._modules)} 个模块 {total * 1000:.1f} ms", file=file)
+        previous = cls._start
+        for label, at in cls._marks:
+            print(f"  {label}: {(at - previous) * 1000:.1f} ms", file=file)
+            previous = at
+
+        print("\n按顶层包 (自身耗时合计):", file=file)
+        for name, (own, count) in sorted(packages.items(), key=lambda item: -item[1][0])[:top]:
+            print(f"  {own * 1000:8.1f} ms  {count:4d} 个模块  {name}", file=file)
+
+        print("\n最慢的模块 (累计耗时，含其导入的模块):", file=file)
+        for name, (own, cumulative) in sorted(cls._modules.items(), key=lambda item: -item[1][1])[:top]:
+            print(f"  {cumulative * 1000:8.1f} ms  (自身 {own * 1000:6.1f} ms)  {name}", file=file)
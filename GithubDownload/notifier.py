@@ -0,0 +1,200 @@
+import time
+import atexit
+import logging
+from collections import deque
+from threading import Condition, Thread
+from typing import Optional, Dict, Any, List, Tuple
+
+
+class _Digest:
+    """一个项目还未发送的汇总通知"""
+
+    __slots__ = ('notifier', 'project', 'entries', 'omitted', 'created', 'worst')
+
+    def __init__(self, notifier, project: str):
+        self.notifier = notifier
+        self.project = project
+        self.entries: List[Tuple[str, str]] = []
+        self.omitted = 0
+        self.created = time.monotonic()
+        self.worst = 'info'
+
+
+class NotificationQueue:
+    """进程级共享的后台钉钉通知队列
+
+    - 通知由后台线程发送，下载线程 / 事件循环只负责放入队列，不会被 requests.post 阻塞
+    - 队列有上限 max_queue，满时丢弃新的通知并计数
+    - 按机器人 (webhook) 限速，每 60 秒最多 rate_limit 条 (钉钉机器人的限制约为每分钟 20 条)
+    - digest 模式下单个文件 / 单个版本的通知先按项目合并，项目结束 (flush) 或超过 digest_interval 秒后作为一条消息发送
+    """
+
+    logger = logging.getLogger('NotificationQueue')
+    _cond = Condition()
+
+    max_queue = 200
+    rate_limit = 20
+    digest = True
+    digest_interval = 300.0
+    # 单条汇总消息中最多列出的通知数 (钉钉 markdown 消息长度有限)
+    max_digest_entries = 30
+
+    _queue: deque = deque()
+    _digests: Dict[Tuple[str, str], _Digest] = {}
+    _sent_times: Dict[str, deque] = {}
+    _worker: Optional[Thread] = None
+    _exit_hook = False
+    _sending = 0
+    _stats = {"queued": 0, "sent": 0, "failed": 0, "dropped": 0, "coalesced": 0}
+
+    SEVERITY = ('info', 'success', 'warning', 'error', 'critical')
+    ICONS = {'success': '✅', 'error': '❌', 'warning': '⚠', 'critical': '❗', 'info': '✉️'}
+
+    @classmethod
+    def configure(cls, rate_limit: Optional[int] = None, max_queue: Optional[int] = None,
+                  digest: Optional[bool] = None, digest_interval: Optional[float] = None) -> None:
+        """设置每分钟发送上限、队列上限和是否合并为项目汇总"""
+        with cls._cond:
+            if rate_limit is not None:
+                cls.rate_limit = max(int(rate_limit), 1)
+            if max_queue is not None:
+                cls.max_queue = max(int(max_queue), 1)
+            if digest is not None:
+                cls.digest = bool(digest)
+            if digest_interval is not None:
+                cls.digest_interval = max(float(digest_interval), 1.0)
+            cls._cond.notify_all()
+
+    @classmethod
+    def _ensure_worker(cls) -> None:
+        """在持有锁的情况下按需启动后台发送线程"""
+        if cls._worker is None or not cls._worker.is_alive():
+            cls._worker = Thread(target=cls._run, name="dingtalk-notifier", daemon=True)
+            cls._worker.start()
+        if not cls._exit_hook:
+            # 进程退出前发送剩余的通知 (最多等待 10 秒)
+            atexit.register(cls.drain, 10)
+            cls._exit_hook = True
+
+    @classmethod
+    def _enqueue(cls, notifier, title: str, text: str) -> bool:
+        """在持有锁的情况下放入发送队列，队列已满时丢弃"""
+        if len(cls._queue) >= cls.max_queue:
+            cls._stats["dropped"] += 1
+            cls.logger.warning(f"通知队列已满 ({cls.max_queue})，丢弃通知: {title.strip()}")
+            return False
+        cls._queue.append((notifier, title, text))
+        cls._stats["queued"] += 1
+        cls._ensure_worker()
+        cls._cond.notify_all()
+        return True
+
+    @classmethod
+    def submit(cls, notifier, title: str, text: str) -> bool:
+        """放入发送队列 (title / text 已经是最终的格式)，返回是否放入"""
+        if not getattr(notifier, 'enabled', False):
+            return False
+        with cls._cond:
+            return cls._enqueue(notifier, title, text)
+
+    @classmethod
+    def add_to_digest(cls, notifier, project: str, title: str, text: str, msg_type: str = 'info') -> None:
+        """合并到项目的汇总通知中，digest 模式关闭时直接放入发送队列"""
+        if not getattr(notifier, 'enabled', False):
+            return
+        with cls._cond:
+            if not cls.digest:
+                cls._enqueue(notifier, f"{cls.ICONS.get(msg_type, '')} {title}\n\n", f"### \n\n{text}\n\n")
+                return
+            key = (notifier.webhook_url, project)
+            digest = cls._digests.get(key)
+            if digest is None:
+                digest = cls._digests[key] = _Digest(notifier, project)
+            if len(digest.entries) < cls.max_digest_entries:
+                digest.entries.append((f"{cls.ICONS.get(msg_type, '')} {title}", text))
+            else:
+                digest.omitted += 1
+            if cls.SEVERITY.index(msg_type if msg_type in cls.SEVERITY else 'info') > cls.SEVERITY.index(digest.worst):
+                digest.worst = msg_type
+            cls._stats["coalesced"] += 1
+            cls._ensure_worker()
+
+    @classmethod
+    def _digest_message(cls, digest: _Digest) -> Tuple[str, str]:
+        count = len(digest.entries) + digest.omitted
+        title = f"{cls.ICONS.get(digest.worst, '')} {digest.project} 通知汇总 ({count} 条)\n\n"
+        sections = [f"##### {entry_title}\n\n{text}" for entry_title, text in digest.entries]
+        if digest.omitted:
+            sections.append(f"其余 {digest.omitted} 条通知已省略，详见日志")
+        return title, "\n\n---\n\n".join(sections) + "\n\n"
+
+    @classmethod
+    def _flush_locked(cls, keys: List[Tuple[str, str]]) -> None:
+        for key in keys:
+            digest = cls._digests.pop(key, None)
+            if digest is not None and (digest.entries or digest.omitted):
+                cls._enqueue(digest.notifier, *cls._digest_message(digest))
+
+    @classmethod
+    def flush(cls, project: Optional[str] = None) -> None:
+        """把项目 (不指定时为所有项目) 的汇总通知放入发送队列"""
+        with cls._cond:
+            cls._flush_locked([key for key in cls._digests if project is None or key[1] == project])
+
+    @classmethod
+    def _rate_wait(cls, webhook: str, now: float) -> float:
+        """在持有锁的情况下计算该机器人还需要等待的秒数 (60 秒内最多 rate_limit 条)"""
+        sent = cls._sent_times.setdefault(webhook, deque())
+        while sent and now - sent[0] >= 60:
+            sent.popleft()
+        return 60 - (now - sent[0]) if len(sent) >= cls.rate_limit else 0.0
+
+    @classmethod
+    def _run(cls) -> None:
+        while True:
+            with cls._cond:
+                while True:
+                    now = time.monotonic()
+                    # 等待时间过长的汇总先发送，长时间运行的项目也能及时收到通知
+                    cls._flush_locked([key for key, digest in cls._digests.items()
+                                       if now - digest.created >= cls.digest_interval])
+                    wait = 1.0
+                    if cls._queue:
+                        notifier, title, text = cls._queue[0]
+                        wait = cls._rate_wait(notifier.webhook_url, now)
+                        if wait <= 0:
+                            cls._queue.popleft()
+                            cls._sent_times[notifier.webhook_url].append(now)
+                            cls._sending += 1
+                            break
+                    cls._cond.wait(min(wait, 1.0))
+
+            try:
+                ok = notifier.send_message(title, text)
+            except Exception as e:
+                cls.logger.error(f"钉钉消息发送失败: {e}")
+                ok = False
+            with cls._cond:
+                cls._sending -= 1
+                cls._stats["sent" if ok else "failed"] += 1
+                cls._cond.notify_all()
+
+    @classmethod
+    def drain(cls, timeout: float = 60.0) -> bool:
+        """发送所有汇总和队列中的通知，等待发送完成，超时返回 False"""
+        deadline = time.monotonic() + timeout
+        with cls._cond:
+            cls._flush_locked(list(cls._digests))
+            while cls._queue or cls._sending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    cls.logger.warning(f"等待通知发送超时，还有 {len(cls._queue)} 条未发送")
+                    return False
+                cls._cond.wait(min(remaining, 1.0))
+        return True
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        """{"queued", "sent", "failed", "dropped", "coalesced", "pending"}"""
+        with cls._cond:
+            return dict(cls._stats, pending=len(cls._queue) + cls._sending)
@@ -0,0 +1,119 @@
+import os
+import logging
+from threading import Lock
+from typing import Dict, Any, Callable, Union
+
+
+class ParsePool:
+    """进程级共享的 HTML 解析进程池 (全局配置 parse_workers)
+
+    BeautifulSoup 解析几百KB的页面是纯 CPU 操作，多个项目同时解析时受 GIL 限制只能用到一个核心。
+    启用后页面的原始字节交给子进程解析 (parsers.parse_* 函数)，只把解析结果 (版本列表 / 文件列表等) 传回主进程：
+    - workers 为 0 时不启用，在调用线程中直接解析
+    - 小于 MIN_SIZE 的页面 (expanded_assets 等) 进程间传输的开销比解析更大，直接在调用线程中解析
+    - 子进程异常退出时关闭进程池，之后在调用线程中解析
+    """
+
+    logger = logging.getLogger('ParsePool')
+    _lock = Lock()
+    _executor = None
+    _broken = False
+    workers = 0
+
+    MIN_SIZE = 32 * 1024
+
+    _stats = {"inline": 0, "pooled": 0, "pooled_bytes": 0}
+
+    @classmethod
+    def configure(cls, workers: Union[int, str, None] = 0) -> int:
+        """设置解析进程数，auto 为 CPU 核心数，返回实际的进程数
+
+        ValueError:
+            进程数格式错误
+        """
+        value = str(workers if workers is not None else 0).strip().lower() or '0'
+        if value == 'auto':
+            count = os.cpu_count() or 1
+        else:
+            try:
+                count = max(int(value), 0)
+            except ValueError:
+                raise ValueError(f"解析进程数格式错误: {workers}")
+        with cls._lock:
+            if count != cls.workers:
+                cls._shutdown_locked()
+                cls.logger.debug(f"HTML解析进程数: {count or '不启用'}")
+            cls.workers, cls._broken = count, False
+        return count
+
+    @classmethod
+    def enabled(cls) -> bool:
+        return cls.workers > 0 and not cls._broken
+
+    @classmethod
+    def _get_executor(cls):
+        with cls._lock:
+            if cls.workers <= 0 or cls._broken:
+                return None
+            if cls._executor is None:
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+                # 使用 spawn：主进程中有下载线程，fork 多线程进程可能在子进程中死锁
+                cls._executor = ProcessPoolExecutor(max_workers=cls.workers,
+                                                    mp_context=multiprocessing.get_context('spawn'))
+                cls.logger.info(f"启动 {cls.workers} 个HTML解析进程")
+            return cls._executor
+
+    @classmethod
+    def run(cls, parse: Callable[..., Any], html: Union[str, bytes], *args) -> Any:
+        """用 parse(html, *args) 解析页面，parse 必须是模块级函数 (子进程中按名称导入)
+
+        parse 抛出的异常 (ValueError 等) 原样抛出
+        """
+        executor = cls._get_executor() if len(html) >= cls.MIN_SIZE else None
+        if executor is not None:
+            from concurrent.futures.process import BrokenProcessPool
+            try:
+                future = executor.submit(parse, html, *args)
+            except (BrokenProcessPool, RuntimeError) as e:
+                cls._mark_broken(e)
+            else:
+                try:
+                    result = future.result()
+                except BrokenProcessPool as e:
+                    cls._mark_broken(e)
+                else:
+                    with cls._lock:
+                        cls._stats["pooled"] += 1
+                        cls._stats["pooled_bytes"] += len(html)
+                    return result
+
+        with cls._lock:
+            cls._stats["inline"] += 1
+        return parse(html, *args)
+
+    @classmethod
+    def _mark_broken(cls, error: Exception) -> None:
+        with cls._lock:
+            if not cls._broken:
+                cls.logger.warning(f"HTML解析进程异常退出，改为在下载线程中解析: {error}")
+                cls._broken = True
+                cls._shutdown_locked(wait=False)
+
+    @classmethod
+    def _shutdown_locked(cls, wait: bool = True) -> None:
+        executor, cls._executor = cls._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """关闭解析进程 (下次解析时按需重新启动)"""
+        with cls._lock:
+            cls._shutdown_locked()
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        """{"workers", "inline", "pooled", "pooled_bytes"}"""
+        with cls._lock:
+            return dict(cls._stats, workers=cls.workers if not cls._broken else 0)
@@ -0,0 +1,197 @@
+import re
+import logging
+from threading import Lock
+from urllib.parse import urljoin
+from typing import Optional, List, Dict, Union, Tuple, Any
+from bs4 import BeautifulSoup, SoupStrainer
+from markdownify import markdownify as md
+
+
+# expanded_assets 页面上的文件大小，例如 532 Bytes / 12.3 MB
+ASSET_SIZE = re.compile(r'^([\d.,]+)\s*(Bytes|KB|MB|GB|TB)$', re.IGNORECASE)
+ASSET_SIZE_UNITS = {'BYTES': 1, 'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3, 'TB': 1024 ** 4}
+
+
+class ParserBackend:
+    """HTML 解析后端选择
+
+    安装了 lxml 时默认使用 lxml，否则使用标准库的 html.parser；
+    配合 SoupStrainer 只构建页面中用到的元素，减少大页面 (几百KB) 的解析开销。
+    """
+
+    logger = logging.getLogger('ParserBackend')
+    BACKENDS = ('lxml', 'html.parser')
+
+    _lock = Lock()
+    _backend: Optional[str] = None
+
+    @staticmethod
+    def available() -> List[str]:
+        """当前环境可用的解析后端"""
+        backends = []
+        try:
+            import lxml  # noqa: F401
+            backends.append('lxml')
+        except ImportError:
+            pass
+        backends.append('html.parser')
+        return backends
+
+    @classmethod
+    def configure(cls, backend: Optional[str] = None) -> str:
+        """设置解析后端 auto / lxml / html.parser，返回实际使用的后端
+
+        ValueError:
+            后端名称错误 / 指定的后端未安装
+        """
+        backend = (backend or 'auto').strip().lower()
+        available = cls.available()
+        if backend == 'auto':
+            backend = available[0]
+        elif backend not in cls.BACKENDS:
+            raise ValueError(f"不支持的HTML解析后端: {backend}, 可选: auto, {', '.join(cls.BACKENDS)}")
+        elif backend not in available:
+            raise ValueError(f"HTML解析后端 {backend} 未安装")
+        with cls._lock:
+            if backend != cls._backend:
+                cls.logger.debug(f"HTML解析后端: {backend}")
+            cls._backend = backend
+        return backend
+
+    @classmethod
+    def get(cls) -> str:
+        with cls._lock:
+            backend = cls._backend
+        return backend or cls.configure('auto')
+
+
+def class_strainer(*class_names: str) -> SoupStrainer:
+    """只保留 class 包含 class_names 中任意一组 class 的元素（及其子元素）
+
+    class_strainer('Layout-main', 'f4 my-3') 匹配 class 含有 Layout-main，或同时含有 f4 和 my-3 的元素
+    """
+    targets = [frozenset(name.split()) for name in class_names]
+
+    def match(value) -> bool:
+        if not value:
+            return False
+        classes = set(value.split()) if isinstance(value, str) else set(value)
+        return any(target <= classes for target in targets)
+
+    return SoupStrainer(attrs={'class': match})
+
+
+# 各页面实际用到的元素
+# tags 页面: 每个版本的 Box-row 和分页中的 Next 链接
+TAG_PAGE = class_strainer('Box-row', 'pagination')
+# 主页面: 分支按钮所在的 Layout-main, about 描述, release 侧边栏
+MAIN_PAGE = class_strainer('Layout-main', 'f4 my-3', 'ml-2 min-width-0')
+# release 页面: 版本变化描述
+RELEASE_PAGE = class_strainer('Box-body')
+# expanded_assets 页面: 每个文件一个 <li>
+EXPANDED_ASSETS = SoupStrainer('li')
+
+
+def make_soup(html: Union[str, bytes], parse_only: Optional[SoupStrainer] = None,
+              backend: Optional[str] = None) -> BeautifulSoup:
+    """使用配置的解析后端解析 HTML，parse_only 指定时只构建匹配的元素"""
+    return BeautifulSoup(html, backend or ParserBackend.get(), parse_only=parse_only)
+
+
+# ---------- 页面解析 ----------
+# 以下函数只依赖参数 (不访问下载器)，返回可以 pickle 的简单数据，可以在解析进程池 (ParsePool) 中执行；
+# 日志和通知由调用方 (GithubDownloader._parse_*) 在主进程中处理
+
+def _decode(html: Union[str, bytes]) -> str:
+    # GitHub 页面都是 utf-8，直接解码比 BeautifulSoup 的编码检测快
+    return html.decode('utf-8', errors='replace') if isinstance(html, bytes) else html
+
+
+def parse_tag_page(html: Union[str, bytes], backend: Optional[str] = None) -> Tuple[Optional[List[Dict[str, str]]], Optional[str]]:
+    """解析 tags 页面
+
+    :returns
+        ([{"version", "update_time", "commit_time"}], 下一页链接 href | None)，页面上没有 tags 时返回 (None, None)
+
+    ValueError:
+        页面中没有版本信息
+    """
+    text = _decode(html)
+    if 'There aren’t any releases here' in text:
+        return None, None
+
+    soup = make_soup(text, TAG_PAGE, backend)
+    all_divs = soup.find_all('div', class_='Box-row position-relative d-flex')
+    if not all_divs:
+        raise ValueError("解析tags页面，获取版本信息和更新时间失败")
+
+    tags = []
+    for div in all_divs:
+        version = div.select('a', class_="Link--primary Link")[0].get_text(strip=True)
+        relative_time = div.select("relative-time")[0]
+        tags.append({"version": version, "update_time": relative_time.get_text(strip=True),
+                     "commit_time": relative_time.get('datetime')})
+
+    next_link = soup.find('a', string='Next')
+    return tags, (next_link.get('href') or None) if next_link else None
+
+
+def parse_main_page(html: Union[str, bytes], backend: Optional[str] = None) -> Dict[str, Any]:
+    """解析主页面
+
+    :returns
+        {"branch": "分支/tags名称", "about": "about (str)，没有时为 None", "exists_release": 是否存在 release (bool)}
+
+    ValueError:
+        获取分支名称失败
+    """
+    soup = make_soup(_decode(html), MAIN_PAGE, backend)
+    layout = soup.find('div', class_='Layout-main')
+    button = layout.find('button') if layout else None
+    branch = button.get_text(strip=True) if button else ''
+    if not branch:
+        raise ValueError("解析主页面分支/tags名称失败")
+    about = soup.select('p.f4.my-3')
+    return {
+        "branch": branch,
+        "about": about[0].text.strip() if about else None,
+        # 为什么不获取对应的 访问链接，应为不同版显示的都是最新的版本的链接，所以不获取
+        "exists_release": bool(soup.find('div', class_="ml-2 min-width-0")),
+    }
+
+
+def parse_release_change(html: Union[str, bytes], backend: Optional[str] = None) -> str:
+    """解析 release 页面中的版本变化描述，返回 markdown，没有描述时返回空字符串"""
+    soup = make_soup(_decode(html), RELEASE_PAGE, backend)
+    change = soup.find('div', {'data-view-component': 'true', 'class': 'Box-body'})
+    return md(html=str(change)) if change else ""
+
+
+def parse_asset_size(li) -> Optional[int]:
+    """<li> 中 12.3 MB 形式的文本 -> 字节数，没有时返回 None"""
+    for span in li.find_all('span'):
+        match = ASSET_SIZE.match(span.get_text(strip=True))
+        if match:
+            return int(float(match.group(1).replace(',', '')) * ASSET_SIZE_UNITS[match.group(2).upper()])
+    return None
+
+
+def parse_expanded_assets(html: Union[str, bytes], base_url: str, backend: Optional[str] = None) -> List[Dict[str, Any]]:
+    """解析 expanded_assets 页面，获取每一个文件的 文件名 / 下载链接 / hash / 更新日期 / 大小 (不含源码包)"""
+    soup = make_soup(_decode(html), EXPANDED_ASSETS, backend)
+    data_list = []
+    for li in soup.find_all('li'):
+        name_span = li.find('span', class_='Truncate-text text-bold')
+        file_name = name_span.get_text(strip=True)
+        if file_name == 'Source code':
+            continue
+        hash_span = li.find('span', class_='Truncate text-mono text-small color-fg-muted')
+        data_list.append({
+            "file_name": file_name,
+            "file_hash": hash_span.get_text(strip=True) if hash_span else "",
+            "update_time": li.find('relative-time').get('datetime'),
+            "file_url": urljoin(base_url, name_span.parent.get('href')),
+            "source_code": False,
+            "size": parse_asset_size(li),
+        })
+    return data_list
@@ -0,0 +1,207 @@
+import time
+import logging
+from collections import deque
+from concurrent.futures import Future
+from threading import Condition, Thread
+from typing import Optional, Dict, Any, Callable, List
+from urllib.parse import urlparse
+
+
+class _Job:
+    """调度队列中的一个文件下载任务"""
+
+    __slots__ = ('project', 'host', 'fn', 'args', 'kwargs', 'future', 'submitted_at')
+
+    def __init__(self, project: str, host: str, fn: Callable, args: tuple, kwargs: dict):
+        self.project = project
+        self.host = host
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+        self.submitted_at = time.monotonic()
+
+
+class DownloadScheduler:
+    """进程级共享的文件下载调度器
+
+    所有项目的文件下载任务都提交到同一个有界的工作线程池：
+    - 全局并发上限 max_workers
+    - 每个主机的并发上限 per_host
+    - 每个项目的并发上限（项目配置的 threads）
+    - 项目之间轮询取任务，文件多的项目不会占满所有线程
+    - 分段下载的其他分段通过 reserve() 额外占用名额，和任务一样计入以上三个上限
+
+    submit() 返回的 Future 带有 queue_depth (提交时排队的任务数) 和 wait_time (排队等待秒数，开始执行后设置)。
+    """
+
+    logger = logging.getLogger('DownloadScheduler')
+    _cond = Condition()
+
+    max_workers = 8
+    per_host = 4
+
+    _queues: Dict[str, deque] = {}
+    _order: deque = deque()
+    _project_limits: Dict[str, int] = {}
+    _running_projects: Dict[str, int] = {}
+    _running_hosts: Dict[str, int] = {}
+    _running = 0
+    _workers: List[Thread] = []
+    _stats = {"submitted": 0, "started": 0, "completed": 0, "max_queue_depth": 0, "total_wait": 0.0, "max_wait": 0.0}
+
+    @classmethod
+    def configure(cls, max_workers: Optional[int] = None, per_host: Optional[int] = None) -> None:
+        """设置全局并发上限和每个主机的并发上限"""
+        with cls._cond:
+            if max_workers:
+                cls.max_workers = max(int(max_workers), 1)
+            if per_host:
+                cls.per_host = max(int(per_host), 1)
+            cls._cond.notify_all()
+
+    @classmethod
+    def _queue_depth(cls) -> int:
+        return sum(len(queue) for queue in cls._queues.values())
+
+    @classmethod
+    def submit(cls, project: str, url: str, fn: Callable, *args, project_limit: Optional[int] = None, **kwargs) -> Future:
+        """提交下载任务
+
+        :param project: 项目名称（轮询和项目并发上限按名称区分）
+        :param url: 下载地址，用于区分主机
+        :param project_limit: 项目的并发上限，不指定时只受全局和主机上限限制
+        """
+        job = _Job(project, urlparse(url).hostname or '', fn, args, kwargs)
+        with cls._cond:
+            queue = cls._queues.get(project)
+            if queue is None:
+                queue = cls._queues[project] = deque()
+                cls._order.append(project)
+            if project_limit:
+                cls._project_limits[project] = max(int(project_limit), 1)
+            queue.append(job)
+
+            depth = cls._queue_depth()
+            job.future.queue_depth = depth
+            cls._stats["submitted"] += 1
+            cls._stats["max_queue_depth"] = max(cls._stats["max_queue_depth"], depth)
+
+            # 按需创建工作线程，最多 max_workers 个
+            if len(cls._workers) < cls.max_workers:
+                worker = Thread(target=cls._worker, name=f"download-{len(cls._workers)}", daemon=True)
+                cls._workers.append(worker)
+                worker.start()
+            cls._cond.notify()
+        return job.future
+
+    @classmethod
+    def reserve(cls, project: str, url: str, count: int) -> int:
+        """正在执行的任务额外占用最多 count 个连接名额 (分段下载)，不等待，返回实际占用的数量
+
+        名额计入全局、主机和项目的并发上限，没有空闲名额时返回 0；用完后调用 release() 归还
+        """
+        host = urlparse(url).hostname or ''
+        with cls._cond:
+            granted = max(min(count,
+                              cls.max_workers - cls._running,
+                              cls.per_host - cls._running_hosts.get(host, 0),
+                              cls._project_limits.get(project, cls.max_workers) - cls._running_projects.get(project, 0)), 0)
+            if granted:
+                cls._running += granted
+                cls._running_projects[project] = cls._running_projects.get(project, 0) + granted
+                cls._running_hosts[host] = cls._running_hosts.get(host, 0) + granted
+            return granted
+
+    @classmethod
+    def release(cls, project: str, url: str, count: int) -> None:
+        """归还 reserve() 占用的名额"""
+        if count <= 0:
+            return
+        host = urlparse(url).hostname or ''
+        with cls._cond:
+            cls._running -= count
+            cls._running_projects[project] -= count
+            cls._running_hosts[host] -= count
+            cls._cond.notify_all()
+
+    @classmethod
+    def cancel_project(cls, project: str) -> int:
+        """取消项目中还在排队的任务，返回取消的数量（正在下载的任务由下载器的中止标志停止）"""
+        with cls._cond:
+            queue = cls._queues.pop(project, None)
+            if project in cls._order:
+                cls._order.remove(project)
+        cancelled = 0
+        for job in queue or ():
+            if job.future.cancel():
+                cancelled += 1
+        return cancelled
+
+    @classmethod
+    def _next_job(cls) -> Optional[_Job]:
+        """在持有锁的情况下，按项目轮询找到下一个可以执行的任务"""
+        if cls._running >= cls.max_workers:
+            return None
+        for _ in range(len(cls._order)):
+            project = cls._order[0]
+            cls._order.rotate(-1)
+            if cls._running_projects.get(project, 0) >= cls._project_limits.get(project, cls.max_workers):
+                continue
+            queue = cls._queues[project]
+            for job in queue:
+                if cls._running_hosts.get(job.host, 0) < cls.per_host:
+                    queue.remove(job)
+                    if not queue:
+                        del cls._queues[project]
+                        cls._order.remove(project)
+                    return job
+        return None
+
+    @classmethod
+    def _worker(cls) -> None:
+        while True:
+            with cls._cond:
+                job = cls._next_job()
+                while job is None:
+                    cls._cond.wait()
+                    job = cls._next_job()
+                cls._running += 1
+                cls._running_projects[job.project] = cls._running_projects.get(job.project, 0) + 1
+                cls._running_hosts[job.host] = cls._running_hosts.get(job.host, 0) + 1
+
+                wait_time = time.monotonic() - job.submitted_at
+                job.future.wait_time = wait_time
+                cls._stats["started"] += 1
+                cls._stats["total_wait"] += wait_time
+                cls._stats["max_wait"] = max(cls._stats["max_wait"], wait_time)
+
+            try:
+                if job.future.set_running_or_notify_cancel():
+                    cls.logger.debug(f"{job.project} 开始下载任务, 排队 {wait_time:.2f}s, 提交时队列深度 {job.future.queue_depth}")
+                    try:
+                        job.future.set_result(job.fn(*job.args, **job.kwargs))
+                    except BaseException as e:
+                        job.future.set_exception(e)
+            finally:
+                with cls._cond:
+                    cls._running -= 1
+                    cls._running_projects[job.project] -= 1
+                    cls._running_hosts[job.host] -= 1
+                    cls._stats["completed"] += 1
+                    cls._cond.notify_all()
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        """{"submitted", "completed", "queued", "running", "max_queue_depth", "avg_wait", "max_wait"}"""
+        with cls._cond:
+            started = cls._stats["started"]
+            return {
+                "submitted": cls._stats["submitted"],
+                "completed": cls._stats["completed"],
+                "queued": cls._queue_depth(),
+                "running": cls._running,
+                "max_queue_depth": cls._stats["max_queue_depth"],
+                "avg_wait": cls._stats["total_wait"] / started if started else 0.0,
+                "max_wait": cls._stats["max_wait"],
+            }
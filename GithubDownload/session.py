@@ -0,0 +1,169 @@
+import logging
+import requests
+from threading import Lock
+from typing import Optional, Dict, Tuple, Any
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+from .governor import RateGovernor
+
+
+class _PoolStats:
+    """连接池计数器（线程安全）"""
+
+    def __init__(self):
+        self._lock = Lock()
+        self.opened = 0
+        self.requests = 0
+
+    def incr(self, name: str, count: int = 1) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + count)
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "opened": self.opened,
+                "requests": self.requests,
+                "reused": max(self.requests - self.opened, 0),
+            }
+
+
+class CountingHTTPAdapter(HTTPAdapter):
+    """统计新建连接数和请求数的 HTTPAdapter
+
+    新建连接通过替换 urllib3 连接类的 connect 计数（每次真正建立 TCP 连接都会调用），复用数 = 请求数 - 新建连接数。
+    每次发送 (包括重定向的每一跳) 都经过 RateGovernor 按主机限速，被限流 (429 / 403) 时按 Retry-After 或退避时间重试。
+    """
+
+    def __init__(self, stats: _PoolStats, *args, **kwargs):
+        # 父类 __init__ 中会调用 init_poolmanager，所以必须先设置
+        self._stats = stats
+        self._pool_classes = {}
+        super().__init__(*args, **kwargs)
+
+    def _counting_pool_class(self, pool_cls):
+        counted = self._pool_classes.get(pool_cls)
+        if counted is None:
+            stats = self._stats
+            conn_cls = pool_cls.ConnectionCls
+
+            def connect(conn_self):
+                stats.incr("opened")
+                return conn_cls.connect(conn_self)
+
+            counted_conn_cls = type(conn_cls.__name__, (conn_cls,), {"connect": connect})
+            counted = type(pool_cls.__name__, (pool_cls,), {"ConnectionCls": counted_conn_cls})
+            self._pool_classes[pool_cls] = counted
+        return counted
+
+    def _instrument(self, manager) -> None:
+        if getattr(manager, "_connection_counted", False):
+            return
+        manager.pool_classes_by_scheme = {
+            scheme: self._counting_pool_class(pool_cls)
+            for scheme, pool_cls in manager.pool_classes_by_scheme.items()
+        }
+        manager._connection_counted = True
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self._instrument(self.poolmanager)
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        manager = super().proxy_manager_for(proxy, **proxy_kwargs)
+        self._instrument(manager)
+        return manager
+
+    def send(self, request, *args, **kwargs):
+        host = urlparse(request.url).hostname or ''
+        attempt = 0
+        while True:
+            RateGovernor.acquire(host)
+            self._stats.incr("requests")
+            response = super().send(request, *args, **kwargs)
+            if RateGovernor.observe(host, response.status_code, response.headers, attempt) is None:
+                return response
+            # 读完 (很小的) 响应体后释放连接以便复用，等待时间由下一次 acquire() 处理
+            try:
+                response.content
+            except Exception:
+                pass
+            response.close()
+            attempt += 1
+
+
+class SessionManager:
+    """进程级共享的 HTTP 会话管理器
+
+    按 (代理, 是否校验SSL) 区分连接池，所有抓取和下载共用，避免每个请求都重新进行 TCP+TLS 握手。
+    """
+
+    logger = logging.getLogger('SessionManager')
+    _lock = Lock()
+    _sessions: Dict[Tuple, requests.Session] = {}
+    _stats: Dict[Tuple, _PoolStats] = {}
+
+    pool_size = 10
+    keep_alive = True
+
+    @classmethod
+    def configure(cls, pool_size: Optional[int] = None, keep_alive: Optional[bool] = None) -> None:
+        """设置连接池参数，参数发生变化时关闭已有会话，后续按新参数重建"""
+        with cls._lock:
+            new_pool_size = int(pool_size) if pool_size else cls.pool_size
+            new_keep_alive = cls.keep_alive if keep_alive is None else bool(keep_alive)
+            if new_pool_size == cls.pool_size and new_keep_alive == cls.keep_alive:
+                return
+            cls.pool_size = new_pool_size
+            cls.keep_alive = new_keep_alive
+            cls._close_sessions()
+
+    @staticmethod
+    def _make_key(proxies: Optional[Dict[str, str]], verify: Any) -> Tuple:
+        proxy_items = tuple(sorted((k, v) for k, v in (proxies or {}).items() if v))
+        return proxy_items, bool(verify)
+
+    @classmethod
+    def get_session(cls, proxies: Optional[Dict[str, str]] = None, verify: Any = True) -> requests.Session:
+        """获取 (代理, verify) 对应的共享会话，不存在则创建"""
+        key = cls._make_key(proxies, verify)
+        with cls._lock:
+            session = cls._sessions.get(key)
+            if session is None:
+                stats = cls._stats.setdefault(key, _PoolStats())
+                session = requests.Session()
+                adapter = CountingHTTPAdapter(stats, pool_connections=cls.pool_size, pool_maxsize=cls.pool_size)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.proxies.update(dict(key[0]))
+                session.verify = key[1]
+                if not cls.keep_alive:
+                    session.headers['Connection'] = 'close'
+                cls._sessions[key] = session
+                cls.logger.debug(f"创建连接池会话: 代理: {dict(key[0]) or '无'}, verify: {key[1]}, 连接池大小: {cls.pool_size}")
+            return session
+
+    @classmethod
+    def stats(cls) -> Dict[str, int]:
+        """所有连接池汇总的计数 {"opened": 新建连接数, "requests": 请求数, "reused": 复用连接数}"""
+        total = {"opened": 0, "requests": 0, "reused": 0}
+        with cls._lock:
+            for stats in cls._stats.values():
+                for name, value in stats.snapshot().items():
+                    total[name] += value
+        return total
+
+    @classmethod
+    def _close_sessions(cls) -> None:
+        for session in cls._sessions.values():
+            try:
+                session.close()
+            except Exception:
+                pass
+        cls._sessions.clear()
+
+    @classmethod
+    def close_all(cls) -> None:
+        """关闭所有会话（计数保留）"""
+        with cls._lock:
+            cls._close_sessions()
@@ -0,0 +1,180 @@
+import os
+import time
+import sqlite3
+import logging
+from threading import Lock
+from typing import Optional, Dict, Any, List
+
+
+class StateStore:
+    """持久化的版本状态库 (SQLite, WAL 模式)
+
+    按项目名称记录已发现的版本和已下载的文件（名称、大小、sha256、ETag、更新时间），
+    只使用 项目/版本/文件名 作为键，不依赖输出目录，移动输出目录后仍然有效。
+    """
+
+    logger = logging.getLogger('StateStore')
+
+    _instances: Dict[str, 'StateStore'] = {}
+    _instances_lock = Lock()
+
+    def __init__(self, db_path: str):
+        self.db_path = os.path.abspath(db_path)
+        self._lock = Lock()
+
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS versions (
+                project TEXT NOT NULL,
+                version TEXT NOT NULL,
+                commit_time TEXT,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                PRIMARY KEY (project, version)
+            );
+            CREATE TABLE IF NOT EXISTS feeds (
+                project TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                checked_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS assets (
+                project TEXT NOT NULL,
+                version TEXT NOT NULL,
+                file_name TEXT NOT NULL,
+                source_code INTEGER NOT NULL DEFAULT 0,
+                size INTEGER,
+                sha256 TEXT,
+                etag TEXT,
+                update_time TEXT,
+                downloaded_at REAL NOT NULL,
+                PRIMARY KEY (project, version, file_name)
+            );
+            CREATE TABLE IF NOT EXISTS schedules (
+                project TEXT PRIMARY KEY,
+                cron TEXT NOT NULL,
+                tick REAL,
+                next_run REAL,
+                last_start REAL,
+                last_end REAL,
+                last_status TEXT
+            );
+        """)
+        self._conn.commit()
+
+    @classmethod
+    def open(cls, db_path: str) -> 'StateStore':
+        """获取数据库文件对应的状态库（同一文件在进程内共用一个实例）"""
+        db_path = os.path.abspath(db_path)
+        with cls._instances_lock:
+            store = cls._instances.get(db_path)
+            if store is None:
+                store = cls(db_path)
+                cls._instances[db_path] = store
+            return store
+
+    # ---------- 版本 ----------
+
+    def has_versions(self, project: str) -> bool:
+        """是否已经记录过该项目的版本（没有记录时调用方应退回文件系统检测）"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM versions WHERE project = ? LIMIT 1", (project,)
+            ).fetchone() is not None
+
+    def get_version(self, project: str, version: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM versions WHERE project = ? AND version = ?", (project, version)
+            ).fetchone()
+            return dict(row) if row else None
+
+    def record_version(self, project: str, version: str, commit_time: Optional[str] = None) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("""
+                INSERT INTO versions (project, version, commit_time, first_seen, last_seen) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (project, version) DO UPDATE SET
+                    commit_time = COALESCE(excluded.commit_time, versions.commit_time),
+                    last_seen = excluded.last_seen
+            """, (project, version, commit_time, now, now))
+            self._conn.commit()
+
+    # ---------- Atom feed ----------
+
+    def get_feed(self, project: str) -> Optional[str]:
+        """上次完整抓取时 feed 的指纹"""
+        with self._lock:
+            row = self._conn.execute("SELECT fingerprint FROM feeds WHERE project = ?", (project,)).fetchone()
+            return row['fingerprint'] if row else None
+
+    def record_feed(self, project: str, fingerprint: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO feeds (project, fingerprint, checked_at) VALUES (?, ?, ?)",
+                (project, fingerprint, time.time())
+            )
+            self._conn.commit()
+
+    # ---------- 文件 ----------
+
+    def get_asset(self, project: str, version: str, file_name: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM assets WHERE project = ? AND version = ? AND file_name = ?",
+                (project, version, file_name)
+            ).fetchone()
+            return dict(row) if row else None
+
+    def record_asset(self, project: str, version: str, file_name: str,
+                     source_code: bool = False, size: Optional[int] = None, sha256: Optional[str] = None,
+                     etag: Optional[str] = None, update_time: Optional[str] = None) -> None:
+        with self._lock:
+            self._conn.execute("""
+                INSERT OR REPLACE INTO assets
+                    (project, version, file_name, source_code, size, sha256, etag, update_time, downloaded_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (project, version, file_name, int(bool(source_code)), size,
+                  sha256.lower() if sha256 else None, etag, update_time, time.time()))
+            self._conn.commit()
+
+    # ---------- 定时任务 ----------
+
+    def get_schedules(self) -> Dict[str, Dict[str, Any]]:
+        """定时任务的下次执行时间表 {项目: {"cron", "tick", "next_run", "last_start", "last_end", "last_status"}}"""
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM schedules ORDER BY next_run").fetchall()
+            return {row['project']: dict(row) for row in rows}
+
+    def record_schedule(self, project: str, cron: str, tick: Optional[float], next_run: Optional[float]) -> None:
+        """记录项目的 cron 表达式、下一次 cron 触发时间和加上随机延迟后的实际执行时间"""
+        with self._lock:
+            self._conn.execute("""
+                INSERT INTO schedules (project, cron, tick, next_run) VALUES (?, ?, ?, ?)
+                ON CONFLICT (project) DO UPDATE SET
+                    cron = excluded.cron, tick = excluded.tick, next_run = excluded.next_run
+            """, (project, cron, tick, next_run))
+            self._conn.commit()
+
+    def record_schedule_run(self, project: str, start: float, end: Optional[float] = None,
+                            status: Optional[str] = None) -> None:
+        """记录项目最近一次定时执行的开始 / 结束时间和结果"""
+        with self._lock:
+            self._conn.execute("""
+                UPDATE schedules SET last_start = ?, last_end = ?, last_status = ? WHERE project = ?
+            """, (start, end, status, project))
+            self._conn.commit()
+
+    def remove_schedules(self, keep: List[str]) -> None:
+        """删除不在 keep 中的项目的定时记录 (项目已删除或不再定时执行)"""
+        with self._lock:
+            placeholders = ', '.join('?' * len(keep))
+            self._conn.execute(f"DELETE FROM schedules WHERE project NOT IN ({placeholders})", tuple(keep))
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,25 @@
+import re
+from typing import Union
+
+_SIZE_UNITS = {'': 1, 'B': 1, 'K': 1024, 'KB': 1024, 'M': 1024 ** 2, 'MB': 1024 ** 2, 'G': 1024 ** 3, 'GB': 1024 ** 3}
+
+
+def parse_size(value: Union[str, int, float, None], default: int = 0) -> int:
+    """解析大小配置，支持纯数字(字节)和 K/M/G 后缀，例如 512K、16M、1.5G"""
+    if value is None or value == '':
+        return default
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = re.fullmatch(r'\s*([\d.]+)\s*([A-Za-z]*)\s*', str(value))
+    if not match or match.group(2).upper() not in _SIZE_UNITS:
+        raise ValueError(f"无法解析的大小: {value}")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2).upper()])
+
+
+def format_rate(rate: float) -> str:
+    """字节/秒 -> 1.5MB/s"""
+    for unit in ('B', 'KB', 'MB'):
+        if rate < 1024:
+            return f"{rate:.1f}{unit}/s"
+        rate /= 1024
+    return f"{rate:.1f}GB/s"
@@ -0,0 +1,246 @@
+"""端到端基准：本地模拟 GitHub 服务器 + 命令行执行 N 个项目 (request + download)，
+输出每个项目的请求数、耗时、吞吐量、CPU 时间和内存峰值 (JSON)，用于对比每次修改前后的结果
+
+用法:
+    python benchmarks/e2e_benchmark.py --projects 20 --versions 5 --size 1000000
+    python benchmarks/e2e_benchmark.py --engine async --latency 50 --errors 50 --runs 2 --output result.json
+    python benchmarks/e2e_benchmark.py --fixtures benchmarks/fixtures --baseline result.json
+
+- 每次运行在子进程中执行 (和 no_gui.py execute 相同的流程)，CPU 时间和内存峰值是子进程的统计 (不含模拟服务器)
+- --runs 2 时之后的运行使用同一个状态库和输出目录 (页面未变化 / 文件已存在时的开销)
+- --baseline 指定上次输出的 JSON 时，结果中加入各指标相对上次的变化 (百分比)
+- 页面和文件由 fake_github.py 提供，--fixtures 使用 parse_benchmark.py --fetch 保存的真实页面
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import threading
+import subprocess
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+import fake_github  # noqa: E402
+
+# 和上次结果对比的指标
+COMPARED = ('wall_seconds', 'cpu_seconds', 'peak_rss_mb', 'requests', 'throughput_mb_s')
+
+
+def write_config(path: str, work_dir: str, base_url: str, args) -> None:
+    """生成运行使用的配置文件 (全局配置 + projects 个项目)"""
+    lines = [
+        "[global]",
+        f"threads = {args.threads}",
+        f"engine = {args.engine}",
+        f"parse_workers = {args.parse_workers}",
+        f"html_parser = {args.html_parser}",
+        f"resolve_mode = {args.resolve_mode}",
+        f"feed_precheck = {str(args.feed_precheck).lower()}",
+        f"download_workers = {args.download_workers}",
+        # 限速由模拟服务器的 --throttle 测试，客户端默认不限速
+        f"rate_limit = {args.rate_limit}",
+        f"backend = {args.backend}",
+        f"api_base = {base_url}/api",
+        # GraphQL 后端需要 token，模拟服务器不校验
+        "github_token = benchmark",
+        f"state_db = {os.path.join(work_dir, 'state.sqlite')}",
+        f"log_file = {os.path.join(work_dir, 'benchmark.log')}",
+        "",
+    ]
+    for i in range(args.projects):
+        lines += [
+            f"[p{i}]",
+            f"url = {base_url}/p{i}/repo/",
+            f"output = {os.path.join(work_dir, 'output', f'p{i}')}",
+            "action_type = download",
+            f"only_latest = {str(args.only_latest).lower()}",
+            "ignore_ssl = false",
+            "",
+        ]
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines))
+
+
+def run_child(config_file: str, result_file: str) -> None:
+    """子进程: 按配置文件执行所有项目，执行时间和各项目的请求统计写入 result_file"""
+    import no_gui
+
+    cli = no_gui.GitHubDownloaderCLI(config_file)
+    start = time.perf_counter()
+    cli.execute_tasks(cli.config_manager.get_project_configs())
+    elapsed = time.perf_counter() - start
+    with open(result_file, 'w', encoding='utf-8') as f:
+        json.dump({"execute_seconds": elapsed, "request_stats": cli.task_executor.request_stats}, f)
+
+
+def measure(config_file: str, work_dir: str, run: int) -> dict:
+    """执行一次并返回子进程的耗时、CPU 时间和内存峰值"""
+    result_file = os.path.join(work_dir, f'result-{run}.json')
+    with open(os.path.join(work_dir, f'run-{run}.log'), 'wb') as log:
+        start = time.perf_counter()
+        process = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--child', config_file, result_file],
+                                   stdout=log, stderr=subprocess.STDOUT)
+        if hasattr(os, 'wait4'):
+            _, status, usage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+        else:
+            # Windows 没有 wait4，不统计 CPU 时间和内存峰值
+            process.wait()
+            usage = None
+        wall = time.perf_counter() - start
+
+    result = {"exit_code": process.returncode, "wall_seconds": round(wall, 3),
+              "cpu_user_seconds": None, "cpu_system_seconds": None, "cpu_seconds": None,
+              "cpu_percent": None, "peak_rss_mb": None}
+    if usage is not None:
+        cpu = usage.ru_utime + usage.ru_stime
+        # ru_maxrss 在 Linux 上单位为 KB，macOS 上为字节
+        rss = usage.ru_maxrss if sys.platform == 'darwin' else usage.ru_maxrss * 1024
+        result.update(cpu_user_seconds=round(usage.ru_utime, 3), cpu_system_seconds=round(usage.ru_stime, 3),
+                      cpu_seconds=round(cpu, 3), cpu_percent=round(cpu / wall * 100, 1),
+                      peak_rss_mb=round(rss / 1024 / 1024, 1))
+    if os.path.exists(result_file):
+        with open(result_file, encoding='utf-8') as f:
+            child = json.load(f)
+        result["execute_seconds"] = round(child["execute_seconds"], 3)
+        result["client_requests"] = {name: stats.get('requests', 0) for name, stats in sorted(child["request_stats"].items())}
+        result["not_modified"] = sum(stats.get('not_modified', 0) for stats in child["request_stats"].values())
+    return result
+
+
+def server_stats(projects: int, wall: float) -> dict:
+    """模拟服务器统计的请求数 / 发送字节数 (按项目)"""
+    handler = fake_github.Handler
+    with handler._lock:
+        repos = {name: dict(stats) for name, stats in handler.repos.items()}
+        counts = dict(handler.counts)
+    per_project = [repos.get(f"p{i}/repo", {}).get('requests', 0) for i in range(projects)]
+    total_bytes = sum(stats['bytes'] for stats in repos.values())
+    download_bytes = sum(stats['download_bytes'] for stats in repos.values())
+    return {
+        "requests": sum(per_project),
+        "requests_per_project": {
+            "mean": round(sum(per_project) / max(projects, 1), 1),
+            "min": min(per_project, default=0),
+            "max": max(per_project, default=0),
+        },
+        "downloads": sum(stats['downloads'] for stats in repos.values()),
+        "bytes_sent": total_bytes,
+        "download_bytes": download_bytes,
+        "throughput_mb_s": round(download_bytes / 1024 / 1024 / wall, 2) if wall else None,
+        "projects_per_second": round(projects / wall, 2) if wall else None,
+        "responses": counts,
+    }
+
+
+def compare(runs: list, baseline_runs: list) -> None:
+    """各次运行的指标相对上次结果 (同一序号的运行) 的变化百分比"""
+    for run, baseline in zip(runs, baseline_runs):
+        diff = {}
+        for key in COMPARED:
+            old, new = baseline.get(key), run.get(key)
+            if old and new is not None:
+                diff[key] = round((new - old) / old * 100, 1)
+        run['baseline_diff_percent'] = diff
+
+
+def main():
+    parser = argparse.ArgumentParser(description='端到端基准 (本地模拟 GitHub 服务器)')
+    parser.add_argument('--child', nargs=2, metavar=('CONFIG', 'RESULT'), help=argparse.SUPPRESS)
+    parser.add_argument('--projects', type=int, default=10, help='项目数')
+    parser.add_argument('--runs', type=int, default=1, help='运行次数，之后的运行复用状态库和输出目录')
+    # 模拟服务器
+    parser.add_argument('--versions', type=int, default=5, help='每个仓库的版本数')
+    parser.add_argument('--size', type=int, default=200000, help='每个 release 文件的字节数')
+    parser.add_argument('--fixtures', help='parse_benchmark.py --fetch 保存页面的目录')
+    parser.add_argument('--padding', type=int, default=0, help='生成的页面中加入的无关内容字节数 (模拟真实页面大小)')
+    parser.add_argument('--latency', type=float, default=0, help='每个请求的延迟 (毫秒)')
+    parser.add_argument('--jitter', type=float, default=0, help='每个请求额外的随机延迟上限 (毫秒)')
+    parser.add_argument('--errors', type=int, default=0, help='每 N 个请求返回一次 502')
+    parser.add_argument('--throttle', type=int, default=0, help='每 N 个请求返回一次 429')
+    parser.add_argument('--flaky', type=int, default=0, help='每 N 个文件下载中断一次')
+    parser.add_argument('--bandwidth', type=int, default=0, help='每个文件下载连接的速度上限 (字节/秒)')
+    # 下载器配置
+    parser.add_argument('--engine', choices=['thread', 'async'], default='thread', help='执行引擎')
+    parser.add_argument('--threads', type=int, default=4, help='同时执行的项目数 (全局配置 threads)')
+    parser.add_argument('--backend', choices=['html', 'rest', 'graphql'], default='html', help='获取版本信息的方式')
+    parser.add_argument('--resolve-mode', choices=['fast', 'full'], default='fast')
+    parser.add_argument('--html-parser', default='auto')
+    parser.add_argument('--parse-workers', default='0', help='HTML解析进程数')
+    parser.add_argument('--download-workers', type=int, default=8)
+    parser.add_argument('--rate-limit', type=float, default=0, help='客户端每秒请求数上限，0 为不限速')
+    parser.add_argument('--feed-precheck', action='store_true', help='启用 feed 预检查')
+    parser.add_argument('--only-latest', action='store_true', help='只下载最新版本')
+    # 输出
+    parser.add_argument('--output', help='结果同时写入该文件')
+    parser.add_argument('--baseline', help='上次输出的 JSON，对比各指标的变化')
+    parser.add_argument('--keep', action='store_true', help='保留工作目录 (日志、状态库和下载的文件)')
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(*args.child)
+        return
+
+    baseline_runs = None
+    if args.baseline:
+        try:
+            with open(args.baseline, encoding='utf-8') as f:
+                baseline_runs = json.load(f).get('runs', [])
+        except (OSError, ValueError) as e:
+            parser.error(f"读取上次的结果失败: {e}")
+
+    work_dir = tempfile.mkdtemp(prefix='github-download-bench-')
+    server = fake_github.serve(0, args.versions, args.size, args.throttle, args.flaky, args.errors,
+                               args.latency / 1000, args.jitter / 1000, args.bandwidth, args.fixtures, args.padding)
+    threading.Thread(target=server.serve_forever, name='fake-github', daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    config_file = os.path.join(work_dir, 'config.ini')
+    write_config(config_file, work_dir, base_url, args)
+
+    runs = []
+    try:
+        for run in range(1, args.runs + 1):
+            fake_github.Handler.counts = {}
+            fake_github.Handler.repos = {}
+            print(f"运行 {run} / {args.runs}: {args.projects} 个项目 ...", file=sys.stderr)
+            result = measure(config_file, work_dir, run)
+            result = dict(run=run, **result, **server_stats(args.projects, result['wall_seconds']))
+            runs.append(result)
+            print(f"  耗时 {result['wall_seconds']:.2f}s, 请求 {result['requests']} 次, "
+                  f"下载 {result['download_bytes'] / 1024 / 1024:.2f} MB, 退出码 {result['exit_code']}", file=sys.stderr)
+    finally:
+        server.shutdown()
+        server.server_close()
+        if args.keep:
+            print(f"工作目录: {work_dir}", file=sys.stderr)
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    if baseline_runs is not None:
+        compare(runs, baseline_runs)
+
+    params = {key: value for key, value in vars(args).items() if key not in ('child', 'output', 'baseline', 'keep')}
+    report = {
+        "benchmark": "e2e",
+        "time": time.strftime('%Y-%m-%dT%H:%M:%S'),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "params": params,
+        "runs": runs,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == '__main__':
+    main()
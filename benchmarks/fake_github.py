@@ -0,0 +1,495 @@
+"""本地模拟 GitHub 服务器，用于离线测试抓取 / API 后端和下载
+
+    python benchmarks/fake_github.py --port 8800 --versions 5 --size 200000
+    python benchmarks/fake_github.py --fixtures benchmarks/fixtures --latency 50 --errors 20
+
+仓库URL: http://127.0.0.1:<port>/<owner>/<repo>，名称以 src 开头的仓库没有 release
+API 地址 (api_base): http://127.0.0.1:<port>/api
+页面和 API 的 JSON 响应带 ETag，支持 If-None-Match；下载文件支持 Range。
+--fixtures DIR 时返回 parse_benchmark.py --fetch 保存的真实页面 (链接替换为请求的仓库)，
+没有保存的页面时可以用 --padding N 在生成的页面中加入 N 字节无关内容，模拟真实页面的解析开销；
+--latency MS / --jitter MS 每个请求延迟 MS 毫秒 (加上 0 ~ jitter 毫秒的随机延迟) 后响应；
+--errors N 时每 N 个请求返回一次 502，用于测试错误处理；
+--throttle N 时每 N 个请求返回一次 429 (Retry-After: 1)，用于测试限速和重试；
+--flaky N 时每 N 个文件下载只发送一半数据就断开连接，用于测试断点续传；
+--bandwidth BYTES 限制每个文件下载连接的速度 (字节/秒)。
+GET /_stats 返回按仓库统计的请求数和发送字节数 (不计入统计)。
+"""
+import os
+import re
+import json
+import time
+import random
+import hashlib
+import argparse
+from threading import Lock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+COMMIT_TIME = "2024-10-08T01:24:03.000+08:00"
+ASSET_TIME = "2024-01-01T00:00:00Z"
+ASSET_NAMES = ("a.bin", "b.bin")
+PAGE_SIZE = 10
+
+
+def _filler(size: int) -> str:
+    """模拟 GitHub 页面中与解析无关的头部/导航/脚本等内容"""
+    if size <= 0:
+        return ''
+    block = ('<div class="d-flex flex-items-center"><a class="HeaderMenu-link" href="/features">Features</a>'
+             '<span class="octicon" aria-hidden="true"><svg width="16" height="16"><path d="M1 2h3v3H1z"></path></svg></span>'
+             '<script type="application/json">{"a": 1, "b": [1, 2, 3]}</script></div>\n')
+    return block * (size // len(block) + 1)
+
+
+def load_fixtures(directory: str) -> dict:
+    """读取 parse_benchmark.py --fetch 保存的页面
+
+    :returns {"repo": "页面所属的仓库路径 /owner/repo/", "tags" / "main" / "release" / "assets" / "latest-commit": bytes}
+    """
+    with open(os.path.join(directory, 'fixtures.json'), encoding='utf-8') as f:
+        fixtures = {"repo": json.load(f)['repo']}
+    for name in sorted(os.listdir(directory)):
+        kind = next((k for k in ('tags', 'main', 'release', 'assets', 'latest-commit') if name.startswith(k)), None)
+        if kind and kind not in fixtures and name.endswith(('.html', '.json')):
+            with open(os.path.join(directory, name), 'rb') as f:
+                fixtures[kind] = f.read()
+    return fixtures
+
+
+class FakeGithub:
+    """模拟仓库的数据：每个有 release 的仓库有 versions 个版本，每个版本 2 个文件
+
+    fixtures 中有保存的页面时返回保存的页面 (版本和文件以页面为准)，padding 为生成的页面中加入的无关内容字节数
+    """
+
+    def __init__(self, versions: int = 5, size: int = 200000, fixtures: dict = None, padding: int = 0):
+        self.versions = [f"v1.{i}" for i in range(versions, 0, -1)]
+        self.size = size
+        self.fixtures = fixtures or {}
+        self.filler = _filler(padding // 2)
+
+    def recorded(self, kind: str, owner: str, repo: str):
+        """保存的页面，页面中原仓库的链接替换为请求的仓库，没有保存时返回 None"""
+        page = self.fixtures.get(kind)
+        if page is None:
+            return None
+        page = page.replace(self.fixtures['repo'].rstrip('/').encode() + b'/', f"/{owner}/{repo}/".encode())
+        if kind == 'assets':
+            # 文件内容是生成的，页面上的 hash 替换为生成内容的 hash
+            page = re.sub(rb'<li.*?</li>', lambda m: self._replace_digest(m.group(0)), page, flags=re.S)
+        return page
+
+    def _replace_digest(self, li: bytes) -> bytes:
+        link = re.search(rb'/releases/download/([^/"]+)/([^/"]+)"', li)
+        if not link:
+            return li
+        digest = self.digest(link.group(1).decode(), link.group(2).decode()).encode()
+        return re.sub(rb'sha256:[0-9a-f]{64}', digest, li)
+
+    def pad(self, body: str) -> str:
+        return body.replace('<body>', f'<body>{self.filler}', 1).replace('</body>', f'{self.filler}</body>', 1)
+
+    @staticmethod
+    def has_release(repo: str) -> bool:
+        return not repo.startswith('src')
+
+    def asset(self, version: str, name: str) -> bytes:
+        return (f"{version}-{name}".encode() * (self.size // 10 + 1))[:self.size]
+
+    def digest(self, version: str, name: str) -> str:
+        return "sha256:" + hashlib.sha256(self.asset(version, name)).hexdigest()
+
+    # ---------- HTML 页面 ----------
+
+    def main_page(self, owner: str, repo: str, branch: str):
+        if self.has_release(repo) and 'main' in self.fixtures:
+            return self.recorded('main', owner, repo)
+        release = '<div class="ml-2 min-width-0">release</div>' if self.has_release(repo) else ''
+        return self.pad(f'<html><body><div class="Layout-main"><button>{branch}</button></div>'
+                        f'<p class="f4 my-3">About {repo}</p>{release}</body></html>')
+
+    def tags_page(self, owner: str, repo: str, after: str = None):
+        if not self.has_release(repo):
+            return '<html><body><h2>There aren’t any releases here</h2></body></html>'
+        if 'tags' in self.fixtures:
+            # 保存的只有一页，请求下一页时返回同一页 (下载器发现没有新的版本后停止分页)
+            return self.recorded('tags', owner, repo)
+        start = self.versions.index(after) + 1 if after in self.versions else 0
+        page = self.versions[start:start + PAGE_SIZE]
+        rows = "".join(
+            f'<div class="Box-row position-relative d-flex"><a class="Link--primary Link" '
+            f'href="/{owner}/{repo}/releases/tag/{v}">{v}</a><relative-time datetime="{COMMIT_TIME}">Oct 8</relative-time></div>'
+            for v in page)
+        next_link = (f'<a href="/{owner}/{repo}/tags?after={page[-1]}">Next</a>'
+                     if start + PAGE_SIZE < len(self.versions) else '')
+        return self.pad(f'<html><body>{rows}<div class="pagination">{next_link}</div></body></html>')
+
+    def release_page(self, owner: str, repo: str):
+        if 'release' in self.fixtures:
+            return self.recorded('release', owner, repo)
+        return self.pad('<html><body><div data-view-component="true" class="Box-body"><p>changes</p></div></body></html>')
+
+    def latest_commit(self, owner: str, repo: str):
+        if 'latest-commit' in self.fixtures:
+            return self.recorded('latest-commit', owner, repo)
+        return json.dumps({"date": COMMIT_TIME})
+
+    def assets_page(self, owner: str, repo: str, version: str):
+        if 'assets' in self.fixtures:
+            return self.recorded('assets', owner, repo)
+        items = "".join(
+            f'<li><a href="/{owner}/{repo}/releases/download/{version}/{name}"><span class="Truncate-text text-bold">{name}</span></a>'
+            f'<span class="Truncate text-mono text-small color-fg-muted">{self.digest(version, name)}</span>'
+            f'<span class="Truncate-text">{self.size / 1024:.1f} KB</span>'
+            f'<relative-time datetime="{ASSET_TIME}"></relative-time></li>'
+            for name in ASSET_NAMES)
+        return f'<ul>{items}<li><a href="#"><span class="Truncate-text text-bold">Source code</span></a></li></ul>'
+
+    def feed(self, repo: str, kind: str) -> str:
+        entries = "".join(f'<entry><id>tag:{v}</id><updated>{ASSET_TIME}</updated><title>{v}</title></entry>'
+                          for v in self.versions) if kind == 'tags' and self.has_release(repo) else ''
+        if kind == 'commits':
+            entries = f'<entry><id>commit:main</id><updated>{COMMIT_TIME}</updated><title>main</title></entry>'
+        return f'<?xml version="1.0"?><feed xmlns="http://www.w3.org/2005/Atom"><id>{repo}</id>{entries}</feed>'
+
+    # ---------- API ----------
+
+    def api_assets(self, base: str, owner: str, repo: str, version: str, graphql: bool = False) -> list:
+        assets = []
+        for name in ASSET_NAMES:
+            url = f"{base}/{owner}/{repo}/releases/download/{version}/{name}"
+            if graphql:
+                assets.append({"name": name, "downloadUrl": url, "updatedAt": ASSET_TIME, "size": self.size,
+                               "digest": self.digest(version, name)})
+            else:
+                assets.append({"name": name, "browser_download_url": url, "updated_at": ASSET_TIME, "size": self.size,
+                               "digest": self.digest(version, name)})
+        return assets
+
+    def api_repository(self, owner: str, repo: str) -> dict:
+        return {"full_name": f"{owner}/{repo}", "description": f"About {repo}", "default_branch": "main"}
+
+    def api_releases(self, base: str, owner: str, repo: str) -> list:
+        if not self.has_release(repo):
+            return []
+        return [{"tag_name": v, "body": f"changes {v}", "draft": False,
+                 "assets": self.api_assets(base, owner, repo, v)} for v in self.versions]
+
+    def graphql_repository(self, base: str, owner: str, repo: str, first: int, after: str = None) -> dict:
+        versions = self.versions if self.has_release(repo) else []
+        start = int(after) if after else 0
+        page = versions[start:start + first]
+        return {
+            "description": f"About {repo}",
+            "url": f"{base}/{owner}/{repo}",
+            "defaultBranchRef": {"name": "main", "target": {"committedDate": COMMIT_TIME}},
+            "releases": {
+                "pageInfo": {"hasNextPage": start + first < len(versions), "endCursor": str(start + len(page))},
+                "nodes": [{"tagName": v, "description": f"changes {v}", "isDraft": False,
+                           "tagCommit": {"committedDate": COMMIT_TIME},
+                           "releaseAssets": {"nodes": self.api_assets(base, owner, repo, v, graphql=True)}}
+                          for v in page],
+            },
+        }
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    github: FakeGithub = None
+    # 请求计数 {"GET /path 前缀": 次数}
+    counts = {}
+    # 每 throttle 个请求返回一次 429，0 为不限流
+    throttle = 0
+    _total = 0
+    # 每 flaky 个文件下载中断一次，0 为不中断
+    flaky = 0
+    _downloads = 0
+    # 每 errors 个请求返回一次 502，0 为不返回错误
+    errors = 0
+    _requests = 0
+    # 每个请求的延迟和随机延迟 (秒)
+    latency = 0.0
+    jitter = 0.0
+    # 每个文件下载连接的速度上限 (字节/秒)，0 为不限速
+    bandwidth = 0
+    # 按仓库统计 {"owner/repo": {"requests": 次数, "bytes": 发送字节数, "downloads": 文件下载次数, "download_bytes": 文件字节数}}
+    repos = {}
+    _lock = Lock()
+    _repo = None
+
+    def log_message(self, *args):
+        pass
+
+    def _count_repo(self, owner: str, repo: str):
+        self._repo = f"{owner}/{repo}"
+        with self._lock:
+            stats = self.repos.setdefault(self._repo, {"requests": 0, "bytes": 0, "downloads": 0, "download_bytes": 0})
+            stats["requests"] += 1
+
+    def _sent(self, size: int, download: bool = False):
+        if self._repo:
+            with self._lock:
+                stats = self.repos[self._repo]
+                stats["bytes"] += size
+                if download:
+                    stats["download_bytes"] += size
+
+    def _write(self, body: bytes):
+        """发送响应内容，bandwidth 限制下载速度"""
+        if not self.bandwidth or len(body) <= 16 * 1024:
+            self.wfile.write(body)
+        else:
+            chunk = max(self.bandwidth // 10, 1024)
+            for start in range(0, len(body), chunk):
+                self.wfile.write(body[start:start + chunk])
+                time.sleep(min(chunk, len(body) - start) / self.bandwidth)
+        self._sent(len(body), download=True)
+
+    def _delay(self):
+        if self.latency or self.jitter:
+            time.sleep(self.latency + random.uniform(0, self.jitter))
+
+    def _failed(self) -> bool:
+        """每 errors 个请求返回一次 502"""
+        with self._lock:
+            Handler._requests += 1
+            failed = self.errors and Handler._requests % self.errors == 0
+        if failed:
+            self._count('502')
+            self.send(502, 'bad gateway', 'text/plain')
+        return bool(failed)
+
+    @property
+    def base(self) -> str:
+        return f"http://{self.headers.get('Host')}"
+
+    def _count(self, kind: str):
+        self.counts[kind] = self.counts.get(kind, 0) + 1
+
+    def send(self, code: int, body, content_type: str = 'text/html', headers: dict = None):
+        if isinstance(body, str):
+            body = body.encode()
+        headers = dict(headers or {})
+        if code == 200 and content_type in ('text/html', 'application/json', 'application/atom+xml'):
+            etag = 'W/"%s"' % hashlib.md5(body).hexdigest()
+            headers['ETag'] = etag
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+        self.send_response(code)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            if content_type == 'application/octet-stream':
+                self._write(body)
+            else:
+                self.wfile.write(body)
+                self._sent(len(body))
+
+    def send_json(self, data, headers: dict = None):
+        self.send(200, json.dumps(data), 'application/json', headers)
+
+    def _throttled(self) -> bool:
+        with self._lock:
+            Handler._total += 1
+            throttled = self.throttle and Handler._total % self.throttle == 0
+        if throttled:
+            self._count('429')
+            self.send(429, 'rate limited', 'text/plain', {'Retry-After': '1'})
+            return True
+        return False
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_POST(self):
+        self._repo = None
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'{}')
+        self._delay()
+        if self._throttled() or self._failed():
+            return
+        if urlparse(self.path).path != '/api/graphql':
+            return self.send(404, 'not found')
+        self._count('graphql')
+        variables = body.get('variables') or {}
+        data = {}
+        i = 0
+        while f"o{i}" in variables:
+            self._count_repo(variables[f"o{i}"], variables[f"n{i}"])
+            # 批量查询的响应不计入单个仓库的字节数
+            self._repo = None
+            data[f"r{i}"] = self.github.graphql_repository(self.base, variables[f"o{i}"], variables[f"n{i}"],
+                                                           int(variables[f"f{i}"]), variables.get(f"a{i}"))
+            i += 1
+        self.send_json({"data": data})
+
+    def do_GET(self):
+        self._repo = None
+        url = urlparse(self.path)
+        if url.path == '/_stats':
+            with self._lock:
+                return self.send(200, json.dumps({"counts": self.counts, "repos": self.repos}), 'text/plain')
+        self._delay()
+        if self.command == 'GET' and (self._throttled() or self._failed()):
+            return
+        query = parse_qs(url.query)
+        if url.path.startswith('/api/'):
+            return self._api(url.path[len('/api'):], query)
+
+        match = re.match(r'^/([^/]+)/([^/]+)/?(.*)$', url.path)
+        if not match:
+            return self.send(404, 'not found')
+        owner, repo, rest = match.groups()
+        github = self.github
+        self._count(rest.split('/')[0] or 'main')
+        self._count_repo(owner, repo)
+
+        if rest == '':
+            return self.send(200, github.main_page(owner, repo, 'main'))
+        if rest.startswith('tree/'):
+            return self.send(200, github.main_page(owner, repo, rest[len('tree/'):]))
+        if rest.startswith('latest-commit/'):
+            return self.send(200, github.latest_commit(owner, repo), 'application/json')
+        if rest in ('tags.atom', 'commits.atom'):
+            return self.send(200, github.feed(repo, rest.split('.')[0]), 'application/atom+xml')
+        if rest == 'tags':
+            return self.send(200, github.tags_page(owner, repo, query.get('after', [None])[0]))
+        if rest.startswith('releases/tag/'):
+            return self.send(200, github.release_page(owner, repo))
+        if rest.startswith('releases/expanded_assets/'):
+            return self.send(200, github.assets_page(owner, repo, rest.split('/')[-1]))
+        if rest.startswith('releases/download/'):
+            _, _, version, name = rest.split('/')
+            return self._send_file(github.asset(version, name))
+        if rest.startswith('archive/'):
+            ref = rest.split('/')[-1]
+            # GitHub 的源码包文件名会去掉版本号前的 v
+            if re.match(r'^v\d', ref):
+                ref = ref[1:]
+            name = f"{repo}-{ref}"
+            return self.send(200, b'zip' * 1000, 'application/zip', {'Content-Disposition': f'attachment; filename={name}'})
+        return self.send(404, 'not found')
+
+    def _send_file(self, body: bytes):
+        if self.command == 'GET':
+            self._count('download')
+            if self._repo:
+                with self._lock:
+                    self.repos[self._repo]["downloads"] += 1
+        headers = {'Accept-Ranges': 'bytes', 'ETag': '"%s"' % hashlib.md5(body).hexdigest()}
+        range_header = self.headers.get('Range')
+        if_range = self.headers.get('If-Range')
+        if range_header and if_range and if_range != headers['ETag']:
+            # If-Range 不匹配时返回完整内容
+            range_header = None
+        if self.command == 'GET' and self.flaky:
+            Handler._downloads += 1
+            if Handler._downloads % self.flaky == 0:
+                self._count('interrupted')
+                start, end = 0, len(body) - 1
+                if range_header:
+                    start, _, end = range_header.split('=', 1)[1].partition('-')
+                    start, end = int(start), int(end) if end else len(body) - 1
+                part = body[start:end + 1]
+                self.send_response(206 if range_header else 200)
+                self.send_header('Content-Type', 'application/octet-stream')
+                self.send_header('Content-Length', str(len(part)))
+                if range_header:
+                    self.send_header('Content-Range', f'bytes {start}-{end}/{len(body)}')
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self._write(part[:len(part) // 2])
+                self.wfile.flush()
+                self.close_connection = True
+                return
+        if range_header:
+            start, _, end = range_header.split('=', 1)[1].partition('-')
+            start, end = int(start), int(end) if end else len(body) - 1
+            headers['Content-Range'] = f'bytes {start}-{end}/{len(body)}'
+            return self.send(206, body[start:end + 1], 'application/octet-stream', headers)
+        return self.send(200, body, 'application/octet-stream', headers)
+
+    def _api(self, path: str, query: dict):
+        match = re.match(r'^/repos/([^/]+)/([^/]+)/?(.*)$', path)
+        if not match:
+            return self.send(404, '{"message": "Not Found"}', 'application/json')
+        owner, repo, rest = match.groups()
+        self._count(f"api:{rest.split('/')[0] or 'repo'}")
+        self._count_repo(owner, repo)
+        github = self.github
+
+        if rest == '':
+            return self.send_json(github.api_repository(owner, repo))
+        if rest == 'commits':
+            return self.send_json([{"sha": "0" * 40, "commit": {"committer": {"date": COMMIT_TIME}}}])
+        if rest.startswith('commits/'):
+            return self.send_json({"sha": "0" * 40, "commit": {"committer": {"date": COMMIT_TIME}}})
+        if rest == 'releases':
+            releases = github.api_releases(self.base, owner, repo)
+            per_page = int(query.get('per_page', ['30'])[0])
+            page = int(query.get('page', ['1'])[0])
+            items = releases[(page - 1) * per_page:page * per_page]
+            headers = {}
+            if page * per_page < len(releases):
+                headers['Link'] = f'<{self.base}/api/repos/{owner}/{repo}/releases?per_page={per_page}&page={page + 1}>; rel="next"'
+            return self.send_json(items, headers)
+        return self.send(404, '{"message": "Not Found"}', 'application/json')
+
+
+def serve(port: int, versions: int = 5, size: int = 200000, throttle: int = 0, flaky: int = 0,
+          errors: int = 0, latency: float = 0, jitter: float = 0, bandwidth: int = 0,
+          fixtures: str = None, padding: int = 0) -> ThreadingHTTPServer:
+    """创建模拟服务器 (调用方负责 serve_forever / shutdown)
+
+    latency / jitter 单位为秒，fixtures 为 parse_benchmark.py --fetch 保存页面的目录
+    """
+    Handler.github = FakeGithub(versions, size, load_fixtures(fixtures) if fixtures else None, padding)
+    Handler.counts = {}
+    Handler.repos = {}
+    Handler.throttle = throttle
+    Handler._total = 0
+    Handler.flaky = flaky
+    Handler._downloads = 0
+    Handler.errors = errors
+    Handler._requests = 0
+    Handler.latency = latency
+    Handler.jitter = jitter
+    Handler.bandwidth = bandwidth
+    return ThreadingHTTPServer(('127.0.0.1', port), Handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='本地模拟 GitHub 服务器')
+    parser.add_argument('--port', type=int, default=8800)
+    parser.add_argument('--versions', type=int, default=5, help='每个仓库的版本数')
+    parser.add_argument('--size', type=int, default=200000, help='每个 release 文件的字节数')
+    parser.add_argument('--throttle', type=int, default=0, help='每 N 个请求返回一次 429，0 为不限流')
+    parser.add_argument('--flaky', type=int, default=0, help='每 N 个文件下载中断一次，0 为不中断')
+    parser.add_argument('--errors', type=int, default=0, help='每 N 个请求返回一次 502，0 为不返回错误')
+    parser.add_argument('--latency', type=float, default=0, help='每个请求的延迟 (毫秒)')
+    parser.add_argument('--jitter', type=float, default=0, help='每个请求额外的随机延迟上限 (毫秒)')
+    parser.add_argument('--bandwidth', type=int, default=0, help='每个文件下载连接的速度上限 (字节/秒)，0 为不限速')
+    parser.add_argument('--fixtures', help='parse_benchmark.py --fetch 保存页面的目录')
+    parser.add_argument('--padding', type=int, default=0, help='生成的页面中加入的无关内容字节数')
+    args = parser.parse_args()
+
+    server = serve(args.port, args.versions, args.size, args.throttle, args.flaky, args.errors,
+                   args.latency / 1000, args.jitter / 1000, args.bandwidth, args.fixtures, args.padding)
+    print(f"模拟 GitHub 服务器: http://127.0.0.1:{args.port}/<owner>/<repo>, API: http://127.0.0.1:{args.port}/api")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+"""HTML 解析微基准：对比各解析后端 完整解析 / SoupStrainer 部分解析 每个页面的耗时
+
+用法:
+    python benchmarks/parse_benchmark.py                      # 使用 benchmarks/fixtures 下保存的页面，没有时生成模拟页面
+    python benchmarks/parse_benchmark.py --fetch https://github.com/owner/repo   # 保存真实页面到 fixtures 目录
+    python benchmarks/parse_benchmark.py --repeat 50 --json   # 输出 JSON
+
+fixtures 目录中的文件名决定页面类型: tags*.html / main*.html / release*.html / assets*.html
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+from urllib.parse import urljoin, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from GithubDownload import parsers  # noqa: E402
+from GithubDownload.parsers import ParserBackend, make_soup  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+STRAINERS = {
+    'tags': parsers.TAG_PAGE,
+    'main': parsers.MAIN_PAGE,
+    'release': parsers.RELEASE_PAGE,
+    'assets': parsers.EXPANDED_ASSETS,
+}
+
+
+def _filler(size: int) -> str:
+    """模拟 GitHub 页面中与解析无关的头部/导航/脚本等内容"""
+    block = ('<div class="d-flex flex-items-center"><a class="HeaderMenu-link" href="/features">Features</a>'
+             '<span class="octicon" aria-hidden="true"><svg width="16" height="16"><path d="M1 2h3v3H1z"></path></svg></span>'
+             '<script type="application/json">{"a": 1, "b": [1, 2, 3]}</script></div>\n')
+    return block * (size // len(block) + 1)
+
+
+def synthetic_pages() -> dict:
+    """生成接近真实大小 (几百KB) 的模拟页面"""
+    rows = "".join(
+        f'<div class="Box-row position-relative d-flex"><div class="d-flex"><h2><a class="Link--primary Link" '
+        f'href="/o/r/releases/tag/v1.{i}">v1.{i}</a></h2><relative-time datetime="2024-01-01T00:00:00Z">Jan 1</relative-time></div></div>'
+        for i in range(10, 0, -1))
+    lis = "".join(
+        f'<li class="Box-row"><a href="/o/r/releases/download/v1.0/f{i}.zip"><span class="Truncate-text text-bold">f{i}.zip</span></a>'
+        f'<span class="Truncate text-mono text-small color-fg-muted">sha256:{"0" * 64}</span>'
+        f'<relative-time datetime="2024-01-01T00:00:00Z"></relative-time></li>'
+        for i in range(30))
+    return {
+        'tags': f'<html><body>{_filler(250_000)}<div class="Box">{rows}</div>'
+                f'<div class="paginate-container"><div class="pagination"><a href="/o/r/tags?after=v1.1">Next</a></div></div>'
+                f'{_filler(80_000)}</body></html>',
+        'main': f'<html><body>{_filler(200_000)}<div class="Layout-main"><button>main</button>{_filler(100_000)}</div>'
+                f'<div class="Layout-sidebar"><p class="f4 my-3">About</p><div class="ml-2 min-width-0">rel</div></div>'
+                f'{_filler(50_000)}</body></html>',
+        'release': f'<html><body>{_filler(250_000)}<div data-view-component="true" class="Box-body"><h2>Changes</h2>'
+                   f'<ul><li>fix</li></ul></div>{_filler(50_000)}</body></html>',
+        'assets': f'<ul>{lis}</ul>',
+    }
+
+
+def load_pages(directory: str) -> dict:
+    """读取 fixtures 目录中保存的页面 {名称: (页面类型, HTML)}"""
+    pages = {}
+    if not os.path.isdir(directory):
+        return pages
+    for name in sorted(os.listdir(directory)):
+        kind = next((k for k in STRAINERS if name.startswith(k)), None)
+        if kind and name.endswith('.html'):
+            with open(os.path.join(directory, name), 'rb') as f:
+                pages[name] = (kind, f.read())
+    return pages
+
+
+def fetch_pages(repo_url: str, directory: str) -> None:
+    """保存仓库的 tags / 主页 / latest-commit / 最新 release / expanded_assets 页面
+
+    fixtures.json 中记录页面所属的仓库路径，模拟服务器 (fake_github.py --fixtures) 用它替换页面中的链接
+    """
+    import requests
+
+    repo_url = repo_url.rstrip('/') + '/'
+    os.makedirs(directory, exist_ok=True)
+
+    def save(name, url, headers=None):
+        response = requests.get(url, headers=headers, timeout=30)
+        response.raise_for_status()
+        with open(os.path.join(directory, name), 'wb') as f:
+            f.write(response.content)
+        print(f"已保存 {name}: {url} ({len(response.content)} 字节)")
+        return response.content
+
+    main_html = save('main.html', repo_url)
+    branch = parsers.parse_main_page(main_html)['branch']
+    save('latest-commit.json', urljoin(repo_url, f'latest-commit/{branch}'), {'accept': 'application/json'})
+    meta = {'repo': urlparse(repo_url).path, 'branch': branch, 'version': None}
+
+    tags_html = save('tags.html', urljoin(repo_url, 'tags'))
+    tags, _ = parsers.parse_tag_page(tags_html)
+    if tags:
+        meta['version'] = tags[0]['version']
+        save('release.html', urljoin(repo_url, f"releases/tag/{meta['version']}"))
+        save('assets.html', urljoin(repo_url, f"releases/expanded_assets/{meta['version']}"))
+    with open(os.path.join(directory, 'fixtures.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+
+def bench(html: bytes, backend: str, strainer, repeat: int) -> float:
+    """返回单次解析耗时的中位数 (毫秒)"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        make_soup(html, strainer, backend=backend)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='HTML 解析后端微基准')
+    parser.add_argument('--fixtures', default=FIXTURES_DIR, help='保存页面的目录')
+    parser.add_argument('--fetch', metavar='REPO_URL', help='保存仓库页面到 fixtures 目录后退出')
+    parser.add_argument('--repeat', type=int, default=20, help='每个页面解析次数')
+    parser.add_argument('--json', action='store_true', help='以 JSON 输出结果')
+    args = parser.parse_args()
+
+    if args.fetch:
+        fetch_pages(args.fetch, args.fixtures)
+        return
+
+    pages = load_pages(args.fixtures)
+    source = args.fixtures
+    if not pages:
+        pages = {f'{kind} (模拟)': (kind, html.encode()) for kind, html in synthetic_pages().items()}
+        source = '模拟页面'
+
+    results = []
+    for name, (kind, html) in pages.items():
+        for backend in ParserBackend.available():
+            results.append({
+                'page': name,
+                'size': len(html),
+                'backend': backend,
+                'full_ms': round(bench(html, backend, None, args.repeat), 3),
+                'strained_ms': round(bench(html, backend, STRAINERS[kind], args.repeat), 3),
+            })
+
+    if args.json:
+        print(json.dumps({'source': source, 'repeat': args.repeat, 'results': results}, ensure_ascii=False, indent=2))
+        return
+
+    print(f"页面来源: {source}, 每个页面解析 {args.repeat} 次 (中位数)")
+    print(f"{'页面':<20}{'大小(KB)':>10}  {'后端':<12}{'完整解析(ms)':>14}{'部分解析(ms)':>14}")
+    for r in results:
+        print(f"{r['page']:<20}{r['size'] / 1024:>10.1f}  {r['backend']:<12}{r['full_ms']:>14.2f}{r['strained_ms']:>14.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""HTML 解析进程池基准：多个项目同时解析页面时，解析吞吐量随解析进程数 (parse_workers) 的变化
+
+用法:
+    python benchmarks/parse_pool_benchmark.py                       # 使用 benchmarks/fixtures 下保存的页面，没有时生成模拟页面
+    python benchmarks/parse_pool_benchmark.py --workers 0,1,2,4,8   # 指定要对比的进程数 (0 为在线程中解析)
+    python benchmarks/parse_pool_benchmark.py --projects 64 --json  # 输出 JSON
+
+每个项目解析一遍 fixtures 中的所有页面，--threads 个线程同时提交 (模拟多个项目的下载线程)。
+保存真实页面: python benchmarks/parse_benchmark.py --fetch https://github.com/owner/repo
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from GithubDownload import parsers  # noqa: E402
+from GithubDownload.parsers import ParserBackend  # noqa: E402
+from GithubDownload.parse_pool import ParsePool  # noqa: E402
+from parse_benchmark import FIXTURES_DIR, load_pages, synthetic_pages  # noqa: E402
+
+BASE_URL = 'https://github.com/owner/repo/'
+
+
+def parse_call(kind: str, html: bytes, backend: str) -> tuple:
+    """页面类型对应的解析函数和参数"""
+    if kind == 'tags':
+        return parsers.parse_tag_page, (html, backend)
+    if kind == 'main':
+        return parsers.parse_main_page, (html, backend)
+    if kind == 'release':
+        return parsers.parse_release_change, (html, backend)
+    return parsers.parse_expanded_assets, (html, BASE_URL, backend)
+
+
+def run(pages: dict, workers: int, projects: int, threads: int, backend: str) -> dict:
+    """所有项目的页面解析一遍，返回耗时和吞吐量"""
+    ParsePool.configure(workers)
+    calls = [parse_call(kind, html, backend) for kind, html in pages.values()]
+    # 启动解析进程 (每个进程导入 bs4 等模块)，不计入耗时
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        list(pool.map(lambda call: ParsePool.run(call[0], *call[1]), calls * max(workers, 1)))
+
+    before = ParsePool.stats()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(lambda call: ParsePool.run(call[0], *call[1]), calls * projects))
+    elapsed = time.perf_counter() - start
+    after = ParsePool.stats()
+
+    count = len(calls) * projects
+    size = sum(len(html) for _, html in pages.values()) * projects
+    return {
+        'workers': workers,
+        'pages': count,
+        'seconds': round(elapsed, 3),
+        'pages_per_second': round(count / elapsed, 1),
+        'mb_per_second': round(size / 1024 / 1024 / elapsed, 2),
+        'pooled': after['pooled'] - before['pooled'],
+        'inline': after['inline'] - before['inline'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='HTML 解析进程池基准')
+    parser.add_argument('--fixtures', default=FIXTURES_DIR, help='保存页面的目录')
+    parser.add_argument('--workers', help='逗号分隔的解析进程数，默认 0,1,2,4... 直到CPU核心数')
+    parser.add_argument('--projects', type=int, default=32, help='模拟的项目数')
+    parser.add_argument('--threads', type=int, default=8, help='同时提交解析的线程数')
+    parser.add_argument('--json', action='store_true', help='以 JSON 输出结果')
+    args = parser.parse_args()
+
+    pages = load_pages(args.fixtures)
+    source = args.fixtures
+    if not pages:
+        pages = {f'{kind} (模拟)': (kind, html.encode()) for kind, html in synthetic_pages().items()}
+        source = '模拟页面'
+
+    cpus = os.cpu_count() or 1
+    if args.workers:
+        counts = [int(value) for value in args.workers.split(',')]
+    else:
+        counts, n = [0], 1
+        while n <= cpus:
+            counts.append(n)
+            n *= 2
+        if counts[-1] != cpus:
+            counts.append(cpus)
+
+    backend = ParserBackend.get()
+    results = []
+    try:
+        for workers in counts:
+            results.append(run(pages, workers, args.projects, args.threads, backend))
+    finally:
+        ParsePool.configure(0)
+    baseline = results[0]['pages_per_second']
+    for result in results:
+        result['speedup'] = round(result['pages_per_second'] / baseline, 2)
+
+    if args.json:
+        print(json.dumps({'source': source, 'backend': backend, 'cpus': cpus, 'projects': args.projects,
+                          'threads': args.threads, 'results': results}, ensure_ascii=False, indent=2))
+        return
+
+    print(f"页面来源: {source}, 解析后端: {backend}, CPU核心数: {cpus}, "
+          f"{args.projects} 个项目 x {len(pages)} 个页面, {args.threads} 个线程提交")
+    print(f"{'解析进程':>8}{'耗时(s)':>10}{'页面/s':>10}{'MB/s':>10}{'加速比':>8}")
+    for r in results:
+        print(f"{r['workers'] or '线程':>8}{r['seconds']:>10.2f}{r['pages_per_second']:>10.1f}{r['mb_per_second']:>10.2f}{r['speedup']:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
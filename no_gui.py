@@ -1,4 +1,10 @@
 import sys
+# 启动耗时分析需要在导入其他模块之前开始
+if '--profile-startup' in sys.argv:
+    from GithubDownload.import_profiler import ImportProfiler
+    ImportProfiler.install()
+else:
+    ImportProfiler = None
 import os
 import re
 import time
@@ -9,15 +15,21 @@ import configparser
 import concurrent.futures
 import argparse
 from datetime import datetime, timedelta
-import os
-import time
-import concurrent.futures
-from typing import Dict, Any, List
-from croniter import croniter
-from pathvalidate import sanitize_filename
-from GithubDownload.github import GithubDownloader
-import threading
-import concurrent.futures
+from typing import Dict, Any, List, TYPE_CHECKING
+
+# 下载相关的模块 (rich / bs4 / requests 等) 只在执行任务的命令中导入，
+# list / config 等只读写 config.ini 的命令不需要加载，启动更快
+if TYPE_CHECKING:
+    from GithubDownload.github import GithubDownloader
+
+def as_bool(value, default: bool = True) -> bool:
+    """配置文件中的布尔值 (true/false/yes/no/1/0)"""
+    if value is None or value == '':
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() not in ('false', 'no', 'n', '0', 'off')
+
 
 def get_app_path():
     """获取应用程序所在目录"""
@@ -31,29 +43,42 @@ def get_app_path():
 
 class TaskExecutor:
     """任务执行器"""
-    def __init__(self, configs: List[Dict[str, Any]], max_workers: int = 4):
+    def __init__(self, configs: List[Dict[str, Any]], max_workers: int = 4,
+                 engine: str = 'thread', engine_options: Dict[str, Any] = None):
         """
         初始化任务执行器
 
         :param configs: 任务配置列表
         :param max_workers: 最大工作线程数
+        :param engine: 执行引擎 thread(线程池) / async(asyncio 事件循环)
+        :param engine_options: 异步引擎参数 (max_requests / max_downloads)
         """
         self.configs = configs
         self.max_workers = max_workers
+        self.engine = (engine or 'thread').lower()
+        self.engine_options = engine_options or {}
         self._stop_flag = threading.Event()
         self.downloaders = {}
+        # 各项目本次运行发出的请求数 {项目名称: downloader.request_stats()}
+        self.request_stats = {}
+        # 各项目本次运行的断点续传统计 {项目名称: downloader.transfer_stats()}
+        self.transfer_stats = {}
         self.status_files = {}
-        self.monitor_thread = None
         self.executor = None
         self.lock = threading.Lock()
+        # 任务完成 / 收到停止命令时唤醒等待的主线程
+        self.state_changed = threading.Condition(self.lock)
         self.task_complete_events = {}
         self.completed_tasks = 0
         self.all_tasks_completed = threading.Event()
+        # drain: 不再开始新的项目，正在执行的项目完成后结束
+        self._draining = threading.Event()
+        # 通过 stop <项目> 停止的项目
+        self.stopped_projects = set()
 
         # 创建运行状态目录
-        self.status_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.run_status')
+        self.status_dir = os.path.join(get_app_path(), '.run_status')
         os.makedirs(self.status_dir, exist_ok=True)
-        self.global_stop_file = os.path.join(self.status_dir, '.stop_all')
 
     def _create_status_file(self, project_name: str) -> str:
         """创建运行状态文件"""
@@ -77,10 +102,6 @@ class TaskExecutor:
             if project_name in self.task_complete_events:
                 del self.task_complete_events[project_name]
 
-    def _check_global_stop(self) -> bool:
-        """检查全局停止文件是否存在"""
-        return os.path.exists(self.global_stop_file)
-
     def stop(self):
         """
         停止所有下载任务
@@ -91,85 +112,265 @@ class TaskExecutor:
         with self.lock:
             for event in self.task_complete_events.values():
                 event.set()
+            downloaders = list(self.downloaders.values())
+            self.state_changed.notify_all()
 
-        # 停止监控线程
-        if self.monitor_thread and self.monitor_thread.is_alive():
-            self.monitor_thread.join(timeout=1)
-
-        # 停止所有下载器
-        with self.lock:
-            for downloader in self.downloaders.values():
-                downloader.stop_download()
+        # 停止所有下载器 (下载线程在写入下一个数据块前中止)
+        for downloader in downloaders:
+            downloader.stop_download()
 
         # 清理所有状态文件
         with self.lock:
-            for project_name in list(self.status_files.keys()):
-                self._remove_status_file(project_name)
+            project_names = list(self.status_files.keys())
+        for project_name in project_names:
+            self._remove_status_file(project_name)
 
         # 关闭线程池
         if self.executor:
             self.executor.shutdown(wait=False)
 
-    def _monitor_stop_signals(self):
-        """监控停止信号的独立线程"""
-        while not self._stop_flag.is_set():
-            try:
-                if self._stop_flag.is_set() or os.path.exists(self.global_stop_file):
-                    self._stop_flag.set()
-                    break
+    @property
+    def stop_requested(self) -> bool:
+        return self._stop_flag.is_set()
 
-                time.sleep(0.5)
-            except Exception as e:
-                print(f"监控线程出错: {str(e)}")
-                time.sleep(1)
+    def stop_project(self, project_name: str) -> bool:
+        """停止单个项目，还没有开始的项目不再执行，返回项目是否在本次执行中"""
+        with self.lock:
+            if project_name not in {config['name'] for config in self.configs}:
+                return False
+            self.stopped_projects.add(project_name)
+            event = self.task_complete_events.get(project_name)
+            if event is not None:
+                event.set()
+            downloader = self.downloaders.get(project_name)
+        if downloader is not None:
+            downloader.stop_download()
+        return True
+
+    def drain(self):
+        """不再开始新的项目，正在执行的项目完成后结束"""
+        self._draining.set()
+
+    def _should_skip(self, project_name: str) -> bool:
+        return self._stop_flag.is_set() or self._draining.is_set() or project_name in self.stopped_projects
+
+    def _handle_control(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """处理控制通道的命令 stop / drain"""
+        command = request.get('command')
+        projects = request.get('projects') or []
+        with self.lock:
+            running = sorted(self.downloaders)
+        if command == 'stop' and projects:
+            return {"projects": [name for name in projects if self.stop_project(name)]}
+        if command == 'stop':
+            self.stop()
+            return {"projects": running}
+        if command == 'drain':
+            self.drain()
+            return {"projects": running}
+        return None
 
     def execute(self):
         """执行所有任务"""
-        if self._stop_flag.is_set() or self._check_global_stop():
+        if self._stop_flag.is_set():
             print("任务执行已停止")
             return
 
-        self.monitor_thread = threading.Thread(
-            target=self._monitor_stop_signals,
-            daemon=True
-        )
-        self.monitor_thread.start()
+        # 通过控制通道接收 stop / drain 命令 (no_gui.py stop)
+        from GithubDownload.control import ControlServer
+        ControlServer.register(self.status_dir, self._handle_control)
+        try:
+            # graphql 后端的项目先合并查询
+            self._prefetch_graphql()
 
+            if self.engine == 'async':
+                return self._execute_async()
+            self._execute_threads()
+        finally:
+            ControlServer.unregister(self._handle_control)
+
+    def _execute_threads(self):
+        """使用线程池执行所有任务"""
         self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers)
         futures = {}
 
         try:
             # 提交所有任务
             for config in self.configs:
-                if self._stop_flag.is_set() or self._check_global_stop():
+                if self._stop_flag.is_set():
                     break
 
                 future = self.executor.submit(self.execute_task, config)
                 futures[future] = config
 
-            # 等待所有任务完成或停止信号
-            while not self._stop_flag.is_set() and not self._check_global_stop():
-                with self.lock:
-                    if self.completed_tasks >= len(self.configs):
-                        self.all_tasks_completed.set()
-                        break
-
-                time.sleep(0.5)
+            # 等待所有任务完成或停止命令
+            with self.state_changed:
+                while not self._stop_flag.is_set() and self.completed_tasks < len(self.configs):
+                    self.state_changed.wait()
+                if self.completed_tasks >= len(self.configs):
+                    self.all_tasks_completed.set()
 
         finally:
-            if not self._stop_flag.is_set() and not self._check_global_stop():
+            if not self._stop_flag.is_set():
                 self.executor.shutdown()
 
+    def _execute_async(self):
+        """使用异步引擎，在单个事件循环中执行所有任务"""
+        from GithubDownload.async_engine import AsyncGithubEngine
+
+        jobs = []
+        configs = {}
+        for config in self.configs:
+            project_name = config['name']
+            if self._should_skip(project_name):
+                self._finish_task(project_name)
+                continue
+            self._create_status_file(project_name)
+            try:
+                downloader = self._create_downloader(config)
+            except Exception as e:
+                print(f"处理项目 {project_name} 时发生错误: {e}")
+                self._finish_task(project_name)
+                continue
+            with self.lock:
+                self.downloaders[project_name] = downloader
+            configs[project_name] = config
+            jobs.append((downloader, config.get('action_type', 'download').lower()))
+
+        def on_complete(downloader, error):
+            project_name = downloader.project_name
+            config = configs[project_name]
+            if error is None:
+                print(f"项目 {project_name} 执行完成")
+            elif self._stop_flag.is_set() or project_name in self.stopped_projects:
+                print(f"项目 {project_name} 下载被中断")
+            else:
+                print(f"执行项目 {project_name} 时发生错误: {error}")
+                if config.get('dingtalk_webhook'):
+                    downloader._send_other_msg(
+                        f"执行项目 {project_name} 失败",
+                        f"URL: {config['url']}\n错误信息: {str(error)}"
+                    )
+            self._finish_task(project_name)
+
+        engine = AsyncGithubEngine(should_stop=self._stop_flag.is_set, **self.engine_options)
+        engine.execute(jobs, on_complete)
+
+    @staticmethod
+    def _resolve_proxies(config: Dict[str, Any]):
+        """项目实际使用的代理设置，未启用时返回 None"""
+        proxies = config.get('proxies', {})
+        enable_proxy = config.get('enable_proxy', True)
+        if not isinstance(proxies, dict):
+            proxies = {}
+        if not proxies.get('http') and not proxies.get('https') and not enable_proxy or enable_proxy == 'false':
+            return None
+        return proxies
+
+    @staticmethod
+    def _resolve_content_store(value):
+        """content_store 配置: 空 / false 不启用，true 使用输出目录上一级的 .store 目录，其他值为存储目录"""
+        if value is None or str(value).strip().lower() in ('', 'false', 'no', 'n', '0', 'off'):
+            return None
+        if str(value).strip().lower() in ('true', 'yes', 'y', '1', 'on'):
+            return True
+        return str(value).strip()
+
+    def _create_downloader(self, config: Dict[str, Any]) -> 'GithubDownloader':
+        """根据项目配置创建下载器"""
+        from GithubDownload.github import GithubDownloader
+        from GithubDownload.github_api import GithubApiDownloader
+        from GithubDownload.asset_filter import AssetFilter
+
+        # 确保代理设置正确
+        proxies = self._resolve_proxies(config)
+        if proxies is not None:
+            print(f"使用代理设置: {proxies}")
+
+        options = dict(
+            url=config['url'],
+            output=config.get('output'),
+            dingtalk_webhook=config.get('dingtalk_webhook'),
+            dingtalk_secret=config.get('dingtalk_secret'),
+            project_name=config['name'],
+            only_latest=as_bool(config.get('only_latest'), True),
+            threads=config.get('threads', 4),
+            log_file=config.get('log_file'),
+            segments=int(config.get('segments') or 1),
+            min_segment_size=config.get('min_segment_size') or '16M',
+            full_verify=as_bool(config.get('full_verify'), False),
+            state_db=config.get('state_db') or os.path.join(get_app_path(), '.state', 'state.sqlite'),
+            retries=int(config.get('download_retries') or 3),
+            feed_precheck=as_bool(config.get('feed_precheck'), True),
+            resolve_mode=str(config.get('resolve_mode') or 'fast').lower(),
+            content_store=self._resolve_content_store(config.get('content_store')),
+            asset_filter={key: config.get(key) for key in AssetFilter.KEYS},
+            bandwidth_limit=config.get('bandwidth_limit'),
+            bandwidth_schedule=config.get('bandwidth_schedule'),
+            verify=not as_bool(config.get('ignore_ssl'), True),
+            proxies=proxies,
+            timeout=30
+        )
+        # 获取版本信息的方式 html(抓取页面) / rest / graphql
+        backend = str(config.get('backend') or 'html').lower()
+        if backend in GithubApiDownloader.MODES:
+            return GithubApiDownloader(api_mode=backend, api_base=config.get('api_base'),
+                                       token=config.get('github_token'), **options)
+        return GithubDownloader(**options)
+
+    def _prefetch_graphql(self):
+        """把 graphql 后端的项目合并为批量查询，结果在各项目 request() 时使用"""
+        groups = {}
+        for config in self.configs:
+            if str(config.get('backend') or '').lower() != 'graphql' or config.get('action_type', 'download').lower() == 'verify':
+                continue
+            key = (config.get('api_base') or '', config.get('github_token') or '')
+            groups.setdefault(key, []).append(config)
+
+        if not groups:
+            return
+        from GithubDownload.github_api import GithubApiDownloader
+        for (api_base, token), configs in groups.items():
+            try:
+                GithubApiDownloader.prefetch(
+                    [config['url'] for config in configs],
+                    only_latest=[as_bool(config.get('only_latest'), True) for config in configs],
+                    api_base=api_base or None, token=token or None,
+                    proxies=self._resolve_proxies(configs[0]),
+                    verify=not as_bool(configs[0].get('ignore_ssl'), True),
+                )
+            except Exception as e:
+                print(f"批量查询 GraphQL 失败，将逐个查询: {e}")
+
+    def _finish_task(self, project_name: str):
+        """任务完成后移除状态文件和下载器引用，记录项目的请求数，发送项目的汇总通知"""
+        from GithubDownload.notifier import NotificationQueue
+        self._remove_status_file(project_name)
+        NotificationQueue.flush(project_name)
+        with self.lock:
+            downloader = self.downloaders.pop(project_name, None)
+            if downloader is not None:
+                self.request_stats[project_name] = downloader.request_stats()
+                self.transfer_stats[project_name] = downloader.transfer_stats()
+            self.completed_tasks += 1
+            # 检查是否所有任务都已完成
+            if self.completed_tasks >= len(self.configs):
+                self.all_tasks_completed.set()
+            self.state_changed.notify_all()
+
     def execute_task(self, config: Dict[str, Any]):
         """
         执行单个任务
 
         :param config: 任务配置字典
         """
-        if self._stop_flag.is_set() or self._check_global_stop():
+        project_name = config['name']
+        if self._should_skip(project_name):
+            if not self._stop_flag.is_set():
+                print(f"项目 {project_name} 未开始执行，已跳过")
+            self._finish_task(project_name)
             return
 
-        project_name = config['name']
         action_type = config.get('action_type', 'download').lower()
         status_file = self._create_status_file(project_name)
 
@@ -178,46 +379,32 @@ class TaskExecutor:
             with self.lock:
                 task_complete_event = self.task_complete_events.get(project_name)
 
-            # 确保代理设置正确
-            proxies = config.get('proxies', {})
-            enable_proxy = config.get('enable_proxy', True)
-            if not isinstance(proxies, dict):
-                proxies = {}
-            if not proxies.get('http') and not proxies.get('https') and not enable_proxy or enable_proxy == 'false':
-                proxies = None
-            else:
-                print(f"使用代理设置: {proxies}")
-
-            downloader = GithubDownloader(
-                url=config['url'],
-                output=config.get('output'),
-                dingtalk_webhook=config.get('dingtalk_webhook'),
-                dingtalk_secret=config.get('dingtalk_secret'),
-                project_name=project_name,
-                only_latest=config.get('only_latest', True),
-                threads=config.get('threads', 4),
-                log_file=config.get('log_file'),
-                verify=not config.get('ignore_ssl', True),
-                proxies=proxies,
-                timeout=30
-            )
+            downloader = self._create_downloader(config)
 
             # 存储下载器实例以便后续停止
             with self.lock:
                 self.downloaders[project_name] = downloader
 
+            # 通过 Atom feed 快速判断仓库是否有变化，没有变化时跳过完整抓取
+            if action_type in ('download', 'update') and not downloader.has_changes():
+                print(f"项目 {project_name} 没有变化，跳过")
+                return
+
             if action_type == 'download':
                 try:
-                    version_info = downloader.request()
-                    # 执行下载任务
-                    if not self._stop_flag.is_set() and not self._check_global_stop():
-                        downloader.download(version_info)
+                    # 执行下载任务，边解析版本边下载
+                    if not self._stop_flag.is_set() and project_name not in self.stopped_projects:
+                        downloader.download_stream()
                         # 检查是否被停止
                         if task_complete_event and task_complete_event.is_set():
                             print(f"项目 {project_name} 下载被中断")
                             return
+                        downloader.commit_feed_fingerprint()
                         print(f"项目 {project_name} 下载完成")
                 except Exception as e:
+                    if task_complete_event and task_complete_event.is_set():
+                        print(f"项目 {project_name} 下载被中断")
+                        return
                     print(f"下载项目 {project_name} 时发生错误: {e}")
                     if config.get('dingtalk_webhook'):
                         downloader._send_other_msg(
@@ -227,6 +414,7 @@ class TaskExecutor:
 
             elif action_type == 'update':
                 try:
+                    # 只检查更新，不记录 feed 指纹 (否则之后的 download 会因为 feed 没有变化被跳过)
                     updates = downloader.check_updates()
                     if updates:
                         print(f"项目 {project_name} 有更新可用:")
@@ -242,27 +430,46 @@ class TaskExecutor:
                             f"URL: {config['url']}\n错误信息: {str(e)}"
                         )
 
+            elif action_type == 'verify':
+                try:
+                    version_info = downloader.filter(downloader.request())
+                    downloader.verify_files(version_info)
+                except Exception as e:
+                    print(f"校验项目 {project_name} 文件时发生错误: {e}")
+
         except Exception as e:
             print(f"处理项目 {project_name} 时发生错误: {e}")
         finally:
             # 任务完成后移除状态文件和下载器引用
-            self._remove_status_file(project_name)
-            with self.lock:
-                self.downloaders.pop(project_name, None)
-                self.completed_tasks += 1
-                # 检查是否所有任务都已完成
-                if self.completed_tasks >= len(self.configs):
-                    self.all_tasks_completed.set()
+            self._finish_task(project_name)
 
 
 class ConfigManager:
     """配置文件管理器"""
+
+    # 定时任务默认的随机延迟 (秒)，生成的配置文件和未配置 schedule_jitter 时使用
+    DEFAULT_SCHEDULE_JITTER = 300
+
     def __init__(self, config_file: str):
         self.config_file = config_file
         self.config = configparser.ConfigParser()
         if not os.path.exists(config_file):
             self.create_default_config()
         self.config.read(config_file, encoding='utf-8')
+        self._mtime = os.path.getmtime(config_file)
+
+    def reload(self) -> bool:
+        """配置文件在外部被修改时重新读取，返回是否重新读取 (定时任务守护进程使用)"""
+        try:
+            mtime = os.path.getmtime(self.config_file)
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+        config = configparser.ConfigParser()
+        config.read(self.config_file, encoding='utf-8')
+        self.config, self._mtime = config, mtime
+        return True
 
     def create_default_config(self):
         """创建默认配置文件"""
@@ -275,8 +482,31 @@ class ConfigManager:
             f.write("proxies.https = \n")
             f.write("cron_expression = \n")
             f.write("scheduled_projects = \n")
+            f.write(f"schedule_jitter = {self.DEFAULT_SCHEDULE_JITTER}\n")
+            f.write("schedule_catchup = once\n")
             f.write("log_file = \n")
             f.write("threads = 4\n")
+            f.write("pool_size = 10\n")
+            f.write("keep_alive = true\n")
+            f.write("engine = thread\n")
+            f.write("feed_precheck = true\n")
+            f.write("resolve_mode = fast\n")
+            f.write("html_parser = auto\n")
+            f.write("parse_workers = 0\n")
+            f.write("download_workers = 8\n")
+            f.write("per_host_downloads = 4\n")
+            f.write("download_retries = 3\n")
+            f.write("content_store = false\n")
+            f.write("bandwidth_limit = 0\n")
+            f.write("bandwidth_schedule = \n")
+            f.write("notify_digest = true\n")
+            f.write("notify_rate_limit = 20\n")
+            f.write("rate_limit = 10\n")
+            f.write("rate_burst = 10\n")
+            f.write("rate_max_retries = 3\n")
+            f.write("rate_max_wait = 60\n")
+            f.write("backend = html\n")
+            f.write("github_token = \n")
 
     def get_global_config(self) -> Dict[str, str]:
         """获取全局配置"""
@@ -316,12 +546,16 @@ class ConfigManager:
         """保存更新后的配置"""
         with open(self.config_file, 'w', encoding='utf-8') as f:
             self.config.write(f)
+        self._mtime = os.path.getmtime(self.config_file)
 
 class GitHubDownloaderCLI:
     """GitHub下载器命令行版"""
-    def __init__(self):
+    def __init__(self, config_file: str = None):
+        """
+        :param config_file: 配置文件路径，默认为程序目录下的 config.ini
+        """
         self.app_path = get_app_path()
-        self.config_file = os.path.join(self.app_path, "config.ini")
+        self.config_file = config_file or os.path.join(self.app_path, "config.ini")
         self.config_manager = ConfigManager(self.config_file)
         self.task_executor = None
         self.setup_logging()
@@ -353,10 +587,44 @@ class GitHubDownloaderCLI:
             ]
         )
 
-    def execute_tasks(self, configs: List[Dict[str, Any]]):
-        """执行任务"""
+    def execute_tasks(self, configs: List[Dict[str, Any]], engine: str = None):
+        """执行任务
+
+        :param engine: 执行引擎 thread / async，不指定时使用全局配置 engine
+        """
+        from GithubDownload.notifier import NotificationQueue
+        from GithubDownload.base import DingTalkNotifier
+
         global_config = self.config_manager.get_global_config()
+        self._apply_global_config(configs, global_config)
+        self._configure_shared(global_config)
+        self.task_executor = self._create_executor(configs, global_config, engine)
+        self.task_executor.execute()
 
+        lines = self._run_summary()
+        for line in lines:
+            print(line)
+        # 本次运行的汇总作为一条钉钉消息发送，等待通知队列发送完成
+        if global_config.get('dingtalk_webhook') and lines:
+            notifier = DingTalkNotifier(global_config.get('dingtalk_webhook'), global_config.get('dingtalk_secret'))
+            NotificationQueue.submit(notifier, f"✉️ 本次运行汇总 ({len(configs)} 个项目)\n\n",
+                                     "### \n\n" + "\n\n".join(f"- {line}" for line in lines) + "\n\n")
+        self._drain_notifications(global_config)
+
+    @staticmethod
+    def _drain_notifications(global_config: Dict[str, str]):
+        """等待通知队列发送完成并输出统计"""
+        from GithubDownload.notifier import NotificationQueue
+
+        NotificationQueue.drain(float(global_config.get('notify_drain_timeout') or 60))
+        stats = NotificationQueue.stats()
+        if stats['queued'] or stats['dropped']:
+            print(f"钉钉通知: 发送 {stats['sent']} 条, 失败 {stats['failed']} 条, 合并 {stats['coalesced']} 条通知, "
+                  f"队列已满丢弃 {stats['dropped']} 条, 未发送 {stats['pending']} 条")
+
+    @staticmethod
+    def _apply_global_config(configs: List[Dict[str, Any]], global_config: Dict[str, str]):
+        """项目配置中补充全局配置"""
         for config in configs:
             # 应用全局配置
             if 'proxies' not in config:
@@ -371,10 +639,141 @@ class GitHubDownloaderCLI:
             config['log_file'] = global_config.get('log_file')
             config['dingtalk_webhook'] = global_config.get('dingtalk_webhook')
             config['dingtalk_secret'] = global_config.get('dingtalk_secret')
-
+            config['state_db'] = global_config.get('state_db')
+            config.setdefault('feed_precheck', global_config.get('feed_precheck', 'true'))
+            config.setdefault('resolve_mode', global_config.get('resolve_mode', 'fast'))
+            config.setdefault('download_retries', global_config.get('download_retries', '3'))
+            config.setdefault('content_store', global_config.get('content_store', ''))
+            # 获取版本信息的方式 html / rest / graphql，项目中未配置时使用全局配置
+            for key in ('backend', 'api_base', 'github_token'):
+                if not config.get(key) and global_config.get(key):
+                    config[key] = global_config.get(key)
+
+    @staticmethod
+    def _configure_shared(global_config: Dict[str, str]):
+        """按全局配置设置所有项目共用的连接池、下载调度、限速和通知队列"""
+        from GithubDownload.session import SessionManager
+        from GithubDownload.parsers import ParserBackend
+        from GithubDownload.parse_pool import ParsePool
+        from GithubDownload.scheduler import DownloadScheduler
+        from GithubDownload.governor import RateGovernor
+        from GithubDownload.bandwidth import BandwidthLimiter
+        from GithubDownload.notifier import NotificationQueue
+
+        # 共享连接池设置
+        SessionManager.configure(
+            pool_size=int(global_config.get('pool_size') or 10),
+            keep_alive=str(global_config.get('keep_alive', 'true')).lower() != 'false'
+        )
+        # 全局下载调度：所有项目的文件共用的下载线程数和每个主机的并发上限
+        DownloadScheduler.configure(
+            max_workers=int(global_config.get('download_workers') or 8),
+            per_host=int(global_config.get('per_host_downloads') or 4)
+        )
+        # 按主机限速 (每秒请求数，0 为不限速)，被限流时的重试次数和单次最长等待秒数
+        RateGovernor.configure(
+            rate=float(global_config.get('rate_limit') or 10),
+            burst=float(global_config.get('rate_burst') or 10),
+            max_retries=int(global_config.get('rate_max_retries') or 3),
+            max_wait=float(global_config.get('rate_max_wait') or 60)
+        )
+        # 全局下载带宽上限，所有项目共用
+        try:
+            BandwidthLimiter.configure(global_config.get('bandwidth_limit') or 0, global_config.get('bandwidth_schedule'))
+        except ValueError as e:
+            print(f"{e}，不限制全局下载带宽")
+            BandwidthLimiter.configure()
+        # 钉钉通知队列：每分钟发送上限、队列上限，单个文件 / 版本的通知是否合并为项目汇总
+        NotificationQueue.configure(
+            rate_limit=int(global_config.get('notify_rate_limit') or 20),
+            max_queue=int(global_config.get('notify_queue_size') or 200),
+            digest=as_bool(global_config.get('notify_digest'), True),
+            digest_interval=float(global_config.get('notify_digest_interval') or 300)
+        )
+        # HTML解析后端 auto / lxml / html.parser
+        try:
+            ParserBackend.configure(global_config.get('html_parser', 'auto'))
+        except ValueError as e:
+            print(f"{e}，使用默认解析后端")
+            ParserBackend.configure('auto')
+        # HTML解析进程数 (0 为在下载线程中解析，auto 为CPU核心数)
+        try:
+            ParsePool.configure(global_config.get('parse_workers') or 0)
+        except ValueError as e:
+            print(f"{e}，不启用解析进程")
+            ParsePool.configure(0)
+
+    @staticmethod
+    def _create_executor(configs: List[Dict[str, Any]], global_config: Dict[str, str],
+                         engine: str = None) -> TaskExecutor:
         max_workers = int(global_config.get('threads', 4))
-        self.task_executor = TaskExecutor(configs=configs, max_workers=max_workers)
-        self.task_executor.execute()
+        engine = engine or global_config.get('engine') or 'thread'
+        engine_options = {
+            'max_requests': int(global_config.get('async_max_requests') or 16),
+            'max_downloads': int(global_config.get('async_max_downloads') or 8),
+        }
+        return TaskExecutor(configs=configs, max_workers=max_workers, engine=engine, engine_options=engine_options)
+
+    def _run_summary(self) -> List[str]:
+        """本次运行的统计信息"""
+        return self._project_summary(self.task_executor) + self._shared_summary()
+
+    @staticmethod
+    def _project_summary(task_executor: TaskExecutor) -> List[str]:
+        """各项目的请求数、断点续传、过滤和内容存储统计"""
+        lines = []
+        for project_name, stats in sorted(task_executor.request_stats.items()):
+            lines.append(f"项目 {project_name}: 请求 {stats['requests']} 次 (其中 304 未变化 {stats['not_modified']} 次)")
+            transfer = task_executor.transfer_stats.get(project_name)
+            if transfer and (transfer['retries'] or transfer['saved_bytes'] or transfer['refetched_bytes']):
+                lines.append(f"项目 {project_name}: 下载重试 {transfer['retries']} 次, 断点续传节省 {transfer['saved_bytes'] / 1024 / 1024:.2f} MB, "
+                      f"重新下载 {transfer['refetched_bytes'] / 1024 / 1024:.2f} MB")
+            if transfer and transfer['filtered_files']:
+                lines.append(f"项目 {project_name}: 过滤规则跳过 {transfer['filtered_files']} 个文件, "
+                      f"节省下载 {transfer['filtered_bytes'] / 1024 / 1024:.2f} MB (页面上有大小的文件)")
+            if transfer and transfer['store_files']:
+                lines.append(f"项目 {project_name}: 从内容存储链接 {transfer['store_files']} 个文件, "
+                      f"节省下载 {transfer['store_bytes'] / 1024 / 1024:.2f} MB")
+        return lines
+
+    @staticmethod
+    def _shared_summary() -> List[str]:
+        """所有项目共用的连接池、调度、限速等统计 (进程启动以来累计)"""
+        from GithubDownload.session import SessionManager
+        from GithubDownload.scheduler import DownloadScheduler
+        from GithubDownload.governor import RateGovernor
+        from GithubDownload.content_store import ContentStore
+        from GithubDownload.bandwidth import BandwidthLimiter
+        from GithubDownload.parse_pool import ParsePool
+        from GithubDownload.units import format_rate
+
+        lines = []
+        for scope, stats in BandwidthLimiter.stats().items():
+            if stats['bytes']:
+                name = '全部项目' if scope == 'global' else f"项目 {scope}"
+                limit = format_rate(stats['limit']) if stats['limit'] else '不限速'
+                lines.append(f"下载带宽 {name}: {stats['bytes'] / 1024 / 1024:.2f} MB, 平均 {format_rate(stats['average'])}, "
+                      f"当前上限 {limit}, 限速等待 {stats['waited']:.1f}s")
+        for store in ContentStore.opened():
+            stats = store.stats()
+            lines.append(f"内容存储 {store.root}: 新增对象 {stats['stored']} 个, 链接 {stats['linked']} 个文件 "
+                  f"({stats['linked_bytes'] / 1024 / 1024:.2f} MB), 下载后去重 {stats['deduplicated']} 个文件 "
+                  f"({stats['deduplicated_bytes'] / 1024 / 1024:.2f} MB)")
+        stats = SessionManager.stats()
+        lines.append(f"连接统计: 请求 {stats['requests']} 次, 新建连接 {stats['opened']} 个, 复用连接 {stats['reused']} 次")
+        stats = ParsePool.stats()
+        if stats['pooled']:
+            lines.append(f"HTML解析: 解析进程 {stats['workers']} 个, 进程中解析 {stats['pooled']} 个页面 "
+                  f"({stats['pooled_bytes'] / 1024 / 1024:.2f} MB), 线程中解析 {stats['inline']} 个页面")
+        stats = DownloadScheduler.stats()
+        if stats['submitted']:
+            lines.append(f"下载调度: 文件 {stats['completed']} / {stats['submitted']} 个, 最大队列深度 {stats['max_queue_depth']}, "
+                  f"平均排队 {stats['avg_wait']:.2f}s, 最长排队 {stats['max_wait']:.2f}s")
+        for host, stats in RateGovernor.stats().items():
+            if stats['throttled'] or stats['waited'] >= 1:
+                lines.append(f"限速 {host}: 请求 {stats['requests']} 次, 被限流 {stats['throttled']} 次, "
+                      f"限速等待 {stats['waited']:.1f}s, 当前速率 {stats['rate']:.2f} 次/秒")
+        return lines
 
     def list_projects(self):
         """列出所有项目"""
@@ -433,6 +832,7 @@ class GitHubDownloaderCLI:
         # 获取输出路径
         output = input("请输入输出路径(留空使用默认路径): ").strip()
         if not output:
+            from pathvalidate import sanitize_filename
             output = os.path.join(self.app_path, 'downloads', sanitize_filename(name, replacement_text='-'))
             print(f"将使用默认输出路径: {output}")
 
@@ -485,6 +885,7 @@ class GitHubDownloaderCLI:
             return False
 
         if not output:
+            from pathvalidate import sanitize_filename
             output = os.path.join(self.app_path, 'downloads', sanitize_filename(name, replacement_text='-'))
 
         self.config_manager.config[name] = {
@@ -522,7 +923,7 @@ class GitHubDownloaderCLI:
             print(f"删除项目 '{name}' 失败: {str(e)}")
             return False
 
-    def execute_project(self, name):
+    def execute_project(self, name, engine=None):
         """执行单个项目"""
         if name not in self.config_manager.config:
             print(f"错误: 项目 '{name}' 不存在")
@@ -530,68 +931,201 @@ class GitHubDownloaderCLI:
 
         config = dict(self.config_manager.config[name])
         config['name'] = name
-        self.execute_tasks([config])
+        self.execute_tasks([config], engine=engine)
         return True
 
-    def execute_all_projects(self):
+    def execute_all_projects(self, engine=None):
         """执行所有项目"""
         configs = self.config_manager.get_project_configs()
         if not configs:
             print("没有可执行的项目")
             return False
 
-        self.execute_tasks(configs)
+        self.execute_tasks(configs, engine=engine)
         return True
 
-    def schedule_tasks(self):
-        """定时执行任务"""
-        global_config = self.config_manager.get_global_config()
-        cron_expr = global_config.get('cron_expression')
-        scheduled_projects = global_config.get('scheduled_projects', '').split(',')
-
-        if not cron_expr:
-            print("没有配置定时任务")
-            return
-
-        if not scheduled_projects:
-            print("没有选择要定时执行的项目")
-            return
-
+    def verify_projects(self, names=None, full=False, engine=None):
+        """校验项目已下载文件的哈希值（不下载），full 为 True 时忽略哈希缓存全部重新计算"""
+        names = names or [section for section in self.config_manager.config.sections() if section != 'global']
         configs = []
-        for project in scheduled_projects:
-            if project in self.config_manager.config:
-                config = dict(self.config_manager.config[project])
-                config['name'] = project
-                configs.append(config)
+        for name in names:
+            if name not in self.config_manager.config:
+                print(f"警告: 项目 '{name}' 不存在，已跳过")
+                continue
+            config = dict(self.config_manager.config[name])
+            config['name'] = name
+            config['action_type'] = 'verify'
+            config['full_verify'] = full
+            configs.append(config)
 
         if not configs:
             print("没有找到有效的项目配置")
-            return
+            return False
 
-        print(f"定时任务已启动: {cron_expr}")
-        print(f"将执行的项目: {', '.join(scheduled_projects)}")
+        self.execute_tasks(configs, engine=engine)
+        return True
 
-        while True:
-            try:
-                now = datetime.now()
-                cron = croniter(cron_expr, now)
-                next_time = cron.get_next(datetime)
-                delay = (next_time - now).total_seconds()
+    def _resolve_schedules(self) -> Dict[str, Dict[str, Any]]:
+        """各项目的定时设置 {项目: {"cron", "jitter", "catchup"}}
 
-                print(f"下一次执行时间: {next_time.strftime('%Y-%m-%d %H:%M:%S')}")
-                print(f"等待 {delay:.0f} 秒...")
-                time.sleep(delay)
+        cron 表达式的优先级: 项目配置 cron > 全局配置 group_cron.<分组> > 全局 cron_expression (仅 scheduled_projects 中的项目)
+        随机延迟 schedule_jitter (秒) 和错过后的处理 schedule_catchup (once / skip) 可以在项目中单独配置
+        """
+        from GithubDownload.cron_schedule import CronSchedule
+
+        global_config = self.config_manager.get_global_config()
+        legacy_cron = (global_config.get('cron_expression') or '').strip()
+        legacy_projects = {name.strip() for name in (global_config.get('scheduled_projects') or '').split(',') if name.strip()}
+
+        schedules = {}
+        for project in self.config_manager.get_project_configs():
+            name = project['name']
+            group = project.get('group', '默认')
+            cron = (project.get('cron') or global_config.get(f"group_cron.{group}".lower())
+                    or (legacy_cron if name in legacy_projects else '')).strip()
+            if not cron:
+                continue
+            if not CronSchedule.validate(cron):
+                print(f"警告: 项目 '{name}' 的 cron 表达式无效: {cron}，不定时执行")
+                continue
+            schedules[name] = {
+                "cron": cron,
+                "jitter": project.get('schedule_jitter') or global_config.get('schedule_jitter')
+                           or ConfigManager.DEFAULT_SCHEDULE_JITTER,
+                "catchup": (project.get('schedule_catchup') or global_config.get('schedule_catchup') or 'once').lower(),
+            }
+        return schedules
 
-                print(f"开始执行任务: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-                self.execute_tasks(configs)
-                print(f"任务执行完成: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    def _state_store(self):
+        from GithubDownload.state import StateStore
 
-            except KeyboardInterrupt:
-                print("\n定时任务已停止")
-                break
+        global_config = self.config_manager.get_global_config()
+        return StateStore.open(global_config.get('state_db') or os.path.join(get_app_path(), '.state', 'state.sqlite'))
+
+    @staticmethod
+    def _print_schedule_table(rows: List[Dict[str, Any]]):
+        def when(timestamp):
+            return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S') if timestamp else '-'
+
+        print(f"\n{'下次执行':<20} {'上次开始':<20} {'上次结果':<8} {'cron':<16} 项目")
+        for row in rows:
+            next_run = '执行中' if row.get('running') else when(row.get('next_run'))
+            print(f"{next_run:<20} {when(row.get('last_start')):<20} {row.get('last_status') or '-':<8} "
+                  f"{row.get('cron'):<16} {row['project']}")
+
+    def show_schedules(self):
+        """查看状态库中保存的定时执行时间表"""
+        rows = self._state_store().get_schedules()
+        if not rows:
+            print("没有定时执行记录 (守护进程还没有运行过)")
+            return
+        self._print_schedule_table([dict(row, project=project) for project, row in rows.items()])
+
+    def schedule_tasks(self, engine=None):
+        """定时任务守护进程
+
+        每个项目按自己的 cron 表达式执行，到期的项目在后台线程中执行，同时执行的项目不超过 schedule_max_running，
+        同一项目不会重叠执行。下次执行时间保存在状态库中，重启后继续；config.ini 被修改时重新读取定时设置和
+        全局的连接池、下载调度、限速、带宽、通知和HTML解析设置 (之后开始执行的项目使用新设置)。
+        通过 no_gui.py stop 停止 (stop --drain 等待正在执行的项目完成后退出)。
+        """
+        from GithubDownload.cron_schedule import CronSchedule
+        from GithubDownload.control import ControlServer
+
+        schedule = CronSchedule(self._state_store())
+        schedule.set_projects(self._resolve_schedules())
+        if not schedule.entries:
+            print("没有配置定时任务 (项目 cron、全局 group_cron.<分组> 或 cron_expression + scheduled_projects)")
+            return
+
+        global_config = self.config_manager.get_global_config()
+        self._configure_shared(global_config)
+        max_running = int(global_config.get('schedule_max_running') or global_config.get('threads') or 4)
+
+        print(f"定时任务已启动: {len(schedule.entries)} 个项目，最多同时执行 {max_running} 个")
+        self._print_schedule_table(schedule.table())
+
+        cond = threading.Condition()
+        running: Dict[str, TaskExecutor] = {}
+        control = {"stop": False, "drain": False}
+
+        def handle_control(request: Dict[str, Any]):
+            # 停止单个项目由各执行器处理
+            if request.get('projects') or request.get('command') not in ('stop', 'drain'):
+                return None
+            with cond:
+                control[request['command']] = True
+                cond.notify_all()
+            return {"projects": []}
+
+        def run_batch(names: List[str], start: float):
+            configs = []
+            for name in names:
+                config = dict(self.config_manager.get_project_config(name))
+                config['name'] = name
+                configs.append(config)
+            status = 'ok'
+            executor = None
+            try:
+                current_config = self.config_manager.get_global_config()
+                self._apply_global_config(configs, current_config)
+                executor = self._create_executor(configs, current_config, engine)
+                with cond:
+                    running.update({name: executor for name in names})
+                executor.execute()
+                for line in self._project_summary(executor):
+                    print(line)
             except Exception as e:
+                status = 'error'
                 print(f"定时任务执行错误: {str(e)}")
-                time.sleep(60)  # 出错后等待1分钟再重试
+            finally:
+                print(f"任务执行完成: {', '.join(names)} ({time.time() - start:.0f}s)")
+                with cond:
+                    for name in names:
+                        stopped = executor is not None and (executor.stop_requested or name in executor.stopped_projects)
+                        schedule.finished(name, start, 'stopped' if stopped else status)
+                        running.pop(name, None)
+                    cond.notify_all()
+
+        ControlServer.register(os.path.join(get_app_path(), '.run_status'), handle_control)
+        try:
+            with cond:
+                while not control['stop']:
+                    if control['drain'] and not running:
+                        break
+                    if self.config_manager.reload():
+                        print("配置文件已修改，重新读取定时设置和全局设置")
+                        schedule.set_projects(self._resolve_schedules())
+                        global_config = self.config_manager.get_global_config()
+                        self._configure_shared(global_config)
+                        max_running = int(global_config.get('schedule_max_running') or global_config.get('threads') or 4)
+
+                    timeout = 60.0
+                    if not control['drain']:
+                        now = time.time()
+                        due = [name for name in schedule.due(now) if name not in running]
+                        batch = due[:max(max_running - len(running), 0)]
+                        if batch:
+                            print(f"开始执行任务: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} {', '.join(batch)}")
+                            for name in batch:
+                                schedule.started(name, now)
+                                running[name] = None
+                            threading.Thread(target=run_batch, args=(batch, now), daemon=True).start()
+                        wakeup = schedule.next_wakeup()
+                        if wakeup is not None and len(due) <= len(batch):
+                            # 还有到期但没有空位的项目时，等待有项目执行完成 (notify)
+                            timeout = min(max(wakeup - time.time(), 0.0), timeout)
+                    cond.wait(timeout)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            ControlServer.unregister(handle_control)
+            with cond:
+                executors = {id(executor): executor for executor in running.values() if executor is not None}
+            for executor in executors.values():
+                executor.stop()
+            print("\n定时任务已停止")
+            self._drain_notifications(global_config)
 
     def config_global_set(self, key, value):
         """设置全局配置"""
@@ -616,22 +1150,35 @@ class GitHubDownloaderCLI:
         print(f"项目 '{project}' 的配置 '{key}' 已设置为 '{value}'")
         return True
 
-    def stop(self):
-        """停止所有正在执行的任务"""
+    def stop(self, names=None, drain=False):
+        """通过控制通道通知正在执行的进程停止
+
+        :param names: 只停止这些项目 (不指定则停止所有项目)
+        :param drain: 不再开始新的项目，正在执行的项目完成后结束
+        """
+        from GithubDownload.control import ControlServer
+
         status_dir = os.path.join(get_app_path(), '.run_status')
         if not os.path.exists(status_dir):
             print("没有正在执行的项目")
             return
 
-        # 写入全局停止标志
-        with open("./.run_status/.stop_all", "w", encoding="utf-8") as f:
-            f.write("")
-
-        print("已发送停止所有任务的信号")
+        responses = ControlServer.send(status_dir, 'drain' if drain else 'stop', names)
+        responses = [response for response in responses if response.get('ok')]
+        if not responses:
+            print("没有正在执行的项目")
+            return
+        for response in responses:
+            projects = ', '.join(response.get('projects') or []) or '无'
+            if drain:
+                print(f"已通知进程 {response['pid']} 完成正在执行的项目后结束 (正在执行: {projects})")
+            else:
+                print(f"已通知进程 {response['pid']} 停止项目: {projects}")
 
 def main():
     """命令行主函数"""
     parser = argparse.ArgumentParser(description='GitHub下载器命令行版')
+    parser.add_argument('--profile-startup', action='store_true', help='命令结束后输出启动和模块导入的耗时 (stderr)')
     subparsers = parser.add_subparsers(dest='command', required=True)
 
     # 列出项目
@@ -655,9 +1202,18 @@ def main():
     # 执行项目
     execute_parser = subparsers.add_parser('execute', help='执行项目')
     execute_parser.add_argument('names', nargs='*', help='项目名称(不指定则执行所有项目)')
+    execute_parser.add_argument('--engine', choices=['thread', 'async'], default=None, help='执行引擎(默认使用全局配置 engine)')
+
+    # 校验文件
+    verify_parser = subparsers.add_parser('verify', help='校验已下载文件的hash(不下载)')
+    verify_parser.add_argument('names', nargs='*', help='项目名称(不指定则校验所有项目)')
+    verify_parser.add_argument('--full', action='store_true', help='忽略哈希缓存，重新计算所有文件的hash')
+    verify_parser.add_argument('--engine', choices=['thread', 'async'], default=None, help='执行引擎(默认使用全局配置 engine)')
 
     # 定时任务
-    schedule_parser = subparsers.add_parser('schedule', help='启动定时任务')
+    schedule_parser = subparsers.add_parser('schedule', aliases=['daemon'], help='启动定时任务守护进程')
+    schedule_parser.add_argument('--engine', choices=['thread', 'async'], default=None, help='执行引擎(默认使用全局配置 engine)')
+    schedule_parser.add_argument('--list', action='store_true', help='只查看定时执行时间表')
 
     # 配置管理
     config_parser = subparsers.add_parser('config', help='配置管理')
@@ -697,10 +1253,16 @@ def main():
     project_set_parser.add_argument('value', help='配置值')
 
     # 停止命令
-    stop_parser = subparsers.add_parser('stop', help='停止所有正在执行的任务')
+    stop_parser = subparsers.add_parser('stop', help='停止正在执行的任务')
+    stop_parser.add_argument('names', nargs='*', help='项目名称(不指定则停止所有项目)')
+    stop_parser.add_argument('--drain', action='store_true', help='不再开始新的项目，正在执行的项目完成后结束')
 
     args = parser.parse_args()
+    if ImportProfiler:
+        ImportProfiler.mark("导入和参数解析")
     downloader = GitHubDownloaderCLI()
+    if ImportProfiler:
+        ImportProfiler.mark("读取配置和设置日志")
 
     try:
         if args.command == 'list':
@@ -725,10 +1287,6 @@ def main():
         elif args.command == 'remove':
             downloader.remove_project(args.name)
         elif args.command == 'execute':
-            # 删除全局停止标志文件
-            if os.path.exists('./.run_status/.stop_all'):
-                os.remove('./.run_status/.stop_all')
-
             if args.names:
                 # 执行指定的多个项目
                 configs = []
@@ -741,17 +1299,19 @@ def main():
                         print(f"警告: 项目 '{name}' 不存在，已跳过")
 
                 if configs:
-                    downloader.execute_tasks(configs)
+                    downloader.execute_tasks(configs, engine=args.engine)
                 else:
                     print("没有找到有效的项目配置")
             else:
                 # 执行所有项目
-                downloader.execute_all_projects()
-        elif args.command == 'schedule':
-            # 删除全局停止标志文件
-            if os.path.exists('./.run_status/.stop_all'):
-                os.remove('./.run_status/.stop_all')
-            downloader.schedule_tasks()
+                downloader.execute_all_projects(engine=args.engine)
+        elif args.command == 'verify':
+            downloader.verify_projects(args.names, full=args.full, engine=args.engine)
+        elif args.command in ('schedule', 'daemon'):
+            if args.list:
+                downloader.show_schedules()
+            else:
+                downloader.schedule_tasks(engine=args.engine)
         elif args.command == 'config':
             if args.config_command == 'global':
                 if args.global_action == 'show':
@@ -775,14 +1335,22 @@ def main():
                 elif args.project_action == 'set':
                     downloader.config_project_set(args.name, args.key, args.value)
         elif args.command == 'stop':
-            downloader.stop()
+            downloader.stop(args.names, drain=args.drain)
 
     except Exception as e:
         print(f"错误: {str(e)}")
         return 1
+    finally:
+        if ImportProfiler:
+            ImportProfiler.mark("执行命令")
+            ImportProfiler.report()
 
     return 0
 
 
 if __name__ == "__main__":
+    if getattr(sys, 'frozen', False):
+        # 打包后的程序启动解析子进程时需要
+        import multiprocessing
+        multiprocessing.freeze_support()
     sys.exit(main())